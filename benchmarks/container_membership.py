@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark membership tests, removal and re-adding of items in one very full container.
+
+Fills a Container with thousands of items and times `item in container.items` and remove_item/add_item round trips
+for items spread across the whole container, then does the same with the items held in a plain list the way
+containers used to hold them, so the two can be compared. Both should stay flat for the ItemCollection however many
+items there are, while the list gets slower the further into it the item is.
+
+Usage:
+    python benchmarks/container_membership.py [--items 5000] [--operations 20000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from texticular.game_enums import Flags
+from texticular.items.story_item import Container, StoryItem
+from texticular.world import World
+
+DESCRIPTIONS = {"Main": "Something in a very full box."}
+
+
+def build_container(size: int) -> Container:
+    """Return a container big enough for `size` items with that many items in it"""
+    container = Container("bench-box", "Box", DESCRIPTIONS, ["Box"], slots=size * 2, location_key="bench-room")
+    for i in range(size):
+        item = StoryItem(f"bench-thing-{i}", "Thing", DESCRIPTIONS, ["Thing"], location_key="bench-room",
+                         flags=[Flags.TAKEBIT])
+        container.add_item(item)
+    return container
+
+
+def time_operations(items, probes: list, contains, remove, add) -> dict:
+    """Return the average microseconds of a membership test and of a remove and add round trip"""
+    start = time.perf_counter()
+    for item in probes:
+        contains(items, item)
+    membership = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for item in probes:
+        remove(items, item)
+        add(items, item)
+    round_trip = time.perf_counter() - start
+    return {
+        "membership_us": membership / len(probes) * 1_000_000,
+        "remove_add_us": round_trip / len(probes) * 1_000_000,
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--items", type=int, default=5000, help="items in the container")
+    arg_parser.add_argument("--operations", type=int, default=20000, help="membership tests and round trips timed")
+    arg_parser.add_argument("--seed", type=int, default=1995, help="seed for picking the items probed")
+    args = arg_parser.parse_args()
+
+    with World():
+        container = build_container(args.items)
+        rng = random.Random(args.seed)
+        held = list(container.items)
+        probes = [rng.choice(held) for _ in range(args.operations)]
+
+        results = {
+            # remove_item/add_item also move the item and keep slots_occupied and the location index up to date
+            "Container.remove_item/add_item": time_operations(
+                container.items, probes, lambda items, item: item in items,
+                lambda items, item: container.remove_item(item), lambda items, item: container.add_item(item)),
+            "ItemCollection": time_operations(
+                container.items, probes, lambda items, item: item in items,
+                lambda items, item: items.remove(item), lambda items, item: items.append(item)),
+            "list": time_operations(
+                list(container.items), probes, lambda items, item: item in items,
+                lambda items, item: items.remove(item), lambda items, item: items.append(item)),
+        }
+
+    print(f"{args.items} items in one container, {args.operations} operations")
+    print(f"{'collection':>32} {'membership µs':>14} {'remove+add µs':>14}")
+    for name, result in results.items():
+        print(f"{name:>32} {result['membership_us']:>14.3f} {result['remove_add_us']:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Report how much memory interning the game's content strings saves.
+
+Loads each config file of the shipped game (newGameItems.json, newGameMap.json, newGameCharacters.json) once per
+world, the way a process serving several game sessions loads the same content into a World per session, and reports
+the bytes all the loads keep alive according to tracemalloc three ways: without interning, with a StringTable per
+load that is dropped once the load is done (what load_game_map does by default), and with one StringTable shared by
+every load and kept, the table's own memory included. Also reports the distinct strings and the duplicates the
+shared table dropped. A single world gains little, the savings come from the text repeated within and between
+worlds.
+
+Then does the same for a generated world: the shipped items copied over and over under new keys, the way generated
+content reuses a stock set of names and descriptions, where the savings grow with the size of the world.
+
+Usage:
+    python benchmarks/content_strings.py [--worlds 10] [--copies 1000]
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from texticular.game_loader import get_data_path, load_json
+from texticular.string_table import StringTable
+
+CONFIG_FILES = ["newGameItems.json", "newGameMap.json", "newGameCharacters.json"]
+
+
+def retained_bytes(path: str, loads: int, strings=None) -> int:
+    """Load a config file `loads` times and return the bytes the loaded configs keep alive
+
+    strings is None for no interning, a StringTable to share and keep, or StringTable itself to make a table per
+    load and drop it afterwards.
+    """
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    if strings is StringTable:
+        configs = [load_json(path, StringTable()) for _ in range(loads)]
+    else:
+        configs = [load_json(path, strings) for _ in range(loads)]
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return after - before
+
+
+def generate_world(path: str, copies: int) -> str:
+    """Write a copy of the items file with every item repeated `copies` times under new keys, return its path"""
+    config = load_json(path)
+    items = []
+    for copy in range(copies):
+        for item in config["items"]:
+            item = dict(item)
+            item["keyValue"] = f"{item['keyValue']}-{copy}"
+            items.append(item)
+    handle, generated_path = tempfile.mkstemp(suffix=".json")
+    with os.fdopen(handle, "w") as f:
+        json.dump({"items": items}, f)
+    return generated_path
+
+
+def compare(name: str, path: str, loads: int):
+    plain = retained_bytes(path, loads)
+    per_load = retained_bytes(path, loads, StringTable)
+    strings = StringTable()
+    # a kept table is part of what interning keeps alive, so it's measured along with the configs
+    shared = retained_bytes(path, loads, strings)
+    report = strings.report()
+    print(f"{name:>26} {loads:>6} {report['strings']:>8} {report['duplicates']:>10} {plain:>12} "
+          f"{per_load:>12} {1 - per_load / plain:>8.0%} {shared:>12} {1 - shared / plain:>8.0%}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--worlds", type=int, default=10, help="worlds each shipped file is loaded into")
+    arg_parser.add_argument("--copies", type=int, default=1000, help="copies of the items in the generated world")
+    args = arg_parser.parse_args()
+
+    data_path = get_data_path()
+    print(f"{'content':>26} {'loads':>6} {'strings':>8} {'duplicates':>10} {'plain bytes':>12} "
+          f"{'per load':>12} {'saved':>8} {'shared':>12} {'saved':>8}")
+    for config_file in CONFIG_FILES:
+        compare(config_file, os.path.join(data_path, config_file), 1)
+        compare(config_file, os.path.join(data_path, config_file), args.worlds)
+
+    generated_path = generate_world(os.path.join(data_path, "newGameItems.json"), args.copies)
+    try:
+        compare(f"generated x{args.copies}", generated_path, 1)
+    finally:
+        os.remove(generated_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Measure how loading an item config scales with the amount of content.
+
+Writes generated item configs of growing size, the shipped items copied over and over under new keys, and loads each
+into a fresh world with game_loader.load_items, reporting the time and the peak memory tracemalloc saw. Each file is
+read once and every record decoded by its type, so the time and memory per item should stay about flat as the
+content grows.
+
+Usage:
+    python benchmarks/item_loading.py [--sizes 1 10 100]
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from texticular.game_loader import get_data_path, load_items, load_json
+from texticular.world import World
+
+
+def generate_items(path: str, copies: int) -> str:
+    """Write a copy of the items file with every item, and what containers hold, repeated `copies` times under new
+    keys, return its path"""
+    config = load_json(path)
+    items = []
+    for copy in range(copies):
+        for item in config["items"]:
+            item = dict(item)
+            item["keyValue"] = f"{item['keyValue']}-{copy}"
+            item["itemKeyValues"] = [f"{key_value}-{copy}" for key_value in item.get("itemKeyValues", [])]
+            items.append(item)
+    handle, generated_path = tempfile.mkstemp(suffix=".json")
+    with os.fdopen(handle, "w") as f:
+        json.dump({"items": items}, f)
+    return generated_path
+
+
+def measure(path: str) -> tuple:
+    """Load an item config into a fresh world, return the objects loaded, seconds taken and peak bytes"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    with World() as world:
+        load_items(path)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(world), seconds, peak
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100],
+                            help="copies of the shipped items in each generated config")
+    args = arg_parser.parse_args()
+
+    items_path = os.path.join(get_data_path(), "newGameItems.json")
+    print(f"{'copies':>8} {'objects':>9} {'ms':>10} {'µs/object':>10} {'peak KB':>10} {'B/object':>10}")
+    for copies in args.sizes:
+        generated_path = generate_items(items_path, copies)
+        try:
+            objects, seconds, peak = measure(generated_path)
+        finally:
+            os.remove(generated_path)
+        print(f"{copies:>8} {objects:>9} {seconds * 1000:>10.1f} {seconds / objects * 1_000_000:>10.1f} "
+              f"{peak / 1024:>10.0f} {peak / objects:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
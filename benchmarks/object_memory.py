@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Benchmark how much memory each game object takes up.
+
+Instantiates a large number of objects of every class in the GameObject hierarchy and reports the bytes each one
+adds according to tracemalloc, along with the size of the bare instance. The objects share their descriptions,
+synonyms and adjectives so the numbers are the per object overhead a generated world pays for every object it
+loads, plus its unique key.
+
+Every class is also measured unslotted, through a subclass that shadows the inherited slots so its objects keep
+their attributes in a __dict__ the way the hierarchy did before it declared __slots__, and the bytes saved by the
+slots are reported next to it. The pointer the subclass's objects still hold for each hidden slot is left out of
+its numbers.
+
+Results can be saved as a JSON baseline and later runs compared against it, the comparison exits with status 1 if
+any class got bigger by more than the tolerance, i.e. because an attribute was added without a matching __slots__
+entry and the class grew a __dict__ again.
+
+Usage:
+    python benchmarks/object_memory.py [--objects 100000] [--save-baseline benchmarks/object_memory_baseline.json]
+    python benchmarks/object_memory.py --compare benchmarks/object_memory_baseline.json [--tolerance 0.1]
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import struct
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from texticular.character import NPC, Player
+from texticular.game_enums import Flags
+from texticular.game_object import GameObject
+from texticular.items.story_item import Container, Inventory, ItemPrototype, StackableItem, StoryItem
+from texticular.rooms.exit import RoomExit
+from texticular.rooms.room import Room
+from texticular.world import World
+
+DESCRIPTIONS = {"Main": "Something generated.", "Examine": "It looks generated up close too."}
+SYNONYMS = ["Widget", "Thing"]
+ADJECTIVES = ["Shiny", "Generated"]
+POINTER_BYTES = struct.calcsize("P")
+PROTOTYPE = ItemPrototype("bench-coin", "Coin", DESCRIPTIONS, SYNONYMS, ADJECTIVES, flags=[Flags.TAKEBIT])
+
+# class name >> (the class, callable building the i-th object of a class)
+FACTORIES = {
+    "GameObject": (GameObject, lambda cls, i: cls(f"bench-object-{i}", "Object", DESCRIPTIONS, "bench-room-0")),
+    "StoryItem": (StoryItem, lambda cls, i: cls(f"bench-item-{i}", "Widget", DESCRIPTIONS, SYNONYMS, ADJECTIVES,
+                                                location_key="bench-room-0", flags=[Flags.TAKEBIT])),
+    "StackableItem": (StackableItem, lambda cls, i: cls(PROTOTYPE, f"bench-coin-{i}", "bench-room-0")),
+    "Container": (Container, lambda cls, i: cls(f"bench-container-{i}", "Box", DESCRIPTIONS, SYNONYMS, ADJECTIVES,
+                                                location_key="bench-room-0")),
+    "Inventory": (Inventory, lambda cls, i: cls(f"bench-inventory-{i}", "Bag", DESCRIPTIONS, SYNONYMS,
+                                                location_key="bench-room-0")),
+    "Room": (Room, lambda cls, i: cls(f"bench-room-{i + 1}", "Room", DESCRIPTIONS)),
+    "RoomExit": (RoomExit, lambda cls, i: cls(f"bench-exit-{i}", "Door", DESCRIPTIONS, "bench-room-0",
+                                              "bench-room-0")),
+    "Player": (Player, lambda cls, i: cls(f"bench-player-{i}", "Player", DESCRIPTIONS, location_key="bench-room-0")),
+    "NPC": (NPC, lambda cls, i: cls(f"bench-npc-{i}", "Janitor", DESCRIPTIONS, location_key="bench-room-0",
+                                    synonyms=SYNONYMS, adjectives=ADJECTIVES)),
+}
+
+
+def slot_names(cls: type) -> set:
+    """Return the names of the slots a class and its bases declare, other than __weakref__"""
+    return {slot for klass in cls.__mro__ for slot in klass.__dict__.get("__slots__", ()) if slot != "__weakref__"}
+
+
+def unslotted(cls: type) -> type:
+    """Return a subclass of cls whose objects keep their attributes in a __dict__ instead of its slots
+
+    A plain class attribute named like a slot hides the slot's descriptor, so setting the attribute on an instance
+    puts it in the instance's __dict__ like a class without __slots__ would.
+    """
+    return type(f"Unslotted{cls.__name__}", (cls,), dict.fromkeys(slot_names(cls)))
+
+
+def measure(cls: type, factory, count: int, unused_bytes: int = 0) -> dict:
+    """Build `count` objects of a class with the factory in a fresh world and return the bytes traced per object and
+    the bare instance size, less `unused_bytes` each object holds but a class without them wouldn't"""
+    objects = []
+    with World():
+        # the room everything is located in, characters look their location up when they are created
+        Room("bench-room-0", "Room", DESCRIPTIONS)
+        gc.collect()
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        for i in range(count):
+            objects.append(factory(cls, i))
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    instance = objects[0]
+    instance_bytes = sys.getsizeof(instance) - unused_bytes
+    if hasattr(instance, "__dict__"):
+        instance_bytes += sys.getsizeof(instance.__dict__)
+    return {
+        "bytes_per_object": (after - before) / count - unused_bytes,
+        "instance_bytes": instance_bytes,
+        "has_dict": hasattr(instance, "__dict__"),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Return a description of every class whose objects grew by more than tolerance relative to the baseline"""
+    regressions = []
+    for name, result in results.items():
+        old = baseline["results"].get(name, {}).get("bytes_per_object")
+        if not old:
+            continue
+        change = (result["bytes_per_object"] - old) / old
+        if change > tolerance:
+            regressions.append(f"{name}: {old:.0f} -> {result['bytes_per_object']:.0f} bytes ({change:+.0%})")
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--objects", type=int, default=100000, help="objects instantiated per class")
+    arg_parser.add_argument("--classes", nargs="+", choices=list(FACTORIES), default=list(FACTORIES),
+                            help="only measure these classes")
+    arg_parser.add_argument("--save-baseline", metavar="PATH", help="write the results to a JSON baseline")
+    arg_parser.add_argument("--compare", metavar="PATH", help="compare the results to a JSON baseline")
+    arg_parser.add_argument("--tolerance", type=float, default=0.1,
+                            help="fraction an object may grow by before the comparison fails")
+    args = arg_parser.parse_args()
+
+    results = {}
+    print(f"{args.objects} objects per class")
+    print(f"{'class':>13} {'bytes/object':>14} {'instance':>10} {'__dict__':>9} "
+          f"{'unslotted':>10} {'instance':>10} {'saved':>7}")
+    for name in args.classes:
+        cls, factory = FACTORIES[name]
+        results[name] = measure(cls, factory, args.objects)
+        # the unslotted subclass still holds a pointer for every slot it hides, a class without slots wouldn't
+        unslotted_result = measure(unslotted(cls), factory, args.objects, len(slot_names(cls)) * POINTER_BYTES)
+        result = results[name]
+        result["unslotted_bytes_per_object"] = unslotted_result["bytes_per_object"]
+        saved = 1 - result["bytes_per_object"] / unslotted_result["bytes_per_object"]
+        print(f"{name:>13} {result['bytes_per_object']:>14.1f} {result['instance_bytes']:>10} "
+              f"{'yes' if result['has_dict'] else 'no':>9} {unslotted_result['bytes_per_object']:>10.1f} "
+              f"{unslotted_result['instance_bytes']:>10} {saved:>7.0%}")
+
+    if args.save_baseline:
+        baseline = {
+            "objects": args.objects,
+            "python": platform.python_version(),
+            "results": results,
+        }
+        with open(args.save_baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Baseline written to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("Regressions against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"No regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark how Parser.parse_input latency scales with the number of game objects.
+
+Builds synthetic worlds of 50 up to 50,000 story items and times a fixed set of commands against each one.
+With the noun phrase trie the per command latency should stay flat as the world grows. The memory column is
+what the parser's lookup structures cost on top of the game objects themselves, spelling indexes included, and the
+typo column how long correcting a misspelled command takes once the parser is built.
+
+Usage:
+    python benchmarks/parser_scaling.py [--repeat 2000]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from texticular.command_parser import Parser
+from texticular.items.story_item import StoryItem
+from texticular.game_enums import Flags
+
+WORLD_SIZES = [50, 500, 5_000, 50_000]
+
+NOUNS = ["lamp", "key", "coin", "note", "book", "box", "cup", "rope", "sword", "shoe",
+         "hat", "map", "ring", "bell", "jar", "sock", "brush", "comb", "spoon", "plate"]
+ADJECTIVES = ["red", "blue", "green", "old", "new", "tiny", "huge", "dirty", "shiny", "broken",
+              "brass", "wooden", "sticky", "purple", "golden", "rusty", "crusty", "funny", "lumpy", "dusty"]
+
+
+def build_world(size: int, rng: random.Random) -> dict:
+    """Create `size` story items with three adjectives and two synonyms each, keyed uniquely per world size"""
+    game_objects = {}
+    for index in range(size):
+        key_value = f"bench{size}-item{index}"
+        noun = rng.choice(NOUNS)
+        game_objects[key_value] = StoryItem(
+            key_value=key_value,
+            name=noun.title(),
+            descriptions={"Main": f"A perfectly ordinary {noun}."},
+            synonyms=[noun, f"{noun}{index}"],
+            adjectives=rng.sample(ADJECTIVES, 3),
+            location_key="nowhereLand",
+            flags=[Flags.TAKEBIT]
+        )
+    return game_objects
+
+
+def measure_parser_memory(game_objects: dict) -> int:
+    """Return the number of bytes allocated while building a parser for the given objects"""
+    tracemalloc.start()
+    parser = Parser(game_objects=game_objects)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return allocated
+
+
+def time_parser(parser: Parser, commands: list, repeat: int) -> float:
+    """Return the median latency of parse_input in microseconds"""
+    samples = []
+    for _ in range(repeat):
+        for command in commands:
+            start = time.perf_counter()
+            parser.parse_input(command)
+            samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1_000_000
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--repeat", type=int, default=2000, help="times each command is parsed per world size")
+    args = arg_parser.parse_args()
+
+    rng = random.Random(1995)
+    print(f"{'objects':>8} {'build (s)':>10} {'memory (KB)':>12} {'typo (us)':>10} {'median parse (us)':>18}")
+    print("-" * 62)
+    for size in WORLD_SIZES:
+        game_objects = build_world(size, rng)
+        first = game_objects[f"bench{size}-item0"]
+        last = game_objects[f"bench{size}-item{size - 1}"]
+        commands = [
+            f"take the {' '.join(first.adjectives)} {first.synonyms[0]}",
+            f"look at {last.synonyms[1]}",
+            f"put {first.synonyms[1]} in the {last.adjectives[0]} {last.synonyms[0]}",
+            "take the nonexistent thingamajig",
+            "look",
+        ]
+
+        start = time.perf_counter()
+        # the parse cache would answer every repeat, time the actual parsing
+        parser = Parser(game_objects=game_objects, cache_size=0)
+        build_seconds = time.perf_counter() - start
+
+        memory = measure_parser_memory(game_objects)
+        latency = time_parser(parser, commands, args.repeat)
+        # a misspelled verb and a misspelled squashed adjective and synonym, corrected against the built indexes
+        typo = f"exmaine the {first.adjectives[0]}{first.synonyms[0][:-1]}"
+        typo_latency = time_parser(parser, [typo], 1)
+        print(f"{size:>8} {build_seconds:>10.3f} {memory / 1024:>12.0f} {typo_latency:>10.0f} {latency:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Benchmark Parser.parse_input throughput, latency and allocations against the real game world.
+
+Loads the game, builds a synthetic command corpus out of the parser's verbs and prepositions and the story items'
+synonyms and adjectives, then parses it with the parse cache turned off so every command does the full amount of
+work. Reports commands per second, p50/p95/p99 latency and what each command allocates according to tracemalloc.
+
+Results can be saved as a JSON baseline and later runs compared against it, the comparison exits with status 1 if
+any metric got worse by more than the tolerance, so a regression in command_parser.py fails the run.
+
+Usage:
+    python benchmarks/parser_throughput.py [--commands 20000] [--save-baseline benchmarks/parser_baseline.json]
+    python benchmarks/parser_throughput.py --compare benchmarks/parser_baseline.json [--tolerance 0.25]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from texticular.command_parser import Parser
+from texticular.game_loader import load_game_map
+from texticular.game_object import GameObject
+from texticular.items.story_item import StoryItem
+
+# metric >> True if bigger is better, used when comparing against a baseline
+METRICS = {
+    "commands_per_second": True,
+    "p50_us": False,
+    "p95_us": False,
+    "p99_us": False,
+    "peak_bytes_per_command": False,
+    "retained_blocks_per_command": False,
+}
+
+
+def build_corpus(parser: Parser, size: int, rng: random.Random) -> list:
+    """Make `size` commands in the shapes players type, out of the world's vocabulary
+
+    Roughly a fifth of the commands are bare verbs, the rest name one or two story items with a random selection of
+    their adjectives, some of them misspelled or pointing at things that don't exist, so the miss paths get exercised
+    along with the hits.
+    """
+    verbs = [verb for verb in parser.verbs.verb_names if verb is not None]
+    prepositions = list(parser.prepositions)
+    items = [game_object for game_object in GameObject.objects_by_key.values()
+             if isinstance(game_object, StoryItem) and game_object.synonyms]
+
+    def noun_phrase() -> str:
+        item = rng.choice(items)
+        adjectives = rng.sample(item.adjectives, rng.randint(0, len(item.adjectives)))
+        return " ".join(["the"] + adjectives + [rng.choice(item.synonyms)]).lower()
+
+    corpus = []
+    for _ in range(size):
+        verb = rng.choice(verbs)
+        shape = rng.random()
+        if shape < 0.2:
+            command = verb
+        elif shape < 0.6:
+            command = f"{verb} {noun_phrase()}"
+        elif shape < 0.85:
+            command = f"{verb} {noun_phrase()} {rng.choice(prepositions)} {noun_phrase()}"
+        elif shape < 0.95:
+            # drop a letter from the noun to exercise typo correction
+            phrase = noun_phrase()
+            cut = rng.randrange(len(phrase))
+            command = f"{verb} {phrase[:cut]}{phrase[cut + 1:]}"
+        else:
+            command = f"{verb} the nonexistent thingamajig"
+        corpus.append(command)
+    return corpus
+
+
+def measure_latency(parser: Parser, corpus: list) -> dict:
+    """Parse the whole corpus once and return throughput and latency percentiles"""
+    samples = []
+    start = time.perf_counter()
+    for command in corpus:
+        command_start = time.perf_counter()
+        parser.parse_input(command)
+        samples.append(time.perf_counter() - command_start)
+    elapsed = time.perf_counter() - start
+
+    percentiles = statistics.quantiles(samples, n=100)
+    return {
+        "commands_per_second": len(corpus) / elapsed,
+        "p50_us": percentiles[49] * 1_000_000,
+        "p95_us": percentiles[94] * 1_000_000,
+        "p99_us": percentiles[98] * 1_000_000,
+    }
+
+
+def measure_allocations(parser: Parser, corpus: list) -> dict:
+    """Return the average peak bytes allocated while parsing a command and the memory blocks each result keeps alive
+
+    tracemalloc can't count every malloc, so this reports the two numbers it can: the high water mark of each parse
+    (which grows with every temporary list and string) and the blocks still allocated for the ParseTree afterwards.
+    """
+    results = []
+    peak_total = 0
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for command in corpus:
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        results.append(parser.parse_input(command))
+        _, peak = tracemalloc.get_traced_memory()
+        peak_total += peak - current
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    retained = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    return {
+        "peak_bytes_per_command": peak_total / len(corpus),
+        "retained_blocks_per_command": retained / len(corpus),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Return a description of every metric that regressed by more than tolerance relative to the baseline"""
+    regressions = []
+    for metric, higher_is_better in METRICS.items():
+        old, new = baseline["results"].get(metric), results[metric]
+        if not old:
+            continue
+        change = (new - old) / old
+        if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+            regressions.append(f"{metric}: {old:.2f} -> {new:.2f} ({change:+.0%})")
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--manifest", default="GameConfigManifest.json",
+                            help="game manifest to load the world from, relative to the data directory")
+    arg_parser.add_argument("--commands", type=int, default=20000, help="size of the synthetic command corpus")
+    arg_parser.add_argument("--allocation-sample", type=int, default=2000,
+                            help="commands parsed under tracemalloc, it slows parsing down too much for the whole run")
+    arg_parser.add_argument("--seed", type=int, default=1995, help="seed for the corpus so runs are comparable")
+    arg_parser.add_argument("--save-baseline", metavar="PATH", help="write the results to a JSON baseline")
+    arg_parser.add_argument("--compare", metavar="PATH", help="compare the results to a JSON baseline")
+    arg_parser.add_argument("--tolerance", type=float, default=0.25,
+                            help="fraction a metric may get worse by before the comparison fails")
+    args = arg_parser.parse_args()
+
+    load_game_map(args.manifest)
+    parser = Parser(game_objects=GameObject.objects_by_key, cache_size=0)
+    corpus = build_corpus(parser, args.commands, random.Random(args.seed))
+
+    # warm up so the first few hundred commands don't pay for imports and lazily built structures
+    for command in corpus[:500]:
+        parser.parse_input(command)
+
+    results = measure_latency(parser, corpus)
+    results.update(measure_allocations(parser, corpus[:args.allocation_sample]))
+
+    print(f"{len(corpus)} commands, {len(parser.verbs)} verb phrases, {len(GameObject.objects_by_key)} game objects")
+    for metric in METRICS:
+        print(f"{metric:>28}: {results[metric]:>12.2f}")
+
+    if args.save_baseline:
+        baseline = {
+            "commands": args.commands,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "results": results,
+        }
+        with open(args.save_baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Baseline written to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("Regressions against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"No regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
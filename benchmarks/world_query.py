@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark World.query against scanning the whole registry.
+
+Generates a world of rooms full of items, a few of them open containers and a few NPCs, then times the questions
+game logic asks ("all NPCs", "all takeable items in nowhereLand", "all open containers in this room") answered by
+World.query and by the isinstance/flag scans over every object they replace. The query times should stay well under
+the scans however big the world gets.
+
+Usage:
+    python benchmarks/world_query.py [--objects 100000] [--repeat 50]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from texticular.character import NPC
+from texticular.game_enums import Flags
+from texticular.items.story_item import Container, StoryItem
+from texticular.rooms.room import Room
+from texticular.world import World
+
+DESCRIPTIONS = {"Main": "Something generated."}
+
+
+def build_world(size: int, rng: random.Random) -> World:
+    """Return a world with `size` objects spread over rooms of about a hundred objects each"""
+    world = World()
+    with world:
+        Room("nowhereLand", "Nowhere", DESCRIPTIONS)
+        rooms = [Room(f"bench-room-{i}", "Room", DESCRIPTIONS).key_value for i in range(max(1, size // 100))]
+        for i in range(size):
+            location_key = "nowhereLand" if rng.random() < 0.05 else rng.choice(rooms)
+            kind = rng.random()
+            if kind < 0.01:
+                NPC(f"bench-npc-{i}", "Janitor", DESCRIPTIONS, location_key=location_key)
+            elif kind < 0.1:
+                flags = [Flags.CONTAINERBIT, Flags.OPENBIT] if rng.random() < 0.5 else [Flags.CONTAINERBIT]
+                Container(f"bench-box-{i}", "Box", DESCRIPTIONS, ["Box"], location_key=location_key, flags=flags)
+            else:
+                flags = [Flags.TAKEBIT] if rng.random() < 0.7 else []
+                StoryItem(f"bench-item-{i}", "Thing", DESCRIPTIONS, ["Thing"], location_key=location_key,
+                          flags=flags)
+    return world
+
+
+def time_call(call, repeat: int) -> tuple:
+    """Return the average microseconds a call took and how many objects it found"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        found = call()
+    return (time.perf_counter() - start) / repeat * 1_000_000, len(found)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--objects", type=int, default=100000, help="objects in the generated world")
+    arg_parser.add_argument("--repeat", type=int, default=50, help="times each question is asked")
+    arg_parser.add_argument("--seed", type=int, default=1995, help="seed for generating the world")
+    args = arg_parser.parse_args()
+
+    world = build_world(args.objects, random.Random(args.seed))
+    objects = world.objects_by_key
+    open_container = Flags.CONTAINERBIT | Flags.OPENBIT
+    questions = {
+        "all NPCs": (
+            lambda: world.query(type=NPC),
+            lambda: [game_object for game_object in objects.values() if isinstance(game_object, NPC)]),
+        "TAKEBIT items in nowhereLand": (
+            lambda: world.query(flags=Flags.TAKEBIT, location="nowhereLand"),
+            lambda: [game_object for game_object in objects.values()
+                     if game_object.location_key == "nowhereLand" and Flags.TAKEBIT in game_object.flags]),
+        "open containers in a room": (
+            lambda: world.query(flags=open_container, location="bench-room-0"),
+            lambda: [game_object for game_object in objects.values()
+                     if game_object.location_key == "bench-room-0" and open_container in game_object.flags]),
+        "closed containers": (
+            lambda: world.query(flags=Flags.CONTAINERBIT, not_flags=Flags.OPENBIT),
+            lambda: [game_object for game_object in objects.values()
+                     if Flags.CONTAINERBIT in game_object.flags and Flags.OPENBIT not in game_object.flags]),
+    }
+
+    print(f"{len(world)} objects")
+    print(f"{'question':>30} {'found':>7} {'query µs':>10} {'scan µs':>10}")
+    for name, (query, scan) in questions.items():
+        query_us, found = time_call(query, args.repeat)
+        scan_us, scanned = time_call(scan, args.repeat)
+        assert found == scanned, f"{name}: query found {found}, the scan {scanned}"
+        print(f"{name:>30} {found:>7} {query_us:>10.1f} {scan_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -33,9 +33,10 @@ def take(controller: Controller):
     if item.is_present(controller.player.location):
         if Flags.TAKEBIT in item.flags:
 
+            holder_key = item.location_key  # the room or container it's taken from, add_item moves it
             item_taken = inventory.add_item(item)
             if item_taken:
-                controller.player.location.remove_item(item)
+                controller.player.location.remove_item(item, holder_key)
                 item.move(inventory.location_key)
                 item.current_description = "Main"
                 controller.response.append("Taken.")
@@ -56,12 +57,35 @@ def take(controller: Controller):
         return False
 
 
+def take_all(controller: Controller):
+    """Take several items at once ("take all", "take them") as one batched move into the inventory"""
+    inventory = controller.player.inventory
+    location = controller.player.location
+    items = [item for item in controller.tokens.direct_objects
+             if item not in inventory.items and Flags.TAKEBIT in item.flags and item.is_present(location)]
+    if not items:
+        controller.response.append("There's nothing here you can take.")
+        return False
+
+    holder_keys = {item.location_key for item in items}  # add_items moves what it takes into the inventory
+    taken = inventory.add_items(items)
+    location.remove_items(taken, holder_keys)
+    for item in taken:
+        item.move(inventory.location_key)
+        item.current_description = "Main"
+    if taken:
+        controller.response.append(f"Taken: {', '.join(item.name for item in taken)}.")
+    for item in items:
+        if item not in taken:
+            controller.response.append(f"The {item.name} won't fit in your {inventory.name}!")
+    return bool(taken)
+
+
 def drop(controller: Controller):
     item = controller.tokens.direct_object
     inventory = controller.player.inventory
     if inventory.remove_item(item):
-        item.move(controller.player.location_key)
-        controller.player.location.items.append(item)
+        controller.player.location.add_item(item)
         item.current_description = "Dropped" if item.descriptions.get("Dropped") else "Main"
         controller.response.append("Dropped it like it's hot.")
         return True
@@ -69,6 +93,20 @@ def drop(controller: Controller):
         controller.response.append(f"You don't have a {item.name} to drop.")
         return False
 
+def drop_all(controller: Controller):
+    """Drop several carried items at once ("drop all except note", "drop them") as one batched move"""
+    inventory = controller.player.inventory
+    dropped = inventory.remove_items(controller.tokens.direct_objects)
+    if not dropped:
+        controller.response.append("You aren't carrying anything to drop.")
+        return False
+
+    controller.player.location.add_items(dropped)
+    for item in dropped:
+        item.current_description = "Dropped" if item.descriptions.get("Dropped") else "Main"
+    controller.response.append(f"Dropped: {', '.join(item.name for item in dropped)}.")
+    return True
+
 def open(controller: Controller):
     target = controller.tokens.direct_object
     target_key = controller.get_game_object(target.key_object)
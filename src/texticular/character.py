@@ -7,16 +7,33 @@ from texticular.game_enums import Flags, Directions
 
 
 class Character(GameObject):
+    __slots__ = ("hp", "sex", "inventory", "location")
+
     def __init__(self, key_value: str, name: str, descriptions: dict, sex: str = "?", hp: int = 100,
                  inventory: Inventory = None, location_key: str = None, flags: list = None):
         super().__init__(key_value, name, descriptions, location_key, flags)
         self.hp = hp
         self.sex = sex
         self.inventory = inventory
-        self.location = GameObject.objects_by_key.get(self.location_key)
+        self.location = self.world.lookup(self.location_key)
+
+    def capture_state(self) -> tuple:
+        return super().capture_state() + (self.hp,)
+
+    def restore_state(self, state: tuple):
+        self.hp = state[5]
+        super().restore_state(state)
+        self.location = self.world.lookup(self.location_key)
+
+    def apply_change(self, attribute: str, value, replaced):
+        super().apply_change(attribute, value, replaced)
+        if attribute == "location_key":
+            self.location = self.world.lookup(self.location_key)
 
 
 class Player(Character):
+    __slots__ = ("hpoo", "money")
+
     def __init__(self, key_value: str, name: str, descriptions: dict, sex: str = "?", hp: int = 100, hpoo: int = 80,
                  inventory: Inventory = None, location_key: str = None, flags: list = None, money: float = 0.00):
         self.hpoo = hpoo
@@ -40,13 +57,15 @@ class Player(Character):
         -------
 
         """
-        target_location = GameObject.objects_by_key.get(location_key)
+        target_location = self.world.lookup(location_key)
         if target_location:
             # player location changed
             # call rooms action routine
             # call describers
             self.location_key = location_key
             self.location = target_location
+            self.world.record(self.location, "times_visited", self.location.times_visited,
+                              self.location.times_visited + 1)
             self.location.times_visited += 1
             self.location.action("M-ENTER")
             return self.location.describe()
@@ -71,7 +90,7 @@ class Player(Character):
 
         """
         # print("do walk called")
-        obj = GameObject.objects_by_key[self.location_key]
+        obj = self.world.objects_by_key[self.location_key]
         if isinstance(obj, Room):
             room = obj
             exit = room.exits.get(direction)
@@ -81,7 +100,7 @@ class Player(Character):
                     #Everything is good move the player
                     return self.go_to(exit.connection)
                 else:
-                    key = GameObject.objects_by_key.get(exit.key_object)
+                    key = self.world.lookup(exit.key_object)
                     key_name = (" ".join(key.adjectives) + " " + key.name).strip()
                     for item in self.inventory.items:
                         if item == exit.key_object:
@@ -119,10 +138,18 @@ class Player(Character):
             "inventory": self.inventory.encode_tojson(self.inventory)
         }
     
+    def capture_state(self) -> tuple:
+        return super().capture_state() + (self.hpoo, getattr(self, 'money', 0.00))
+
+    def restore_state(self, state: tuple):
+        self.hpoo, self.money = state[6:8]
+        super().restore_state(state)
+
     def add_money(self, amount: float):
         """Add money to the player's wallet."""
         if not hasattr(self, 'money'):
             self.money = 0.00
+        self.world.record(self, "money", self.money, self.money + amount)
         self.money += amount
         
     def spend_money(self, amount: float) -> bool:
@@ -130,6 +157,7 @@ class Player(Character):
         if not hasattr(self, 'money'):
             self.money = 0.00
         if self.money >= amount:
+            self.world.record(self, "money", self.money, self.money - amount)
             self.money -= amount
             return True
         return False
@@ -144,6 +172,8 @@ class Player(Character):
 
 
 class NPC(Character):
+    __slots__ = ("synonyms", "adjectives", "dialogue_file")
+
     def __init__(self, key_value: str, name: str, descriptions: dict, location_key: str = None, 
                  flags: list = None, synonyms: list = None, adjectives: list = None, 
                  dialogue_file: str = None):
@@ -1,8 +1,16 @@
-import re
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from texticular.game_loader import load_game_map
-from texticular.game_enums import Directions
+from texticular.game_enums import Directions, TokenKinds
 from texticular.game_object import GameObject
+from texticular.world import World
 from texticular.items.story_item import  StoryItem
+from texticular.vocabulary import NounPhraseIndex, VerbTrie
+from texticular.lexer import Lexer
+from texticular.parse_cache import ParseCache
+from texticular.syntax import OBJECT, SyntaxTable, parse_shape
 from texticular.globals import *
 
 
@@ -18,13 +26,37 @@ class Parser:
 
     Attributes
     ----------
+    game_objects: dict
+        key_value >> GameObject for the objects the parser resolves nouns to. Either a dict or a World, in which
+        case its objects_by_key
     actions: list
         the list of known verbs passed in to the parser at initialization
     prepositions: list
-        hard coded list of prepositions to be used in identifying indirect objects
+        prepositions used in identifying indirect objects, PREPOSITIONS plus any introduced by register_syntax
         Example: Get the lamp on the table
         ('the' is an article, 'on' is a preposition. Once the articles are removed,
         the indirect object appears directly after the preposition)
+    verbs: VerbTrie
+        every verb phrase the parser understands compiled to canonical integer IDs: the known verbs, the single verb
+        commands, the controller's command table (see register_commands) and any per-object command tables
+    syntax: SyntaxTable
+        the sentence shapes each verb accepts compiled into automata, matching a command's shape also resolves the
+        handler the controller runs for it
+    noun_index: NounPhraseIndex
+        synonym and adjective tries used to resolve the noun phrases that name game objects. When the parser is
+        built from a World (or GameObject.objects_by_key, the active world's registry) it subscribes to the world's
+        registry, so objects spawned, renamed or deleted during play are picked up one at a time instead of
+        rebuilding the whole index
+    cache: ParseCache
+        recently parsed commands, parse_input answers repeats with a copy of the cached ParseTree. Cleared whenever
+        the verbs or the noun index change. Commands using "it" or "them" are never cached
+    last_object_key: str
+        the object the last successful command was about, what "it" refers to
+    last_object_keys: list
+        the objects the last successful command was about, what "them" refers to
+    pending: ParseTree
+        the last command if it named an object ambiguously ("take key" with a brass and a master key in scope), the
+        next input is first read as the answer to "Which do you mean?" and completes this tree
 
 
     Methods
@@ -35,26 +67,149 @@ class Parser:
 
     get_verb(parse_tree): Search for the Verb in the parsed tokens.
 
-    get_possible_matches(synonyms, adjectives): Generate all possible combinations of synonyms and adjectives.
+    register_commands(commands): Merge a verb phrase >> handler table into the verb trie.
+
+    register_syntax(syntax): Compile ZIL style syntax entries ("put OBJECT in OBJECT") into the syntax table.
+
+    find_game_object(remaining_input): Resolve the noun phrase at the start of the input to a game object key.
+
+    find_candidates(remaining_input): Every in scope object the noun phrase at the start of the input could mean.
+
+    resolve_pending(user_input): Read the input as the answer to the pending "Which do you mean?" question.
+
+    find_game_objects(remaining_input): Resolve "it", "them" and "all except ..." to the game object keys they mean.
 
     parse_input(user_input): Parse the player input and create a ParseTree object with relevant information.
+
+    parse_uncached(user_input): parse_input without consulting the cache.
+
+    parse_many(commands): Lazily parse a stream of commands, optionally fanned out over a process pool.
+
+    split_commands(user_input): Split chained input ("open drawer, take plugs then go east") into single commands.
     """
 
-    def __init__(self, game_objects: dict, known_verbs: list = KNOWN_VERBS):
+    def __init__(self, game_objects, known_verbs: list = KNOWN_VERBS, cache_size: int = 256):
+        world = None
+        if isinstance(game_objects, World):
+            world, game_objects = game_objects, game_objects.objects_by_key
+        elif game_objects is World.active.objects_by_key:
+            world = World.active
+        self.game_objects = game_objects
+        self.cache = ParseCache(cache_size)
+        self.last_object_key = None
+        self.last_object_keys = []
+        self.pending = None
         self.actions = known_verbs
-        self.prepositions = PREPOSITIONS
+        self.prepositions = list(PREPOSITIONS)
+        self.verbs = VerbTrie(list(known_verbs) + SINGLE_VERB_COMMANDS)
+        self.lexer = Lexer(self.verbs, prepositions=self.prepositions)
+        self.syntax = SyntaxTable(PREPOSITIONS)
 
-        self.game_objects = {}
-        for k, v in game_objects.items():
-            if isinstance(v, StoryItem):
-                self.game_objects [k] = self.get_possible_matches(v.synonyms, v.adjectives)
-            else:
-                self.game_objects [k] = [v.name.lower()]
+        self.noun_index = NounPhraseIndex()
+        for game_object in game_objects.values():
+            self.index_game_object(game_object)
+
+        if world is not None:
+            world.subscribe(self.on_registry_event)
+
+    def index_game_object(self, game_object: GameObject):
+        """
+        Add the words the player can use to refer to a game object to the noun index.
+
+        Args:
+            game_object (GameObject): Story items are indexed by synonyms and adjectives, everything else by name.
+        """
+        if isinstance(game_object, StoryItem):
+            self.noun_index.add(game_object.key_value, game_object.synonyms, game_object.adjectives)
+        else:
+            self.noun_index.add(game_object.key_value, [game_object.name])
+
+        # objects can carry their own command tables, i.e. {"turn on": tv.turn_on, "change channel": ...}
+        object_commands = getattr(game_object, "commands", None)
+        if isinstance(object_commands, dict):
+            # the object runs these itself, they are only verbs as far as the parser is concerned
+            self.register_commands(object_commands, bind_handlers=False)
+
+    def register_commands(self, commands: dict, bind_handlers: bool = True):
+        """
+        Merge a command table into the verb trie so every phrase in it is recognized as a verb.
+
+        Phrases that map to the same handler are aliases and share a canonical verb ID, i.e. "get" and "take"
+        both map to verb_actions.take.
+
+        Args:
+            commands (dict): verb phrase >> handler, like Controller.commands.
+            bind_handlers (bool): Record the handlers in the syntax table, so parsing a command resolves the handler
+                                  to run along with the verb.
+        """
+        canonical_phrases = {}
+        for phrase, handler in commands.items():
+            canonical = canonical_phrases.setdefault(id(handler), phrase)
+            verb_id = self.verbs.add(phrase, canonical)
+            if bind_handlers:
+                self.syntax.handlers[verb_id] = handler
+        self.cache.clear()
+
+    def register_syntax(self, syntax: dict):
+        """
+        Compile ZIL style syntax entries into the syntax table.
+
+        Each entry is a verb followed by prepositions and OBJECT slots, mapped to the handler for sentences of that
+        shape: {"ask OBJECT about OBJECT": verb_actions.talk}. Verbs and prepositions the parser doesn't know yet are
+        added to the vocabulary.
+
+        Args:
+            syntax (dict): syntax entry >> handler, like Controller.syntax.
+        """
+        for pattern, handler in syntax.items():
+            verb, shape = parse_shape(pattern, self.verbs)
+            verb_id = self.verbs.add(verb)
+            self.syntax.handlers.setdefault(verb_id, handler)
+            for word in shape:
+                if word != OBJECT and word not in self.prepositions:
+                    self.prepositions.append(word)
+                    self.lexer.add_preposition(word)
+            self.syntax.add(verb_id, shape, handler)
+        self.cache.clear()
+
+    def on_registry_event(self, event: str, game_object: GameObject, detail=None):
+        """
+        Keep the noun index in step with the registry of the world the parser was built from.
+
+        Args:
+            event (str): "add", "remove" and "rename" are applied to the index, moves and flag changes are ignored.
+            game_object (GameObject): The object that was added, removed or renamed.
+            detail: Unused, see GameObject.subscribe.
+        """
+        if event in ("remove", "rename"):
+            self.noun_index.remove(game_object.key_value)
+        if event in ("add", "rename"):
+            self.index_game_object(game_object)
+        if event in ("add", "remove", "rename"):
+            self.cache.clear()
+
+    def split_commands(self, user_input: str) -> list:
+        """
+        Split chained input into the commands it is made of, separated by , . ; "then" or "and then".
+
+        The commands are returned as text rather than parsed, each one should be parsed just before it runs since
+        the earlier ones can change what is in scope ("open drawer, take plugs").
+
+        Args:
+            user_input (str): The raw player input.
+
+        Returns:
+            list: The commands in the order they were typed.
+        """
+        return self.lexer.split_commands(user_input)
 
     def tokenize(self, user_input: str):
         """
         Tokenize the user input into a list of parsed tokens.
 
+        The lexer splits and classifies the input in one pass, the ParseTree keeps the whole TokenStream and its
+        word list doubles as the tokens.
+
         Args:
             user_input (str): The player's input string.
 
@@ -63,12 +218,8 @@ class Parser:
         """
         parse_tree = ParseTree()
         parse_tree.unparsed_input = user_input
-        # To split a string with multiple delimiters in Python, use the re.split() method.
-        # The re.split() function splits the string by each occurrence of the pattern
-        delimiters = "[\s,!\.\?]"
-        parse_tree.tokens = re.split(delimiters, parse_tree.unparsed_input.lower())
-        # split on the delimiters and remove any empty entries
-        parse_tree.tokens  = [token.strip() for token in parse_tree.tokens if token]
+        parse_tree.token_stream = self.lexer.lex(user_input)
+        parse_tree.tokens = parse_tree.token_stream.words
         return parse_tree
 
 
@@ -76,137 +227,239 @@ class Parser:
         """
         Search for a recognized verb in the parsed tokens and update the ParseTree with the verb.
 
+        The longest verb phrase wins ("wipe off" over "wipe") and is found in a single pass over the tokens. If no
+        verb matches, a misspelled first word is corrected to the closest verb ("exmaine" >> "examine") and the
+        tokens are updated to match.
+
         Args:
             parse_tree (ParseTree): The ParseTree object containing the parsed tokens.
 
         Returns:
             int: The offset indicating where the verb was found in the tokens. Returns -1 if no verb is found.
         """
-        offset = -1
-
-        for index, part in enumerate(parse_tree.tokens):
-            command_name = " ".join(parse_tree.tokens[0:index + 1])
-            if command_name in self.actions:
-                parse_tree.action = command_name
-                offset = index + 1
+        verb_id, offset = self.verbs.match(parse_tree.tokens)
+        if verb_id is None and parse_tree.tokens and parse_tree.token_stream.kinds[0] is TokenKinds.WORD:
+            typed = parse_tree.tokens[0]
+            corrected = self.verbs.spelling.correct(typed)
+            if corrected is not None:
+                parse_tree.tokens[0] = corrected
+                parse_tree.token_stream.kinds[0] = TokenKinds.VERB
+                parse_tree.corrections.append((typed, corrected))
+                verb_id, offset = self.verbs.match(parse_tree.tokens)
+        if verb_id is None:
+            return -1
+        parse_tree.action = " ".join(parse_tree.tokens[0:offset])
+        parse_tree.verb_id = verb_id
         return offset
 
-    def expand_adjectives(self, adjective_list):
+    def find_game_object(self, remaining_input, scope=None, corrections=None):
         """
-        Generate all possible combinations of adjectives given a list of adjectives containig 0-3 elements.
+        Resolve the noun phrase at the start of the remaining input to a game object key.
+
+        The longest phrase wins ("night stand drawer" over "night stand") and the lookup walks the noun index one
+        token at a time, so its cost depends on the length of the input rather than the number of game objects.
+        Only when nothing matches are misspelled words corrected ("nighstand" >> "nightstand") for a second try.
 
         Args:
-            adjective_list (list): A list of adjectives to be combined max len = 3.
+            remaining_input (list): The tokens left over after the verb (and any preposition) has been removed.
+            scope (Scope): Only resolve to objects the player can currently refer to. None searches the whole world.
+            corrections (list): If given, (typed, corrected) pairs are appended for any words that were corrected.
 
         Returns:
-            list: A list containing individual adjectives and all possible combinations
-                  of adjectives from the input list.
+            str: The key of the matched game object or None if the tokens don't start with a known noun phrase.
+        """
+        candidates = self.find_candidates(remaining_input, scope, corrections)
+        return candidates[0] if candidates else None
 
-        Example:
-            >>> input_array = ["Tiny", "Sour", "Yellow"]
-            >>> result = expand_adjectives(input_array)
-            >>> print(result)
-            ['Sour', 'Sour Tiny', 'Sour Tiny Yellow', 'Sour Yellow', 'Sour Yellow Tiny', 'Tiny', 'Tiny Sour',
-            'Tiny Sour Yellow', 'Tiny Yellow', 'Tiny Yellow Sour', 'Yellow', 'Yellow Sour',
-            'Yellow Sour Tiny', 'Yellow Tiny', 'Yellow Tiny Sour']
+    def find_candidates(self, remaining_input, scope=None, corrections=None):
         """
-        combinations = []
+        Find every object the noun phrase at the start of the remaining input could refer to.
 
-        for i in range(len(adjective_list)):
-            # Add individual adjective
-            combinations.append(adjective_list[i])
+        The noun index already knows which objects share a synonym, so a phrase only one object answers to costs a
+        single lookup. Only with a scope are the others narrowed down to the objects in it that own every adjective
+        typed, the whole world is full of doors and keys the player can't be talking about.
 
-            for j in range(i + 1, len(adjective_list)):
-                # Combine with the next adjective
-                combinations.append(f"{adjective_list[i]} {adjective_list[j]}")
-                combinations.append(f"{adjective_list[j]} {adjective_list[i]}")
+        Args:
+            remaining_input (list): The tokens left over after the verb (and any preposition) has been removed.
+            scope (Scope): Only resolve to objects the player can currently refer to. None returns the first match.
+            corrections (list): If given, (typed, corrected) pairs are appended for any words that were corrected.
 
-                for k in range(j + 1, len(adjective_list)):
-                    # Combine with the next adjective again
-                    combinations.append(f"{adjective_list[i]} {adjective_list[j]} {adjective_list[k]}")
-                    combinations.append(f"{adjective_list[i]} {adjective_list[k]} {adjective_list[j]}")
-                    combinations.append(f"{adjective_list[j]} {adjective_list[i]} {adjective_list[k]}")
-                    combinations.append(f"{adjective_list[j]} {adjective_list[k]} {adjective_list[i]}")
-                    combinations.append(f"{adjective_list[k]} {adjective_list[i]} {adjective_list[j]}")
-                    combinations.append(f"{adjective_list[k]} {adjective_list[j]} {adjective_list[i]}")
+        Returns:
+            list: The matching keys in registration order, more than one if the phrase is ambiguous, empty if the
+                  tokens don't start with a known noun phrase.
+        """
+        candidates = self._match_candidates(remaining_input, scope)
+        if not candidates and remaining_input:
+            corrected = self.noun_index.correct(remaining_input)
+            if corrected is not None:
+                candidates = self._match_candidates(corrected, scope)
+                if candidates and corrections is not None:
+                    corrections.extend((typed, word) for typed, word in zip(remaining_input, corrected)
+                                       if typed != word)
+        return candidates
+
+    def _match_candidates(self, tokens, scope=None):
+        """Return the keys the noun phrase at the start of tokens matches, only the first one without a scope"""
+        if scope is None:
+            object_key, _ = self.noun_index.match(tokens)
+            return [object_key] if object_key is not None else []
+        return self.noun_index.match_all(tokens, scope=scope)[0]
+
+
+    def find_game_objects(self, remaining_input, scope=None):
+        """
+        Resolve a pronoun or "all" at the start of the remaining input to the game object keys it stands for.
 
-        return sorted(combinations)
+        "it" is the object the last successful command was about and "them" the whole group, both without touching
+        the noun index. "all" (or "everything") is every object in scope other than the room, the player and their
+        inventory, less any noun phrases listed after "except" or "but": "drop all except the note and the key".
+        Without a scope "all" doesn't refer to anything.
 
-    def get_possible_matches(self, synonyms, adjectives):
+        Args:
+            remaining_input (list): The tokens of the direct or indirect object phrase.
+            scope (Scope): Only resolve to objects the player can currently refer to.
+
+        Returns:
+            list: The matching keys, possibly empty, or None if the input doesn't start with a pronoun or "all" and
+                  should be looked up as a noun phrase instead.
+        """
+        if not remaining_input:
+            return None
+        word = remaining_input[0]
+        if word == "it":
+            keys = [self.last_object_key] if self.last_object_key is not None else []
+        elif word == "them":
+            keys = list(self.last_object_keys)
+        elif word in ALL_WORDS:
+            if scope is None:
+                return []
+            excluded = set()
+            if len(remaining_input) > 1 and remaining_input[1] in EXCEPT_WORDS:
+                phrase = []
+                for token in remaining_input[2:] + ["and"]:
+                    if token != "and":
+                        phrase.append(token)
+                        continue
+                    excluded.add(self.find_game_object(phrase, scope))
+                    phrase = []
+            return self.noun_index.in_registration_order(scope.item_keys() - excluded)
+        else:
+            return None
+        if scope is not None:
+            keys = [key for key in keys if key in scope]
+        return keys
+
+    def parse_game_objects(self, remaining_input, parse_tree, scope=None) -> bool:
         """
-        Generate all possible combinations of synonyms and adjectives.
+        Match the words after the verb against the verb's sentence shapes and resolve the noun phrases in it.
 
         Args:
-            synonyms (list): A list of synonyms.
-            adjectives (list): A list of adjectives.
+            remaining_input (list): The tokens after the verb, articles removed.
+            parse_tree (ParseTree): Gets the handler, preposition and direct and indirect object keys.
+            scope (Scope): Only resolve to objects the player can currently refer to.
 
         Returns:
-            list: A list containing all possible combinations of adjectives and synonyms.
-
-        Example:s
-            >>> synonyms = ["Ear Plugs"]
-            >>> adjectives = ["Crusty", "Yellow"]
-            >>> matches = self.get_possible_matches(synonyms, adjectives)
-            >>> print(matches)
-            ['Crusty Ear Plugs', 'Crusty Yellow Ear Plugs', 'Yellow Ear Plugs', 'Yellow Crusty Ear Plugs']
-        """
-        expanded_adjectives = self.expand_adjectives(adjectives)
-        if expanded_adjectives:
-            matches = []
-            for adj in expanded_adjectives:
-                for syn in synonyms:
-                    # Add spaced version (existing behavior)
-                    matches.append(f'{adj} {syn}')
-                    # Add concatenated version (new functionality)
-                    concatenated = f'{adj}{syn}'.replace(' ', '')
-                    matches.append(concatenated)
-            matches.extend(synonyms)
+            bool: False if the sentence doesn't fit any shape the verb accepts, or stops where the shape still expects
+                  a noun phrase, in which case the response asks for it ("Put it in what?").
+        """
+        match = self.syntax.match(parse_tree.verb_id, remaining_input, self.prepositions)
+        if match is None:
+            return False
+        if not match.complete:
+            words = [parse_tree.action.capitalize()] + (["it"] if match.objects else []) + match.prepositions[-1:]
+            parse_tree.response = f"{' '.join(words)} what?"
+            return False
+        parse_tree.handler = match.handler
+        parse_tree.preposition = match.prepositions[0] if match.prepositions else None
+        direct_objects = match.objects[0] if match.objects else []
+        secondary_objects = match.objects[1] if len(match.objects) > 1 else []
+
+        direct_object_keys = self.find_game_objects(direct_objects, scope)
+        if direct_object_keys is None:
+            parse_tree.direct_object_key = self.resolve_phrase(direct_objects, "direct_object_key", parse_tree, scope)
         else:
-            matches = synonyms
-        return [m.lower() for m in matches]
-
+            parse_tree.direct_object_keys = direct_object_keys
+            parse_tree.direct_object_key = direct_object_keys[0] if direct_object_keys else None
 
-    def find_game_object(self, remaining_input):
-        for index, part in enumerate(remaining_input):
-            object_name = " ".join(remaining_input[0:index + 1])
-            # print(object_name)
-            for object_key, possible_matches in self.game_objects.items():
-                # print(possible_matches)
-                if object_name.lower() in possible_matches:
-                    return object_key
+        indirect_object_keys = self.find_game_objects(secondary_objects, scope)
+        if indirect_object_keys is None:
+            parse_tree.indirect_object_key = self.resolve_phrase(secondary_objects, "indirect_object_key",
+                                                                 parse_tree, scope)
+        else:
+            parse_tree.indirect_object_key = indirect_object_keys[0] if indirect_object_keys else None
 
+        return True
 
-    def parse_game_objects(self, remaining_input, parse_tree):
-        direct_objects = []
-        secondary_objects = []
+    def resolve_phrase(self, phrase, slot, parse_tree, scope=None):
+        """
+        Resolve a noun phrase to a key, recording it in parse_tree.ambiguities if several objects fit.
 
-        # Find a preposition if it exists
-        preps = [word for word in remaining_input if word in self.prepositions]
-        preposition_count = len(preps)
+        Args:
+            phrase (list): The tokens of the noun phrase.
+            slot (str): The ParseTree attribute the key belongs in, "direct_object_key" or "indirect_object_key".
+            parse_tree (ParseTree): Gets any corrections and ambiguities.
+            scope (Scope): Only resolve to objects the player can currently refer to.
 
-        # bail out, syntax only allows for one preposition at this time
-        if len(preps) > 1:
-            return preposition_count
+        Returns:
+            str: The first matching key, a guess if the phrase was ambiguous, or None if nothing matched.
+        """
+        candidates = self.find_candidates(phrase, scope, parse_tree.corrections)
+        if len(candidates) > 1:
+            parse_tree.ambiguities = parse_tree.ambiguities + [(slot, candidates, phrase)]
+        return candidates[0] if candidates else None
+
+    def which_do_you_mean(self, parse_tree) -> str:
+        """Return the question asking the player to pick between the candidates of the first ambiguity"""
+        _, candidates, _ = parse_tree.ambiguities[0]
+        names = []
+        for key in candidates:
+            game_object = self.game_objects.get(key)
+            name = getattr(game_object, "descriptive_name", None) or getattr(game_object, "name", None) or key
+            names.append(f"the {name.lower()}")
+        return f"Which do you mean, {', '.join(names[:-1])} or {names[-1]}?"
+
+    def resolve_pending(self, user_input):
+        """
+        Read the input as the answer to the pending "Which do you mean?" question.
 
-        if len(preps) == 1:
-            # prepostion found
-            preposition_index = remaining_input.index(preps[0])
-            secondary_objects = remaining_input[preposition_index + 1:]
-            direct_objects = remaining_input[0:preposition_index]
+        The answer only has to tell the candidates apart: "the master key", "master" and "the master one" all pick
+        the master key out of a brass and a master key. The pending ParseTree is completed rather than the original
+        command being parsed again.
 
-            if not direct_objects:
-                direct_objects = secondary_objects
-                secondary_objects = []
-            # print(secondary_objects)
-            # print(direct_objects)
+        Args:
+            user_input (str): The raw player input.
 
+        Returns:
+            ParseTree: The pending tree, asking about the next ambiguity or parsed if none are left, or None if the
+                       input isn't an answer (it starts with a verb or names none of the candidates) and should be
+                       parsed as a new command.
+        """
+        parse_tree = self.pending
+        stream = self.lexer.lex(user_input)
+        answer = [word for word, kind in zip(stream.words, stream.kinds)
+                  if kind is not TokenKinds.ARTICLE and word not in ("one", "ones")]
+        if not answer or stream.kinds[0] is TokenKinds.VERB:
+            return None
+
+        slot, candidates, phrase = parse_tree.ambiguities[0]
+        keys, _ = self.noun_index.match_all(answer, scope=set(candidates))
+        if not keys:
+            keys, _ = self.noun_index.match_all(answer + list(phrase), scope=set(candidates))
+        if not keys:
+            return None
+        if len(keys) == 1:
+            setattr(parse_tree, slot, keys[0])
+            # cached copies share the list, so replace it rather than popping from it
+            parse_tree.ambiguities = parse_tree.ambiguities[1:]
         else:
-            direct_objects = remaining_input
-
-        parse_tree.direct_object_key = self.find_game_object(direct_objects)
-        parse_tree.indirect_object_key = self.find_game_object(secondary_objects)
+            parse_tree.ambiguities = [(slot, keys, phrase)] + parse_tree.ambiguities[1:]
 
-        return preposition_count
+        if parse_tree.ambiguities:
+            parse_tree.response = self.which_do_you_mean(parse_tree)
+        else:
+            parse_tree.input_parsed = True
+            parse_tree.response = f"Command: <{parse_tree.unparsed_input}> parsed."
+        return parse_tree
 
     def valid_direction(self, remaining_input: list, parse_tree):
         direction_name = "".join(remaining_input).upper()
@@ -217,7 +470,147 @@ class Parser:
             return False
         return True
 
-    def parse_input(self, user_input):
+    def parse_input(self, user_input, scope=None):
+        """
+        Parse the player input into a ParseTree, reusing the result of an earlier identical command when possible.
+
+        Commands are matched case and whitespace insensitively against the parse cache, a hit returns a copy of the
+        cached ParseTree so the caller is free to fill in direct_object and friends.
+
+        Args:
+            user_input (str): The raw player input.
+            scope (Scope): The objects the player can currently refer to, nouns are only resolved against these.
+                           None resolves against every object the parser knows about.
+
+        Returns:
+            ParseTree: The parsed command, check input_parsed and response to see whether it made sense.
+        """
+        if self.pending is not None:
+            parse_tree = self.resolve_pending(user_input)
+            if parse_tree is not None:
+                if not parse_tree.ambiguities:
+                    self.pending = None
+                    self.remember_objects(parse_tree)
+                return parse_tree
+            self.pending = None
+
+        key = self.cache.make_key(user_input, scope)
+        cached = self.cache.get(key)
+        if cached is not None:
+            parse_tree = cached.copy(user_input)
+        else:
+            parse_tree = self.parse_uncached(user_input, scope)
+            # what a pronoun means depends on the commands before it, not just the input and the scope
+            if TokenKinds.PRONOUN not in parse_tree.token_stream.kinds:
+                self.cache.put(key, parse_tree.copy(user_input))
+        if parse_tree.ambiguities:
+            self.pending = parse_tree
+        self.remember_objects(parse_tree)
+        return parse_tree
+
+    def remember_objects(self, parse_tree):
+        """
+        Remember what a successfully parsed command was about, for "it" and "them" in the next one.
+
+        Args:
+            parse_tree (ParseTree): The parsed command.
+        """
+        if not parse_tree.input_parsed or not isinstance(parse_tree.direct_object_key, str):
+            return
+        if len(parse_tree.direct_object_keys) > 1:
+            self.last_object_keys = list(parse_tree.direct_object_keys)
+        else:
+            self.last_object_key = parse_tree.direct_object_key
+            self.last_object_keys = [parse_tree.direct_object_key]
+
+    def parse_many(self, commands, scope=None, processes: int = 0, parser_factory=None, chunk_size: int = 512):
+        """
+        Parse a stream of commands, yielding a ParseTree for each one in order.
+
+        Meant for replaying logs (see gameplay_logger.iter_logged_commands) against grammar changes. Commands are
+        pulled from the iterable a chunk at a time and results are yielded as they are ready, so memory stays flat
+        however many commands there are. Identical commands (ignoring case and spacing) in a chunk are only parsed
+        once.
+
+        Every command is parsed on its own, the same whether it's parsed here or in a worker: "it" and "them" don't
+        refer to earlier commands, answers to "Which do you mean?" aren't taken as answers, and the parser's own
+        pronoun and pending question state is neither used nor changed.
+
+        Args:
+            commands (iterable): The raw commands to parse.
+            scope (Scope): Resolve nouns against this scope, only supported when parsing in this process.
+            processes (int): Fan the work out over this many worker processes, 0 parses in this process.
+            parser_factory (callable): Required with processes, a picklable callable that builds the Parser each
+                                       worker uses, i.e. loads the game map and returns a Parser for the registry.
+            chunk_size (int): How many commands are handed to a worker at a time.
+
+        Yields:
+            ParseTree: The parse of each command, in the order the commands were given.
+        """
+        if not processes:
+            commands = iter(commands)
+            while True:
+                chunk = list(islice(commands, chunk_size))
+                if not chunk:
+                    return
+                parsed = {}
+                for user_input in chunk:
+                    key = ParseCache.make_key(user_input, scope)
+                    parse_tree = parsed.get(key)
+                    if parse_tree is None:
+                        parse_tree = parsed[key] = self._parse_detached(user_input, scope)
+                    yield parse_tree.copy(user_input)
+
+        if parser_factory is None:
+            raise ValueError("parse_many needs a parser_factory to build the parser in each worker process")
+        if scope is not None:
+            raise ValueError("parse_many can't resolve against a scope in worker processes")
+
+        # workers are spawned rather than forked so they start with an empty object registry the factory can load
+        # the game into, a forked worker would inherit ours and every key would be a duplicate
+        commands = iter(commands)
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(processes, mp_context=context, initializer=_init_parse_worker,
+                                 initargs=(parser_factory,)) as pool:
+            pending = deque()
+            while True:
+                # keep a couple of chunks per worker in flight, enough to stay busy without reading ahead
+                while len(pending) < processes * 2:
+                    chunk = list(islice(commands, chunk_size))
+                    if not chunk:
+                        break
+                    unique = {}
+                    for user_input in chunk:
+                        unique.setdefault(ParseCache.make_key(user_input), user_input)
+                    pending.append((chunk, list(unique), pool.submit(_parse_chunk, list(unique.values()))))
+                if not pending:
+                    return
+                chunk, keys, future = pending.popleft()
+                parsed = dict(zip(keys, future.result()))
+                for user_input in chunk:
+                    yield parsed[ParseCache.make_key(user_input)].copy(user_input)
+
+    def _parse_detached(self, user_input, scope=None):
+        """Parse a command without the pronouns of the commands before it, as a parse_many worker would"""
+        remembered = self.last_object_key, self.last_object_keys
+        self.last_object_key, self.last_object_keys = None, []
+        try:
+            return self.parse_uncached(user_input, scope)
+        finally:
+            self.last_object_key, self.last_object_keys = remembered
+
+    def parse_uncached(self, user_input, scope=None):
+        """
+        Parse the player input into a ParseTree without consulting the parse cache.
+
+        Args:
+            user_input (str): The raw player input.
+            scope (Scope): The objects the player can currently refer to, nouns are only resolved against these.
+                           None resolves against every object the parser knows about.
+
+        Returns:
+            ParseTree: The parsed command, check input_parsed and response to see whether it made sense.
+        """
         parse_tree = self.tokenize(user_input)
         if len(parse_tree.tokens) == 0:
             parse_tree.response = "Command is Empty"
@@ -231,13 +624,21 @@ class Parser:
 
         # The rest of the input after the verb has been extracted
         # Remove articles
-        remaining_input = [token for token in parse_tree.tokens[verb_offset:] if token not in ["a", "an", "the"]]
+        stream = parse_tree.token_stream
+        remaining_input = [word for word, kind in zip(stream.words[verb_offset:], stream.kinds[verb_offset:])
+                           if kind is not TokenKinds.ARTICLE]
 
-        preposition_count = self.parse_game_objects(remaining_input, parse_tree)
+        if not self.parse_game_objects(remaining_input, parse_tree, scope):
+            if parse_tree.response:
+                return parse_tree
+            if sum(1 for token in remaining_input if token in self.prepositions) > 1:
+                parse_tree.response = "I'm not smart enough to understand more than one preposition per command."
+            else:
+                parse_tree.response = f"I only understood you as far as wanting to {parse_tree.action}."
+            return parse_tree
 
-        if preposition_count > 1:
-            # exit early shouldn't have more than one preposition in a command
-            parse_tree.response = "I'm not smart enough to understand more than one preposition per command."
+        if parse_tree.ambiguities:
+            parse_tree.response = self.which_do_you_mean(parse_tree)
             return parse_tree
 
         if parse_tree.action and parse_tree.direct_object_key is None:
@@ -264,6 +665,16 @@ class Parser:
                 parse_tree.input_parsed = True
                 return parse_tree
 
+            elif remaining_input[0] in PRONOUNS:
+                parse_tree.response = f"I'm not sure what '{remaining_input[0]}' refers to."
+                parse_tree.input_parsed = False
+                return parse_tree
+
+            elif remaining_input[0] in ALL_WORDS:
+                parse_tree.response = f"There's nothing here to {parse_tree.action}."
+                parse_tree.input_parsed = False
+                return parse_tree
+
             else:
                 #a direct object wasn't found but the user attempted to provide one
                 obj = ' '.join(remaining_input)
@@ -279,6 +690,19 @@ class Parser:
 
 
 
+# the parser each parse_many worker process builds once with the caller's parser_factory
+_worker_parser = None
+
+
+def _init_parse_worker(parser_factory):
+    global _worker_parser
+    _worker_parser = parser_factory()
+
+
+def _parse_chunk(commands: list) -> list:
+    return [_worker_parser.parse_uncached(user_input) for user_input in commands]
+
+
 class ParseTree:
     """
     A class representing the parsed result of a player's input.
@@ -286,8 +710,19 @@ class ParseTree:
     Attributes:
         unparsed_input (str): The original unparsed player input.
         tokens (list): The parsed tokens of the player input.
+        token_stream (TokenStream): The tokens along with their kinds and offsets in the input.
         action (str): The recognized action (verb) from the input.
+        verb_id (int): The canonical ID of the action, aliases like "get" and "take" share an ID.
+        handler (callable): The action the controller should run, resolved from the syntax table.
+        preposition (str): The first preposition in the command, i.e. "in" for "put the key in the box".
+        corrections (list): (typed, corrected) pairs for any misspelled words the parser corrected.
+        ambiguities (list): (slot, candidate keys, phrase) for every noun phrase more than one object in scope
+                            answers to, slot being "direct_object_key" or "indirect_object_key". The command isn't
+                            parsed until the player has picked one for each.
         direct_object_key: (str) The key of the direct object.
+        direct_object_keys: (list) Every direct object key when the command was about several objects ("all",
+                            "them"), direct_object_key is the first of them.
+        direct_objects: (list) The game objects for direct_object_keys, filled in by the controller.
         indirect_object_key: (str) The key of the indirect object.
         input_parsed (bool): A flag indicating if the input was successfully parsed.
         response (str): A response explaining the parsing result.
@@ -295,14 +730,41 @@ class ParseTree:
     def __init__(self):
         self.unparsed_input = None
         self.tokens = []
+        self.token_stream = None
         self.action = None
+        self.verb_id = None
+        self.handler = None
+        self.preposition = None
+        self.corrections = []
+        self.ambiguities = []
         self.direct_object_key = None
         self.direct_object = None
+        self.direct_object_keys = []
+        self.direct_objects = []
         self.indirect_object_key = None
         self.indirect_object = None
         self.input_parsed = False
         self.response = None
 
+    def copy(self, user_input: str = None):
+        """
+        Return a shallow copy of the parse tree, used to hand out cached parses.
+
+        Args:
+            user_input (str): The input the copy is for. When it differs from the cached input (i.e. in case or
+                              spacing) any response quoting the command quotes the new input instead.
+
+        Returns:
+            ParseTree: A new tree, the token lists are shared and must not be modified.
+        """
+        clone = ParseTree()
+        clone.__dict__.update(self.__dict__)
+        if user_input is not None and user_input != self.unparsed_input:
+            clone.unparsed_input = user_input
+            if self.response and self.unparsed_input:
+                clone.response = self.response.replace(self.unparsed_input, user_input)
+        return clone
+
     def __repr__(self):
         return f"""
         Parse Tree
@@ -310,6 +772,7 @@ class ParseTree:
         unparsed_input: {self.unparsed_input}
         tokens: {str(self.tokens)}
         action: {self.action}
+        verb_id: {self.verb_id}
         direct_object_key: {self.direct_object_key}
         indirect_object_key:  {self.indirect_object_key}
         input_parsed: {str(self.input_parsed)}
@@ -5,12 +5,16 @@ from texticular.game_object import GameObject
 from texticular.rooms.room import Room
 from texticular.game_enums import Directions
 from texticular.character import Player,NPC
+from collections import deque
 from dataclasses import dataclass
 from texticular.game_enums import GameStates
 from texticular.command_parser import Parser, ParseTree
+from texticular.scope import Scope
 from texticular.ui.ascii_ui import ASCIIGameUI, GameState
 from texticular.gameplay_logger import get_logger
 from texticular.npc_manager import get_npc_manager
+from texticular.journal import Journal
+from texticular.items.vending_machine import VendingMachine
 import texticular.globals as g
 
 
@@ -23,17 +27,26 @@ class Controller:
     #         cls.instance = super(Controller, cls).__new__(cls, gamemap, player)
     #     return cls.instance
 
-    def __init__(self, gamemap: dict[str, Room], player: Player):
+    def __init__(self, gamemap: dict[str, Room], player: Player, journal_path: str = None):
         self.gamemap = gamemap
         self.commands = {}
+        self.bulk_commands = {}
+        self.syntax = {}
         self.player_input_history = []
-        self.globals = {}
+        self.world = player.world
+        self.globals = self.world.globals
+        # every change the game makes from here on, so turns can be undone and redone
+        self.journal = Journal(self.world, journal_path)
         self.response = []
         self.set_commands()
         self.gamestate = GameStates.EXPLORATION
         self.player = player
-        self.parser = Parser(game_objects=GameObject.objects_by_key)
+        self.parser = Parser(game_objects=self.world)
+        self.parser.register_commands(self.commands)
+        self.parser.register_syntax(self.syntax)
+        self.scope = Scope(player)
         self.tokens = ParseTree()
+        self.command_queue = deque()
         self.ui = ASCIIGameUI()
         self.turn_count = 0
         self.score = 0
@@ -134,7 +147,10 @@ class Controller:
 
         if isinstance(tokens.direct_object_key, Directions):
             # print("is instance of direction")
-            return self.commands[verb](controller=self)
+            return tokens.handler(controller=self)
+
+        if len(tokens.direct_objects) > 1:
+            return self.handle_multiple_objects()
 
 
         logger = logging.getLogger(__name__)
@@ -155,20 +171,50 @@ class Controller:
                 if target_object.action(controller=self, target=target_object):
                     return True
 
-        # fall through to the most generic verb response
+        # Objects can carry their own command tables, i.e. Television.commands["turn on"]
+        if direct_object and verb in (getattr(self.tokens.direct_object, "commands", None) or {}):
+            self.response.append(self.tokens.direct_object.commands[verb]())
+            return True
+
+        # fall through to the most generic verb response, the parser already resolved it from the syntax table
         logger.debug(f"Generic verb handler: {verb}")
-        if verb in self.commands:
-            return self.commands[verb](controller=self)
+        if tokens.handler is not None:
+            return tokens.handler(controller=self)
         else:
             self.response.append(f"I don't know how to '{verb}' yet.")
             return False
     
+    def handle_multiple_objects(self) -> bool:
+        """Carry out a command about several objects ("take all", "drop them") as a single turn.
+
+        Verbs in bulk_commands handle the whole group at once, any other verb is run for each object in turn.
+        """
+        tokens = self.tokens
+        if tokens.action in self.bulk_commands:
+            return self.bulk_commands[tokens.action](controller=self)
+
+        game_objects = tokens.direct_objects
+        direct_object, direct_object_key = tokens.direct_object, tokens.direct_object_key
+        tokens.direct_objects = []
+        handled = False
+        try:
+            for game_object in game_objects:
+                tokens.direct_object = game_object
+                tokens.direct_object_key = game_object.key_value
+                self.response.append(f"{game_object.name}:")
+                handled = self.handle_input() or handled
+        finally:
+            # put the tokens back even if a handler raised, they're still the parse of the whole command
+            tokens.direct_objects = game_objects
+            tokens.direct_object, tokens.direct_object_key = direct_object, direct_object_key
+        return handled
+
     def handle_vending_machine_input(self) -> bool:
         """Handle input when the player is interacting with the vending machine."""
         # Find the active vending machine
         vending_machine = None
-        for obj in GameObject.objects_by_key.values():
-            if hasattr(obj, 'is_active') and obj.is_active:
+        for obj in self.world.query(type=VendingMachine):
+            if obj.is_active:
                 vending_machine = obj
                 break
         
@@ -182,7 +228,7 @@ class Controller:
         return vending_machine.handle_vending_input(self)
 
     def get_game_object(self, key_value: str) -> GameObject:
-        game_object = GameObject.objects_by_key.get(key_value)
+        game_object = self.world.lookup(key_value)
         return game_object
 
     def get_input(self):
@@ -191,16 +237,23 @@ class Controller:
         self.user_input = self.user_input.strip()
         self.response = []
 
-    def parse(self) ->bool:
-        self.tokens = self.parser.parse_input(self.user_input)
+    def parse(self, command: str = None) ->bool:
+        self.scope.refresh()
+        self.tokens = self.parser.parse_input(self.user_input if command is None else command, self.scope)
         return self.tokens.input_parsed
 
     def update(self):
+        # whatever changed since the last input belongs to the previous turn
+        self.journal.commit()
+
         # Handle quit commands first (before any parsing)
         if self.user_input.lower().strip() in ['quit', 'exit', 'q']:
             self.response = ["Thanks for playing! Goodbye!"]
             self.render_game_screen()
             return False  # Signal to exit game loop
+
+        if self.user_input.lower().strip() in ['undo', 'redo']:
+            return self.undo(redo=self.user_input.lower().strip() == 'redo')
         
         # Handle special game states first (bypass parser)
         if self.gamestate == GameStates.VENDING_MACHINE:
@@ -212,8 +265,41 @@ class Controller:
             self.clocker()
             return
         
-        # Normal parsing for exploration mode
-        parse_success = self.parse()
+        # Normal parsing for exploration mode, chained commands ("open drawer, take plugs then go east") all run
+        # this update and share a single render and log flush
+        self.command_queue.extend(self.parser.split_commands(self.user_input) or [self.user_input])
+        with self.logger.batch():
+            while self.command_queue:
+                parse_success = self.run_command(self.command_queue.popleft())
+                # stop at the first command that fails or that drops the player into a menu or conversation
+                if not parse_success or self.gamestate != GameStates.EXPLORATION:
+                    self.command_queue.clear()
+
+        return True  # Continue game loop by default
+
+    def undo(self, redo: bool = False) -> bool:
+        """Take back the changes the last turn made to the world, or with redo put back the last turn taken back
+
+        Returns True to keep the game loop going like update().
+        """
+        if redo:
+            done = self.journal.redo()
+            self.response = ["Turn redone."] if done else ["There's nothing to redo."]
+        else:
+            done = self.journal.undo()
+            self.response = ["Previous turn undone."] if done else ["There's nothing to undo."]
+        if done:
+            self.response.extend(self.player.location.describe())
+        return True
+
+    def run_command(self, command: str) -> bool:
+        """Parse and carry out a single command, logging it along with the response.
+
+        Returns True if the command was understood.
+        """
+        # earlier commands in the chain have already put their responses in self.response
+        first_response = len(self.response)
+        parse_success = self.parse(command)
         
         if parse_success:
             logger = logging.getLogger(__name__)
@@ -221,11 +307,13 @@ class Controller:
             
             self.tokens.direct_object = self.get_game_object(self.tokens.direct_object_key)
             self.tokens.indirect_object = self.get_game_object(self.tokens.indirect_object_key)
+            if len(self.tokens.direct_object_keys) > 1:
+                self.tokens.direct_objects = [self.get_game_object(key) for key in self.tokens.direct_object_keys]
             
             # Safe debug logging that handles directions
             direct_obj_method = "N/A (Direction)" if isinstance(self.tokens.direct_object_key, Directions) else (
-                GameObject.objects_by_key.get(self.tokens.direct_object_key).action_method_name 
-                if GameObject.objects_by_key.get(self.tokens.direct_object_key) else "None"
+                self.world.lookup(self.tokens.direct_object_key).action_method_name 
+                if self.world.lookup(self.tokens.direct_object_key) else "None"
             )
             
             logger.debug(f"Player: {self.player.location.name}, Room method: {self.player.location.action_method_name}, Object method: {direct_obj_method}")
@@ -234,7 +322,7 @@ class Controller:
 
         else:
             logger = logging.getLogger(__name__)
-            self.response = [self.tokens.response]
+            self.response.append(self.tokens.response)
             logger.debug(f"Parse failed: {self.tokens}")
             logger.debug(f"Player location: {self.player.location.name}")
         
@@ -242,7 +330,7 @@ class Controller:
         response_text = ""
         if self.response:
             if isinstance(self.response, list):
-                response_text = " ".join([str(r) for r in self.response])
+                response_text = " ".join([str(r) for r in self.response[first_response:]])
             else:
                 response_text = str(self.response)
         
@@ -257,13 +345,13 @@ class Controller:
         
         # Log the command
         self.logger.log_command(
-            command=self.user_input,
+            command=command,
             parse_success=parse_success,
             response=response_text,
             game_state=game_state
         )
         
-        return True  # Continue game loop by default
+        return parse_success
 
     def handle_direct_dialogue_input(self):
         """Handle input for direct dialogue graphs (like the genie)."""
@@ -482,12 +570,8 @@ class Controller:
         """Initialize NPCs from character data."""
         from texticular.character import NPC
         
-        # Find all NPCs in the global object registry (loaded from JSON)
-        npcs = {key: obj for key, obj in GameObject.objects_by_key.items() 
-                if isinstance(obj, NPC)}
-        
-        # Register each NPC with the NPC manager
-        for npc_key, npc in npcs.items():
+        # Register each NPC in the world (loaded from JSON) with the NPC manager
+        for npc in self.world.query(type=NPC):
             self.npc_manager.register_npc(npc)
             self.logger.log_event("npc_registered", {"name": npc.name, "location": npc.location_key})
     
@@ -531,6 +615,18 @@ class Controller:
         self.commands["break"] = va.break_object
         self.commands["smash"] = va.break_object
 
+        # ZIL style syntax entries, sentence shapes beyond VERB OBJECT (PREPOSITION OBJECT) and the action they run
+        self.syntax["ask OBJECT about OBJECT"] = va.talk
+        self.syntax["talk to OBJECT"] = va.talk
+        self.syntax["speak to OBJECT"] = va.talk
+        self.syntax["put OBJECT in OBJECT"] = va.put
+        self.syntax["put OBJECT on OBJECT"] = va.put
+
+        # verbs that handle "all" / "them" as one batched operation instead of once per object
+        self.bulk_commands["get"] = va.take_all
+        self.bulk_commands["take"] = va.take_all
+        self.bulk_commands["drop"] = va.drop_all
+
 
 
 
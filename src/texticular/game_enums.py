@@ -1,4 +1,4 @@
-from enum import Enum, auto
+from enum import Enum, IntFlag, auto
 
 class Directions(Enum):
     NORTH = 1
@@ -20,10 +20,22 @@ class GameStates(Enum):
     VENDING_MACHINE = 3
     GAMEOVER = 4
 
-class Flags(Enum):
+class TokenKinds(Enum):
+    """The lexical category the lexer assigns to each word of player input"""
+    VERB = 1
+    ARTICLE = 2
+    PREPOSITION = 3
+    DIRECTION = 4
+    WORD = 5
+    PRONOUN = 6
+
+class Flags(IntFlag):
     """
     Enum representing various object attributes that can be added to or removed from an objects "flags" array
 
+    Every member is a single bit, so several flags combine into one integer mask that can be tested in a single AND:
+    Flags.CONTAINERBIT | Flags.OPENBIT in container.flags
+
     Members
     --------------
     TAKEBIT:
@@ -88,6 +100,82 @@ class Flags(Enum):
     KLUDGEBIT = auto()
 
 
+class FlagSet:
+    """The flags set on a game object, stored as one integer bitmask
+
+    Behaves like the set of Flags members it replaces: `Flags.OPENBIT in flags`, len() and iteration all work, and
+    containment also accepts a combined mask (true only if every bit in it is set) or a flag name. Membership is a
+    single AND instead of hashing an enum member.
+
+    Attributes
+    ----------
+    bits: int
+        The bitmask of every flag set
+    """
+    __slots__ = ("bits",)
+
+    def __init__(self, flags=()):
+        self.bits = FlagSet.mask(flags)
+
+    @staticmethod
+    def mask(flags) -> int:
+        """Return the bitmask for a Flags member, a mask, a FlagSet or an iterable of members and flag names
+
+        Raises
+        ------
+        ValueError
+            If a name isn't a member of Flags, i.e. a typo in the game data
+        """
+        if isinstance(flags, FlagSet):
+            return flags.bits
+        if isinstance(flags, int):
+            return int(flags)
+        bits = 0
+        for flag in flags:
+            if isinstance(flag, str):
+                member = Flags.__members__.get(flag)
+                if member is None:
+                    raise ValueError(f"Flag {flag} does not exist in game_enums.Flags.")
+                flag = member
+            bits |= flag._value_
+        return bits
+
+    def __contains__(self, flag) -> bool:
+        try:
+            value = flag._value_
+        except AttributeError:
+            if isinstance(flag, int):
+                value = flag
+            else:
+                member = Flags.__members__.get(flag)
+                if member is None:
+                    return False
+                value = member._value_
+        return self.bits & value == value
+
+    def any(self, flags) -> bool:
+        """Return True if at least one of the flags in the mask is set"""
+        return bool(self.bits & FlagSet.mask(flags))
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def __iter__(self):
+        """Yield the Flags members that are set, in the order Flags declares them"""
+        bits = self.bits
+        return (flag for flag in Flags if bits & flag._value_)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (FlagSet, set, frozenset)):
+            return self.bits == FlagSet.mask(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"FlagSet({[flag.name for flag in self]})"
+
+
 if __name__ == "__main__":
     for direction in Directions:
         print(direction)
@@ -12,6 +12,8 @@ from texticular.items.vending_machine import VendingMachine
 from texticular.rooms.room import Room
 from texticular.rooms.exit import  RoomExit
 from texticular.character import Player, NPC
+from texticular.world import World
+from texticular.string_table import StringTable
 import inspect
 
 
@@ -65,9 +67,10 @@ def encode_to_json(game_objects: dict, save_file_name: str, root_element_name: s
         json.dump(json_document, jsonfile, indent=4)
 
 
-def load_json(json_file_path):
+def load_json(json_file_path, strings: StringTable = None):
+    """Read a JSON config file, interning its strings in a StringTable if one is given"""
     with open(json_file_path) as json_file:
-        config = json.load(json_file)
+        config = json.load(json_file, object_hook=strings.intern_record if strings is not None else None)
     return config
 
 def generate_game_object_flags(flag_list=None):
@@ -106,13 +109,15 @@ def decode_container_fromjson(dct):
     constructed_container.examine_description = dct["examineDescription"]
     constructed_container.action_method_name = dct["actionMethod"]
 
-    #Add the items to the container
-    for keyval in dct["itemKeyValues"]:
-        constructed_container.add_item(GameObject.objects_by_key.get(keyval))
-
     return constructed_container
 
 
+def fill_container_fromjson(container, dct):
+    """Add the items a container's config lists to it, once they've all been decoded"""
+    for keyval in dct["itemKeyValues"]:
+        container.add_item(GameObject.objects_by_key.get(keyval))
+
+
 def decode_story_item_fromjson(dct):
     constructed_item = StoryItem(
         key_value=dct["keyValue"],
@@ -197,6 +202,7 @@ def decode_room_exits_fromjson(dct):
 def decode_character_from_json(dct):
     if dct["type"] == "Player":
         player_inventory = decode_container_fromjson(dct["inventory"])
+        fill_container_fromjson(player_inventory, dct["inventory"])
 
         constructed_player = Player(
             key_value=dct["keyValue"],
@@ -226,39 +232,46 @@ def decode_character_from_json(dct):
 
 
 
-def load_story_items(config_file_path):
-    config = load_json(config_file_path)
-    items = [item for item in config["items"] if item["type"] == "StoryItem"]
-    vending_machines = [item for item in config["items"] if item["type"] == "VendingMachine"]
-    
-    storyitems = {}
-    
-    # Load regular story items
-    for item in items:
-        #print(json.dumps(item, indent=4))
-        decoded_item = decode_story_item_fromjson(item)
-        storyitems[decoded_item.key_value] = decoded_item
-    
-    # Load vending machines
-    for machine in vending_machines:
-        decoded_machine = decode_vending_machine_fromjson(machine)
-        storyitems[decoded_machine.key_value] = decoded_machine
-        
-    return storyitems
-
-def load_containers(config_file_path):
-    config = load_json(config_file_path)
-    storage_containers = [item for item in config["items"] if item["type"] == "Container"]
-    containers = {}
-    for container in storage_containers:
-        #print(json.dumps(item, indent=4))
-        decoded_container = decode_container_fromjson(container)
-        #add_item_reference_to_room(gamemap, decoded_item)
-        containers[decoded_container.key_value] = decoded_container
-    return containers
-
-def load_characters(config_file_path):
-    config = load_json(config_file_path)
+# type in the item config >> (the gamemap section the objects go in, the function that decodes them), a new kind of
+# item is loaded by adding its type here
+ITEM_DECODERS = {
+    "StoryItem": ("items", decode_story_item_fromjson),
+    "VendingMachine": ("items", decode_vending_machine_fromjson),
+    "Container": ("containers", decode_container_fromjson),
+}
+
+
+def load_items(config_file_path, strings: StringTable = None) -> dict:
+    """Decode every item in an item config file in a single pass over it
+
+    Each record is decoded by the function ITEM_DECODERS registers for its type. Containers are filled once every
+    record has been decoded, so a container can list items that come after it in the file. A record of a type with
+    no decoder is bad data and raises a ValueError.
+
+    Returns
+    -------
+    dict
+        gamemap section >> key_value >> the decoded object, i.e. {"items": {...}, "containers": {...}}
+    """
+    config = load_json(config_file_path, strings)
+    sections = {section: {} for section, _ in ITEM_DECODERS.values()}
+    unfilled = []
+    for item in config["items"]:
+        try:
+            section, decode = ITEM_DECODERS[item["type"]]
+        except KeyError:
+            raise ValueError(f"No decoder for item type {item['type']!r} ({item['keyValue']})") from None
+        decoded_item = decode(item)
+        sections[section][decoded_item.key_value] = decoded_item
+        if isinstance(decoded_item, Container) and item.get("itemKeyValues"):
+            unfilled.append((decoded_item, item))
+
+    for container, item in unfilled:
+        fill_container_fromjson(container, item)
+    return sections
+
+def load_characters(config_file_path, strings: StringTable = None):
+    config = load_json(config_file_path, strings)
     game_characters = config["characters"]
     characters = {}
     for character in game_characters:
@@ -267,8 +280,8 @@ def load_characters(config_file_path):
     return characters
 
 
-def load_game_rooms(config_file_path):
-    config = load_json(config_file_path)
+def load_game_rooms(config_file_path, strings: StringTable = None):
+    config = load_json(config_file_path, strings)
     rooms = {}
     for room in config["rooms"]:
         decoded_room = decode_room_fromjson(room)
@@ -276,7 +289,24 @@ def load_game_rooms(config_file_path):
     return rooms
 
 
-def load_game_map(game_manifest, manifest_key="newGame"):
+def load_game_map(game_manifest, manifest_key="newGame", world: World = None, strings: StringTable = None):
+    """Load the game described by a manifest into a world and return the gamemap
+
+    Parameters
+    ----------
+    game_manifest: str
+        Path to the manifest, relative paths are relative to the data directory
+    manifest_key: str
+        The game in the manifest to load, i.e. "newGame"
+    world: World
+        The world to create the objects in, the active world if None. Loading into a fresh World() loads the same
+        content again without clashing with the objects already loaded
+    strings: StringTable
+        The table the content strings are interned in. If None a table is made for this load and dropped once the
+        game is loaded, so text repeated within the game is held once and nothing outlives the world. Pass the same
+        table to several loads (i.e. a World per session) to share their strings too, for as long as the caller
+        keeps the table
+    """
     # Handle both absolute and relative paths for game_manifest
     if not os.path.isabs(game_manifest):
         data_path = get_data_path()
@@ -289,17 +319,22 @@ def load_game_map(game_manifest, manifest_key="newGame"):
 
     data_path = get_data_path()
     gamemap = {}
+    if strings is None:
+        strings = StringTable()
+
+    with world if world is not None else World.active as world:
+        gamemap.update(load_items(os.path.join(data_path, item_config), strings))
+        gamemap["rooms"] = load_game_rooms(os.path.join(data_path, room_config), strings)
+        gamemap["characters"] = load_characters(os.path.join(data_path, character_config), strings)
 
-    gamemap["items"] = load_story_items(os.path.join(data_path, item_config))
-    gamemap["containers"] = load_containers(os.path.join(data_path, item_config))
-    gamemap["rooms"] = load_game_rooms(os.path.join(data_path, room_config))
-    gamemap["characters"] = load_characters(os.path.join(data_path, character_config))
+        # Place items in their designated rooms
+        place_items_in_rooms(gamemap)
 
-    # Place items in their designated rooms
-    place_items_in_rooms(gamemap)
+        wire_story_item_action_funcs()
+        wire_room_action_funcs()
 
-    wire_story_item_action_funcs()
-    wire_room_action_funcs()
+    world.rooms.update(gamemap["rooms"])
+    world.characters.update(gamemap["characters"])
     return gamemap
 
 
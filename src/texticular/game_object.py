@@ -1,10 +1,22 @@
-from itertools import count
-from texticular.game_enums import Flags
+from texticular.game_enums import Flags, FlagSet
+from texticular.world import World
 import functools
 import json
 
 
-class GameObject:
+class ActiveWorldRegistry(type):
+    """Metaclass resolving GameObject.objects_by_key and GameObject.registry_listeners to the active World's"""
+
+    @property
+    def objects_by_key(cls) -> dict:
+        return World.active.objects_by_key
+
+    @property
+    def registry_listeners(cls) -> list:
+        return World.active.listeners
+
+
+class GameObject(metaclass=ActiveWorldRegistry):
     """A Base Class representing a generic game object
 
     Provides some basic functionality for commands that can be used on all objects (i.e. Look and Examine).
@@ -13,10 +25,16 @@ class GameObject:
     Attributes
     ----------
     objects_by_key: dict
-        A class level dictionary that keeps track of all the game objects created
+        A class level dictionary that keeps track of all the game objects created in the active World
         key_value >> GameObject
+    registry_listeners: list
+        Weak references to the callables notified when objects are added to, removed from or renamed in
+        objects_by_key, moved or have their flags changed. Each listener is called as
+        listener(event, game_object, detail), see subscribe() for the events
+    world: World
+        The world the object was created in, it registers and publishes its events there
     id: int
-        A globally unique integer ID assigned to each item that is created
+        An integer ID assigned to each item that is created, unique within its world
     name: str
         The friendly object name (does not have to be unique)
    descriptions: dict
@@ -26,20 +44,57 @@ class GameObject:
         The description of the game object
     key_value: str
         The globally unique string identifier for an object, should contain no spaces
+    action: callable
+        The object's action routine, see the action property
+
+    Every class in the hierarchy declares __slots__ so objects carry no per-instance __dict__, large generated worlds
+    hold hundreds of thousands of them. Subclasses that add attributes should declare their own __slots__ too.
 
     Methods
     ---------
     __init__()
         The constructor for the GameObject Class
+    subscribe(listener)
+        Start notifying a callable of registry events
+    query(flags, not_flags, location, type)
+        Find objects by flag, location and class without scanning the registry
+    rename(name)
+        Change the friendly name of the object
+    unregister()
+        Delete the object from the registry
+    capture_state()
+        Return the object's changing state for a world snapshot
+    restore_state(state)
+        Put back a state returned by capture_state()
+    apply_change(attribute, value, replaced)
+        Set an attribute to a value recorded in the journal
 
     """
 
-    _objectid = count(1)
-    objects_by_key = {}
+    __slots__ = ("__weakref__", "world", "id", "name", "descriptions", "key_value", "action_method_name",
+                 "_location_key", "_flags", "_current_description", "_examine_description", "_action")
 
     @classmethod
     def lookup_by_key(cls, key_value:str):
-        return cls.objects_by_key .get(key_value)
+        return World.active.lookup(key_value)
+
+    @classmethod
+    def query(cls, flags=None, not_flags=None, location: str = None, type: type = None) -> list:
+        """Return the active world's objects with all of flags, none of not_flags, at location and of type
+
+        See World.query, i.e. GameObject.query(flags=[Flags.TAKEBIT], location="nowhereLand")
+        """
+        return World.active.query(flags, not_flags, location, type)
+
+    @classmethod
+    def subscribe(cls, listener):
+        """Notify a callable of the active world's registry events, see World.subscribe"""
+        World.active.subscribe(listener)
+
+    @classmethod
+    def publish(cls, event: str, game_object, detail=None):
+        """Pass a registry event on to the listeners of the world the object belongs to"""
+        game_object.world.publish(event, game_object, detail)
 
 
     def __init__(self, key_value: str, name: str, descriptions: dict, location_key: str = None, flags: list = None):
@@ -59,7 +114,8 @@ class GameObject:
         flags: list
             a list of "Flags" enum members to define attributes of an object to be used by game logic
         """
-        self.id = next(GameObject._objectid)
+        self.world = World.active
+        self.id = next(self.world.object_ids)
         self.name = name
 
         if "Main" not in descriptions:
@@ -67,14 +123,14 @@ class GameObject:
                            "least the 'Main' key with a description")
 
         self.descriptions = descriptions
-        self.location_key = location_key
-        self.flags = set()
+        self._location_key = location_key
         self.action_method_name = None
+        self._action = None
 
         if flags is None:
             flags = []
-        for flag in flags:
-            self.add_flag(flag)
+        # set directly rather than through add_flag, nobody is listening for an object that isn't registered yet
+        self._flags = FlagSet(flags)
 
         self._current_description = "Main"
 
@@ -83,7 +139,7 @@ class GameObject:
         else:
             self._examine_description = "Main"
 
-        duplicate_object = GameObject.lookup_by_key(key_value)
+        duplicate_object = self.world.lookup(key_value)
         if duplicate_object:
             raise ValueError(f""" You're trying to create an Object: {name}:{key_value} but,
                              each game object must have a unique key value. {key_value} already exists on 
@@ -91,10 +147,43 @@ class GameObject:
             """)
         else:
             self.key_value = key_value
-            GameObject.objects_by_key[key_value] = self
+            self.world.register(self)
 
     def __str__(self):
-        return str(vars(self))
+        return str(object_attributes(self))
+
+    def rename(self, name: str):
+        """Change the friendly name of the object and let any registry listeners (i.e. the parser) know
+
+        Parameters
+        ----------
+        name: str
+            The new friendly name
+        """
+        self.world.record(self, "name", self.name, name)
+        self.name = name
+        GameObject.publish("rename", self)
+
+    def unregister(self):
+        """Delete the object from the game entirely
+
+        Unlike remove(), which parks the object in nowhereLand, the object is taken out of objects_by_key so its
+        key can be reused and the parser will no longer recognize it.
+        """
+        self.world.unregister(self)
+
+    @property
+    def location_key(self):
+        return self._location_key
+    @location_key.setter
+    def location_key(self, location_key):
+        previous_location_key = self._location_key
+        self._location_key = location_key
+        if location_key != previous_location_key:
+            if self.world.lookup(self.key_value) is self:
+                self.world.relocate(self, previous_location_key, location_key)
+            self.world.record(self, "location_key", previous_location_key, location_key)
+            GameObject.publish("move", self, previous_location_key)
 
     @property
     def current_description(self):
@@ -102,6 +191,7 @@ class GameObject:
     @current_description.setter
     def current_description(self, descript_key):
         if self.descriptions.get(descript_key):
+            self.world.record(self, "current_description", self._current_description, descript_key)
             self._current_description = descript_key
         else:
             raise KeyError(f"Key {descript_key} not found in descriptions.")
@@ -112,6 +202,7 @@ class GameObject:
     @examine_description.setter
     def examine_description(self, descript_key):
         if self.descriptions.get(descript_key):
+            self.world.record(self, "examine_description", self._examine_description, descript_key)
             self._examine_description = descript_key
         else:
             raise KeyError(f"Key {descript_key} not found in descriptions.")
@@ -141,7 +232,7 @@ class GameObject:
          Example:
              bread.move("toaster")
          """
-        if GameObject.lookup_by_key(location_key):
+        if self.world.lookup(location_key):
             self.location_key = location_key
         else:
             raise ValueError(f"Invalid location Key provided {location_key}")
@@ -159,10 +250,21 @@ class GameObject:
 
          """
         self.location_key = "nowhereLand"
+    @property
+    def flags(self) -> FlagSet:
+        """The object's flags as a bitmask backed set, `Flags.OPENBIT in game_object.flags`"""
+        return self._flags
+
+    @flags.setter
+    def flags(self, flags):
+        self._set_flag_bits(FlagSet(flags).bits)
+
     def has_flag(self, flag: Flags):
-        return flag in self.flags
+        """Return True if the flag is set, for a combined mask (Flags.CONTAINERBIT | Flags.OPENBIT) if all of them are"""
+        return flag in self._flags
     def add_flag(self, flag: Flags):
-        self.flags.add(flag)
+        if flag not in self._flags:
+            self._set_flag_bits(self._flags.bits | int(flag))
 
 
     def add_flag_by_name(self, flag:str):
@@ -173,18 +275,16 @@ class GameObject:
         flag:str
             The flag to be added to the game object
         """
-        flags = [member.name for member in Flags]
-        if flag in flags:
-            self.flags.add(Flags[flag])
-        else:
+        member = Flags.__members__.get(flag)
+        if member is None:
             raise ValueError(f"Flag {flag} does not exist in game_enums.Flags.")
+        self.add_flag(member)
 
     def remove_flag(self, flag: Flags):
-        try:
-            self.flags.remove(flag)
-            return True
-        except KeyError:
+        if flag not in self._flags:
             return False
+        self._set_flag_bits(self._flags.bits & ~int(flag))
+        return True
     def remove_flag_by_name(self, flag:str) -> bool:
         """Remove a flag enum attribute from the game object if it is found in the flags set else return false
 
@@ -195,19 +295,88 @@ class GameObject:
 
         """
         try:
-            self.flags.remove(Flags[flag])
-            return True
+            return self.remove_flag(Flags[flag])
         except KeyError:
             return False
 
 
-    def action(self, func):
+    @property
+    def action(self):
+        """The object's action routine, until one is wired up this is the decorator that wraps one for it
+
+        Examples
+        ----------
+        >>> game_object.action = game_object.action(custom_action)
+        >>> game_object.action(controller=controller, target=game_object)
+        """
+        if self._action is None:
+            return self._wrap_action
+        return self._action
+
+    @action.setter
+    def action(self, routine):
+        self._action = routine
+
+    def _wrap_action(self, func):
         @functools.wraps(func)
         def wrapper_action(*args, **kwargs):
             results = func(*args, **kwargs)
             return results
         return wrapper_action
 
+    def capture_state(self) -> tuple:
+        """Return the parts of the object that change during a game as a tuple restore_state() can put back
+
+        Used by World.snapshot, subclasses with more state to capture append it to the tuple.
+        """
+        return self.name, self._location_key, self._flags.bits, self._current_description, self._examine_description
+
+    def restore_state(self, state: tuple):
+        """Put back the state returned by capture_state(), publishing the events the changes amount to
+
+        Parameters
+        ----------
+        state: tuple
+            A tuple returned by capture_state() on this object
+        """
+        name, location_key, flag_bits, self._current_description, self._examine_description = state[:5]
+        if name != self.name:
+            self.rename(name)
+        self._set_flag_bits(flag_bits)
+        self.location_key = location_key
+
+    def apply_change(self, attribute: str, value, replaced):
+        """Set one attribute back (or forward) to a value recorded by World.record, used by the journal
+
+        Parameters
+        ----------
+        attribute: str
+            The attribute passed to World.record: "location_key", "flags" (the bits), "name", "current_description",
+            "examine_description" or any plain attribute of a subclass (i.e. "money")
+        value:
+            The value to set
+        replaced:
+            The value being replaced, subclasses need it for changes that aren't a plain assignment (i.e. "items")
+        """
+        if attribute == "flags":
+            self._set_flag_bits(value)
+        elif attribute == "name":
+            self.rename(value)
+        else:
+            setattr(self, attribute, value)
+
+    def _set_flag_bits(self, flag_bits: int):
+        """Replace the flags with a bitmask, publishing a "flags" event for every single flag that changed, never a
+        combined mask, so listeners can compare the detail against one flag (Scope checks for Flags.OPENBIT)"""
+        changed_bits = self._flags.bits ^ flag_bits
+        if changed_bits:
+            self.world.record(self, "flags", self._flags.bits, flag_bits)
+            self._flags.bits = flag_bits
+            while changed_bits:
+                flag_bit = changed_bits & -changed_bits
+                changed_bits ^= flag_bit
+                GameObject.publish("flags", self, Flags(flag_bit))
+
     def encode_tojson(self,o):
         """Serialize Game Object to Json
 
@@ -224,6 +393,23 @@ class GameObject:
             "actionMethod": self.action_method_name
         }
 
+def object_attributes(game_object) -> dict:
+    """Return the attributes set on an object as a dict, like vars() but for slotted classes
+
+    Parameters
+    ----------
+    game_object: object
+        Any instance, attributes in a __dict__ (i.e. from a subclass without __slots__) are included too
+    """
+    attributes = {}
+    for cls in reversed(type(game_object).__mro__):
+        for slot in cls.__dict__.get("__slots__", ()):
+            if slot != "__weakref__" and hasattr(game_object, slot):
+                attributes[slot] = getattr(game_object, slot)
+    attributes.update(getattr(game_object, "__dict__", {}))
+    return attributes
+
+
 if __name__ == "__main__":
     game_object = GameObject(key_value="office_lock",
                              name="lock",
@@ -10,6 +10,7 @@ from pathlib import Path
 from typing import Dict, Any, List
 import threading
 import os
+from contextlib import contextmanager
 
 
 class GameplayLogger:
@@ -43,6 +44,9 @@ class GameplayLogger:
         }
         
         self.is_active = True
+        # while batching, events are only written out when the outermost batch() block ends
+        self._batch_depth = 0
+        self._unsaved = False
         
     def log_event(self, event_type: str, data: Dict[str, Any]):
         """Log a gameplay event with timestamp."""
@@ -54,7 +58,21 @@ class GameplayLogger:
         
         self.session_data["events"].append(event)
         self._update_statistics(event_type, data)
-        self._save_logs()
+        if self._batch_depth:
+            self._unsaved = True
+        else:
+            self._save_logs()
+
+    @contextmanager
+    def batch(self):
+        """Write the log files once at the end of the block instead of after every event."""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._unsaved:
+                self._save_logs()
         
     def log_command(self, command: str, parse_success: bool, response: str, game_state: Dict[str, Any]):
         """Log a player command with full context."""
@@ -123,6 +141,7 @@ class GameplayLogger:
     
     def _save_logs(self):
         """Save logs to both main file and live monitoring file."""
+        self._unsaved = False
         try:
             # Save to main session file
             with open(self.log_file, 'w') as f:
@@ -179,4 +198,18 @@ def stop_logging():
     global _gameplay_logger
     if _gameplay_logger:
         _gameplay_logger.end_session()
-        _gameplay_logger = None
\ No newline at end of file
+        _gameplay_logger = None
+
+
+def iter_logged_commands(log_dir: str = "gameplay_logs"):
+    """Yield every command players entered, in order, from the session logs in log_dir.
+
+    Sessions are read one file at a time so a whole log directory can be replayed without holding it in memory.
+    The live current_session.json mirror is skipped since its commands are already in a session file.
+    """
+    for log_file in sorted(Path(log_dir).glob("session_*.json")):
+        with open(log_file) as f:
+            session = json.load(f)
+        for event in session.get("events", []):
+            if event.get("event_type") == "command":
+                yield event["data"]["input"]
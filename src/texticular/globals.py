@@ -31,6 +31,33 @@ SINGLE_VERB_COMMANDS = [
 ]
 
 
+ARTICLES = [
+    "a",
+    "an",
+    "the"
+]
+
+
+# "it" is the last object the player referred to, "them" the last group ("take all" then "drop them")
+PRONOUNS = [
+    "it",
+    "them"
+]
+
+
+# "take all", "drop everything except the note"
+ALL_WORDS = [
+    "all",
+    "everything"
+]
+
+
+EXCEPT_WORDS = [
+    "except",
+    "but"
+]
+
+
 PREPOSITIONS = [
     "in",
     "on",
@@ -43,7 +70,9 @@ PREPOSITIONS = [
 
 
 
-# Player State
-GREAT_DANE_ENCOUNTERED = False
-HAS_POOPED = False
-PLAYERSITTING = False
\ No newline at end of file
+# Player State, every World starts out with its own copy in World.globals
+PLAYER_STATE = {
+    "GREAT_DANE_ENCOUNTERED": False,
+    "HAS_POOPED": False,
+    "PLAYERSITTING": False
+}
@@ -0,0 +1,126 @@
+class ItemCollection:
+    """The things held by a room or container: an insertion ordered set with the list methods the game uses
+
+    Backed by a dict so membership, adding and removing an item take constant time however full the container is,
+    while iterating still lists the items in the order they were put in, which is the order descriptions show them
+    in. An item can only be in the collection once, adding it again leaves it where it was.
+
+    Every item is given a sequence number when it is added, counting up from the collection's previous one, so the
+    numbers always run in the order the items were put in.
+
+    A collection with an owner (the room or container holding it) records every item added or removed with
+    owner.world.record(owner, "items", old, new), where old and new are None and [item key_value, sequence number]
+    for an item that was added, and the other way around for one that was removed. Putting a removed item back
+    under its old number (UNDO) doesn't have to shuffle the others along, the collection just sorts itself by
+    sequence number the next time it is listed.
+
+    Examples
+    ----------
+    >>> drawer.items.append(earplugs)
+    >>> earplugs in drawer.items
+    True
+    >>> drawer.items.remove(earplugs)
+    """
+    __slots__ = ("_items", "owner", "_next", "_unsorted")
+
+    def __init__(self, items=(), owner=None):
+        # item >> sequence number
+        self._items = {item: number for number, item in enumerate(dict.fromkeys(items))}
+        self.owner = owner
+        self._next = len(self._items)
+        self._unsorted = False
+
+    def __contains__(self, item) -> bool:
+        return item in self._items
+
+    def __iter__(self):
+        return iter(self._ordered())
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ItemCollection):
+            return list(self._ordered()) == list(other._ordered())
+        if isinstance(other, list):
+            return list(self._ordered()) == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"ItemCollection({list(self._ordered())})"
+
+    def _ordered(self) -> dict:
+        """Return the item dict, first putting it back in sequence number order if an item was restored out of turn"""
+        if self._unsorted:
+            self._items = dict(sorted(self._items.items(), key=lambda pair: pair[1]))
+            self._unsorted = False
+        return self._items
+
+    def append(self, item):
+        """Add an item after the ones already held, does nothing if it is already held"""
+        if item not in self._items:
+            number = self._next
+            self._next += 1
+            self._items[item] = number
+            if self.owner is not None:
+                self.owner.world.record(self.owner, "items", None, [item.key_value, number])
+
+    def extend(self, items):
+        """Add several items in order"""
+        for item in items:
+            self.append(item)
+
+    def remove(self, item):
+        """Remove an item, raising ValueError like list.remove if it isn't held"""
+        if not self.discard(item):
+            raise ValueError(f"{item!r} is not in the collection")
+
+    def discard(self, item) -> bool:
+        """Remove an item if it is held and return True if it was"""
+        number = self._items.pop(item, None)
+        if number is None:
+            return False
+        if self.owner is not None:
+            self.owner.world.record(self.owner, "items", [item.key_value, number], None)
+        return True
+
+    def restore(self, number: int, item):
+        """Put an item back under the sequence number it had, i.e. back where it was in the order"""
+        if item in self._items:
+            return
+        if self._items and number < next(reversed(self._items.values())):
+            # the sort is left until the collection is next listed, so undoing many removals costs one sort at most
+            self._unsorted = True
+        self._items[item] = number
+        self._next = max(self._next, number + 1)
+
+    def clear(self):
+        for item in reversed(list(self._ordered())):
+            self.discard(item)
+
+    def copy(self):
+        collection = ItemCollection()
+        collection._items = dict(self._ordered())
+        collection._next = self._next
+        return collection
+
+    def apply_change(self, value, replaced, world):
+        """Add back or take out the item an "items" change recorded, see GameObject.apply_change
+
+        Parameters
+        ----------
+        value:
+            [key_value, sequence number] of an item to put back, None to take out the item in replaced
+        replaced:
+            [key_value, sequence number] of the item being taken out when value is None
+        world: World
+            The world to look the item up in
+        """
+        if value is not None:
+            item = world.lookup(value[0])
+            if item is not None:
+                self.restore(value[1], item)
+        elif replaced is not None:
+            self._items.pop(world.lookup(replaced[0]), None)
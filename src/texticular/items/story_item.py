@@ -1,6 +1,11 @@
 from texticular.game_object import GameObject
 from texticular.game_enums import Flags
+from texticular.items.item_collection import ItemCollection
+from texticular.world import World
+from itertools import count
 class StoryItem(GameObject):
+    __slots__ = ("synonyms", "adjectives", "size", "descriptive_name")
+
     def __init__(self, key_value: str, name: str, descriptions: dict, synonyms: list,
                  adjectives: list = None, size: int = 1, location_key: str = None, flags: list = None):
         self.synonyms = synonyms
@@ -14,6 +19,46 @@ class StoryItem(GameObject):
 
         super().__init__(key_value, name, descriptions, location_key, flags)
 
+    def rename(self, name: str = None, synonyms: list = None, adjectives: list = None):
+        """Change the name, synonyms and/or adjectives the player can use to refer to the item
+
+        Parameters
+        ----------
+        name: str
+            The new friendly name, unchanged if None
+        synonyms: list
+            The new list of synonyms, unchanged if None
+        adjectives: list
+            The new list of adjectives, unchanged if None
+        """
+        if synonyms is not None:
+            self.world.record(self, "synonyms", self.synonyms, synonyms)
+            self.synonyms = synonyms
+        if adjectives is not None:
+            self.world.record(self, "adjectives", self.adjectives, adjectives)
+            self.adjectives = adjectives
+        descriptive_name = (" ".join(self.adjectives) + " " + (name or self.name)).strip()
+        self.world.record(self, "descriptive_name", self.descriptive_name, descriptive_name)
+        self.descriptive_name = descriptive_name
+        super().rename(name or self.name)
+
+    def capture_state(self) -> tuple:
+        return super().capture_state() + (self.synonyms, self.adjectives, self.descriptive_name)
+
+    def restore_state(self, state: tuple):
+        synonyms, adjectives, self.descriptive_name = state[5:8]
+        if synonyms is not self.synonyms or adjectives is not self.adjectives:
+            # rename() replaces the lists rather than changing them, so a different list means a different name
+            self.synonyms, self.adjectives = synonyms, adjectives
+            if state[0] == self.name:
+                GameObject.publish("rename", self)
+        super().restore_state(state)
+
+    def apply_change(self, attribute: str, value, replaced):
+        super().apply_change(attribute, value, replaced)
+        if attribute in ("synonyms", "adjectives"):
+            GameObject.publish("rename", self)
+
     def encode_tojson(self, o):
         """Serialize Story Item to Json
 
@@ -43,19 +88,17 @@ class StoryItem(GameObject):
         room: Room
             The room to search for the item
         """
-        open_containers = [container for container in room.items if
-                           Flags.CONTAINERBIT in container.flags and Flags.OPENBIT in container.flags]
-
-        item_in_open_container = False
-        for container in open_containers:
-            if self in container.items:
-                item_in_open_container = True
-                break
+        if self.location_key == room.key_value:
+            return Flags.INVISIBLE not in self.flags
 
-        return (self.location_key == room.key_value and Flags.INVISIBLE not in self.flags or
-                item_in_open_container )
+        # the item's location is the only container it can be in
+        container = self.world.lookup(self.location_key)
+        return (container is not None and container.location_key == room.key_value and
+                (Flags.CONTAINERBIT | Flags.OPENBIT) in container.flags and self in container.items)
 
 class Container(StoryItem):
+    __slots__ = ("slots", "slots_occupied", "key_object", "items")
+
     def __init__(self, key_value: str, name: str, descriptions: dict, synonyms: list, adjectives: list = None,
                  slots: int = 10, location_key: str = None, key_object=None, flags: list = [Flags.CONTAINERBIT]):
         super().__init__(key_value, name, descriptions, synonyms, adjectives, size=99,
@@ -63,26 +106,67 @@ class Container(StoryItem):
         self.slots = slots
         self.slots_occupied = 0
         self.key_object = key_object
-        self.items = []
+        self.items = ItemCollection(owner=self)
 
     def check_item_fits_inside(self, item: StoryItem):
         return item.size + self.slots_occupied <= self.slots
 
     def add_item(self, item: StoryItem) -> bool:
+        """Put an item in the container, an instance of a prototype the container already holds a stack of is added
+        to that stack and unregistered instead"""
+        if isinstance(item, StackableItem):
+            stack = next((held for held in self.items if held is not item and item.stacks_with(held)), None)
+            if stack is not None:
+                stack.absorb(item)
+                return True
+        self.world.record(self, "slots_occupied", self.slots_occupied, self.slots_occupied + item.size)
         self.slots_occupied += item.size
         self.items.append(item)
         item.move(self.key_value)
         return True
 
 
+    def add_items(self, items: list) -> list:
+        """Add several items in one go, as many as fit, and return the ones that were added"""
+        added = []
+        for item in items:
+            if self.check_item_fits_inside(item):
+                self.add_item(item)
+                added.append(item)
+        return added
+
     def remove_item(self, item: StoryItem) -> bool:
-        if item in self.items:
+        if self.items.discard(item):
+            self.world.record(self, "slots_occupied", self.slots_occupied, self.slots_occupied - item.size)
             self.slots_occupied -= item.size
-            self.items.remove(item)
             item.remove()
             return True
         return False
 
+    def remove_items(self, items: list) -> list:
+        """Remove several items, looking each one up rather than scanning the container, and return the ones that
+        were in it"""
+        removed = [item for item in items if self.items.discard(item)]
+        for item in removed:
+            self.world.record(self, "slots_occupied", self.slots_occupied, self.slots_occupied - item.size)
+            self.slots_occupied -= item.size
+            item.remove()
+        return removed
+
+    def capture_state(self) -> tuple:
+        return super().capture_state() + (tuple(self.items), self.slots_occupied)
+
+    def restore_state(self, state: tuple):
+        items, self.slots_occupied = state[8:10]
+        self.items = ItemCollection(items, owner=self)
+        super().restore_state(state)
+
+    def apply_change(self, attribute: str, value, replaced):
+        if attribute == "items":
+            self.items.apply_change(value, replaced, self.world)
+        else:
+            super().apply_change(attribute, value, replaced)
+
     def open(self, key_object=None):
         if Flags.LOCKEDBIT in self.flags:
             if key_object is None:
@@ -106,8 +190,9 @@ class Container(StoryItem):
 
         if self.items:
             for item in self.items:
-                # Format as: "    ItemName: Description"
-                response.append(f"    {item.name}: {item.describe()}")
+                # Format as: "    ItemName: Description", with the count for a stack of more than one
+                count_text = f" (x{item.quantity})" if getattr(item, "quantity", 1) > 1 else ""
+                response.append(f"    {item.name}{count_text}: {item.describe()}")
         else:
             response.append("    Nothing. It's empty.")
 
@@ -137,6 +222,8 @@ class Container(StoryItem):
         }
 
 class Inventory(Container):
+    __slots__ = ()
+
     def __init__(self, key_value: str, name: str, descriptions: dict, synonyms: list, adjectives: list = None,
                  slots: int = 10, location_key: str = None, flags: list = [Flags.CONTAINERBIT, Flags.OPENBIT]):
         super().__init__(key_value, name, descriptions, synonyms, adjectives,
@@ -148,12 +235,124 @@ class Inventory(Container):
         response.append(("-" * (len(self.name) + len(super().describe()) + 2)) + "\n\n")
         if self.items:
             for item in self.items:
-                response.append(f"{item.descriptive_name}: {item.describe()}")
+                count_text = f" (x{item.quantity})" if getattr(item, "quantity", 1) > 1 else ""
+                response.append(f"{item.descriptive_name}{count_text}: {item.describe()}")
         else:
             response.append(f"Nothing. It's empty.")
 
         return response
 
+class ItemPrototype:
+    """The unchanging part of an item the game can hold any number of, i.e. coins or a vending machine's snacks
+
+    The names and descriptions are kept once on the prototype and shared by every StackableItem made from it, an
+    instance only carries its own key, location, flags and quantity. Instances get keys made from the prototype's,
+    "coin-1", "coin-2" ..., so any number of them can exist at once.
+
+    Attributes
+    ----------
+    key_value: str
+        The prefix of the instances' keys
+    name: str
+        The instances' friendly name
+    descriptions: dict
+        The descriptions shared by every instance
+    synonyms: list
+        The synonyms shared by every instance
+    adjectives: list
+        The adjectives shared by every instance
+    size: int
+        The slots a stack of instances takes up in a container
+    flags: list
+        The flags new instances start out with
+    """
+
+    __slots__ = ("key_value", "name", "descriptions", "synonyms", "adjectives", "size", "flags", "_serials")
+
+    def __init__(self, key_value: str, name: str, descriptions: dict, synonyms: list, adjectives: list = None,
+                 size: int = 1, flags: list = None):
+        if "Main" not in descriptions:
+            raise KeyError("In addition to other descriptions, the  descriptions dict must contain at "
+                           "least the 'Main' key with a description")
+        self.key_value = key_value
+        self.name = name
+        self.descriptions = descriptions
+        self.synonyms = synonyms
+        self.adjectives = adjectives if adjectives is not None else []
+        self.size = size
+        self.flags = flags if flags is not None else []
+        self._serials = count(1)
+
+    def __repr__(self):
+        return f"ItemPrototype({self.key_value!r})"
+
+    def instantiate(self, location_key: str = None, quantity: int = 1) -> "StackableItem":
+        """Create an instance (or a stack of `quantity` of them) in the active world
+
+        Parameters
+        ----------
+        location_key: str
+            Where the instance is
+        quantity: int
+            How many of the item the instance stands for
+        """
+        key_value = f"{self.key_value}-{next(self._serials)}"
+        while World.active.lookup(key_value) is not None:
+            key_value = f"{self.key_value}-{next(self._serials)}"
+        return StackableItem(self, key_value, location_key, quantity)
+
+
+class StackableItem(StoryItem):
+    """An instance of an ItemPrototype standing for `quantity` identical items
+
+    Put in a container holding an instance of the same prototype with the same flags it joins that stack, so a
+    pocket full of coins is one object with a quantity rather than one object per coin.
+    """
+    __slots__ = ("prototype", "quantity")
+
+    def __init__(self, prototype: ItemPrototype, key_value: str, location_key: str = None, quantity: int = 1,
+                 flags: list = None):
+        self.prototype = prototype
+        self.quantity = quantity
+        super().__init__(key_value, prototype.name, prototype.descriptions, prototype.synonyms, prototype.adjectives,
+                         prototype.size, location_key, prototype.flags if flags is None else flags)
+
+    def stacks_with(self, other) -> bool:
+        """Return True if the other item is an instance of the same prototype in the same state"""
+        return (isinstance(other, StackableItem) and other.prototype is self.prototype and
+                other.flags == self.flags and other.current_description == self.current_description)
+
+    def absorb(self, other: "StackableItem"):
+        """Add another instance's quantity to this stack and unregister the other instance"""
+        self.world.record(self, "quantity", self.quantity, self.quantity + other.quantity)
+        self.quantity += other.quantity
+        other.unregister()
+
+    def split(self, quantity: int = 1) -> "StackableItem":
+        """Take `quantity` items off the stack as a new instance at the same location, i.e. to drop or eat one
+
+        Returns the stack itself if it doesn't hold more than `quantity`.
+        """
+        if quantity >= self.quantity:
+            return self
+        self.world.record(self, "quantity", self.quantity, self.quantity - quantity)
+        self.quantity -= quantity
+        with self.world:
+            return self.prototype.instantiate(self.location_key, quantity)
+
+    def capture_state(self) -> tuple:
+        return super().capture_state() + (self.quantity,)
+
+    def restore_state(self, state: tuple):
+        self.quantity = state[8]
+        super().restore_state(state)
+
+    def encode_tojson(self, o):
+        encoded = super().encode_tojson(o)
+        encoded.update({"prototype": self.prototype.key_value, "quantity": self.quantity})
+        return encoded
+
+
 if __name__ == "__main__":
     import json
 
@@ -3,11 +3,38 @@ VendingMachine - Special interactive object for Texticular
 Handles shop mechanics and item purchasing
 """
 
-from texticular.items.story_item import StoryItem
+from texticular.items.story_item import StoryItem, ItemPrototype
 from texticular.game_enums import Flags, GameStates
 from typing import Dict, Any
 
 
+# item_key >> the prototype every purchase of that item is an instance of
+PURCHASABLE_ITEMS = {
+    "fast_eddies": ItemPrototype(
+        key_value="purchased_fast_eddies",
+        name="Fast Eddie's Colon Cleanse",
+        descriptions={
+            "Main": "A can of Fast Eddie's Colon Cleanse. The warning label takes up most of the can.",
+            "Dropped": "An unopened can of Fast Eddie's lies on the ground, oozing slightly."
+        },
+        synonyms=["fast eddies", "colon cleanse", "can", "eddie's"],
+        adjectives=["purchased"],
+        flags=["TAKEBIT"]
+    ),
+    "dog_treats": ItemPrototype(
+        key_value="sleepy_time_dog_treats",
+        name="Sleepy Time Dog Treats",
+        descriptions={
+            "Main": "A bag of Sleepy Time Dog Treats. They smell like bacon and something... medicinal.",
+            "Dropped": "The dog treats lie scattered on the ground. They still smell effective."
+        },
+        synonyms=["dog treats", "sleepy time", "treats", "scooby snacks"],
+        adjectives=["sleepy", "time"],
+        flags=["TAKEBIT"]
+    ),
+}
+
+
 class VendingMachine(StoryItem):
     """
     A talking vending machine that sells Fast Eddie's and Dog Treats.
@@ -232,6 +259,7 @@ class VendingMachine(StoryItem):
         controller.player.spend_money(item_data["price"])
         
         # Reduce stock
+        self.world.record(self, "stock", [item_key, item_data["stock"]], [item_key, item_data["stock"] - 1])
         item_data["stock"] -= 1
         
         # Create the purchased item and add to player inventory
@@ -250,39 +278,29 @@ class VendingMachine(StoryItem):
             controller.response.append("Perfect for calming angry guard dogs!")
         
     def create_purchased_item(self, item_key: str, item_data: dict):
-        """Create a StoryItem object for the purchased item."""
-        from texticular.items.story_item import StoryItem
-        
-        # Create appropriate StoryItem based on what was bought
-        if item_key == "fast_eddies":
-            return StoryItem(
-                key_value="purchased_fast_eddies",
-                name="Fast Eddie's Colon Cleanse", 
-                descriptions={
-                    "Main": "A can of Fast Eddie's Colon Cleanse. The warning label takes up most of the can.",
-                    "Dropped": "An unopened can of Fast Eddie's lies on the ground, oozing slightly."
-                },
-                synonyms=["fast eddies", "colon cleanse", "can", "eddie's"],
-                adjectives=["purchased"],
-                location_key="player_inventory",
-                flags=["TAKEBIT"]
-            )
-        elif item_key == "dog_treats":
-            return StoryItem(
-                key_value="sleepy_time_dog_treats",
-                name="Sleepy Time Dog Treats",
-                descriptions={
-                    "Main": "A bag of Sleepy Time Dog Treats. They smell like bacon and something... medicinal.",
-                    "Dropped": "The dog treats lie scattered on the ground. They still smell effective."
-                },
-                synonyms=["dog treats", "sleepy time", "treats", "scooby snacks"],
-                adjectives=["sleepy", "time"],
-                location_key="player_inventory", 
-                flags=["TAKEBIT"]
-            )
-        
-        return None
-    
+        """Create an instance of the purchased item's prototype, it stacks with any already in the inventory."""
+        prototype = PURCHASABLE_ITEMS.get(item_key)
+        if prototype is None:
+            return None
+        with self.world:
+            return prototype.instantiate(location_key="player_inventory")
+
+    def capture_state(self) -> tuple:
+        stock = tuple((item_key, item_data["stock"]) for item_key, item_data in self.inventory.items())
+        return super().capture_state() + (stock,)
+
+    def restore_state(self, state: tuple):
+        for item_key, stock in state[8]:
+            self.inventory[item_key]["stock"] = stock
+        super().restore_state(state)
+
+    def apply_change(self, attribute: str, value, replaced):
+        if attribute == "stock":
+            item_key, stock = value
+            self.inventory[item_key]["stock"] = stock
+        else:
+            super().apply_change(attribute, value, replaced)
+
     def get_money_hint(self) -> str:
         """Return a hint about where to find money."""
         return ("Psst... I heard someone dropped some change in the nightstand drawer upstairs. "
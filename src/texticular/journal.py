@@ -0,0 +1,180 @@
+"""A turn by turn record of every change made to a world, for UNDO/REDO and for recovering a game after a crash"""
+
+import json
+
+
+class Journal:
+    """Records every change made to a world as a reversible delta and groups them into turns
+
+    Once a journal is started every World.record call (objects moving, flags, descriptions, names, money, container
+    items, vending machine stock) and every write to world.globals is appended to the turn in progress as a
+    (key_value, attribute, old, new) delta, key_value is None for a global, whose name is the attribute. commit()
+    closes the turn, undo() applies the inverse of the last turn's deltas in reverse and redo() applies them again, so
+    either costs as much as the turn changed rather than as much as the world holds.
+
+    Given a path, every committed, undone and redone turn is also appended to it as a line of JSON, which replay()
+    reads back into a freshly loaded world to get a game back after a crash without ever rewriting a save file.
+    Objects created during play (i.e. a vending machine purchase) can't be rebuilt from their key, so replaying skips
+    the changes to them.
+
+    Attributes
+    ----------
+    world: World
+        The world the journal records, its journal attribute is set to the journal
+    pending: list
+        The deltas of the turn in progress
+    undo_turns: list
+        The committed turns that can be undone, newest last
+    redo_turns: list
+        The undone turns that can be redone, newest last
+    objects: dict
+        key_value >> GameObject for every object registered or unregistered while recording, so an undo or redo can
+        register it again
+    path: str
+        The file the turns are appended to, None to keep them in memory only
+
+    Methods
+    ---------
+    record(game_object, attribute, old, new)
+        Add a delta to the turn in progress
+    commit()
+        Close the turn in progress
+    undo()
+        Take back the last turn
+    redo()
+        Put back the last turn taken back
+    replay()
+        Apply the turns in the journal file to the world
+    """
+
+    def __init__(self, world, path: str = None):
+        self.world = world
+        self.pending = []
+        self.undo_turns = []
+        self.redo_turns = []
+        self.objects = {}
+        self.path = path
+        world.journal = self
+
+    def __repr__(self):
+        return f"Journal({len(self.undo_turns)} turns, {len(self.redo_turns)} undone)"
+
+    def record(self, game_object, attribute: str, old, new):
+        """Add a change to the turn in progress, called by World.record and WorldGlobals
+
+        Parameters
+        ----------
+        game_object: GameObject
+            The object that changed, None for a global
+        attribute: str
+            What changed, the global's name for a global
+        old:
+            The value before the change
+        new:
+            The value after the change
+        """
+        if game_object is None:
+            self.pending.append((None, attribute, old, new))
+            return
+        if attribute == "registered":
+            self.objects[game_object.key_value] = game_object
+        self.pending.append((game_object.key_value, attribute, old, new))
+
+    def commit(self) -> bool:
+        """Close the turn in progress, returning False if nothing changed during it
+
+        A new turn can't be redone over, so committing one forgets the turns that were undone.
+        """
+        if not self.pending:
+            return False
+        self.undo_turns.append(self.pending)
+        self.redo_turns.clear()
+        self._write({"turn": self.pending})
+        self.pending = []
+        return True
+
+    def undo(self) -> bool:
+        """Commit the turn in progress and take back the last turn, returning False if there isn't one"""
+        self.commit()
+        if not self.undo_turns:
+            return False
+        turn = self.undo_turns.pop()
+        self._apply(reversed(turn), undo=True)
+        self.redo_turns.append(turn)
+        self._write({"undo": len(turn)})
+        return True
+
+    def redo(self) -> bool:
+        """Put back the last turn undo() took back, returning False if there isn't one or a new turn was played"""
+        self.commit()
+        if not self.redo_turns:
+            return False
+        turn = self.redo_turns.pop()
+        self._apply(turn, undo=False)
+        self.undo_turns.append(turn)
+        self._write({"redo": len(turn)})
+        return True
+
+    def clear(self):
+        """Forget every turn, i.e. because the world was restored from a snapshot"""
+        self.pending = []
+        self.undo_turns.clear()
+        self.redo_turns.clear()
+
+    def replay(self) -> int:
+        """Apply the turns in the journal file to the world, i.e. one loaded fresh after a crash
+
+        The turns can be undone and redone afterwards as though they had just been played.
+
+        Returns
+        -------
+        int
+            The number of lines replayed
+        """
+        path, self.path = self.path, None  # don't append the turns being replayed to the file they came from
+        lines = 0
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    entry = json.loads(line)
+                    if "turn" in entry:
+                        turn = [tuple(delta) for delta in entry["turn"]]
+                        self._apply(turn, undo=False)
+                        self.undo_turns.append(turn)
+                        self.redo_turns.clear()
+                    elif "undo" in entry:
+                        self.undo()
+                    elif "redo" in entry:
+                        self.redo()
+                    lines += 1
+        finally:
+            self.path = path
+        return lines
+
+    def _apply(self, deltas, undo: bool):
+        """Set every delta's attribute to its old value (undo) or its new one"""
+        world = self.world
+        world.journal = None  # the changes being applied aren't new ones
+        try:
+            for key_value, attribute, old, new in deltas:
+                value, replaced = (old, new) if undo else (new, old)
+                if key_value is None:
+                    world.globals[attribute] = value
+                elif attribute == "registered":
+                    game_object = self.objects.get(key_value)
+                    if game_object is not None:
+                        if value:
+                            world.register(game_object)
+                        else:
+                            world.unregister(game_object)
+                else:
+                    game_object = world.lookup(key_value)
+                    if game_object is not None:
+                        game_object.apply_change(attribute, value, replaced)
+        finally:
+            world.journal = self
+
+    def _write(self, entry: dict):
+        if self.path is not None:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
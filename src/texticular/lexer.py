@@ -0,0 +1,108 @@
+"""Turns raw player input into the stream of classified words the parser works on"""
+
+import re
+from texticular.game_enums import Directions, TokenKinds
+from texticular.globals import ARTICLES, PREPOSITIONS, PRONOUNS
+from texticular.vocabulary import WORD_PATTERN
+
+# commands are chained with punctuation or "then": "open drawer, take plugs then go east"
+COMMAND_SEPARATOR = re.compile(r"\s*(?:[,.;]|\band then\b|\bthen\b)\s*", re.IGNORECASE)
+
+
+class TokenStream:
+    """The words of one command along with what kind of word each one is and where it started in the input
+
+    Stored as three parallel lists rather than one object per word, so lexing a command allocates a handful of
+    lists no matter how long it is and the word list can be handed straight to the verb and noun tries.
+
+    Attributes
+    ----------
+    words: list
+        The lower case words of the input, punctuation and whitespace removed
+    kinds: list
+        The TokenKinds member of each word
+    offsets: list
+        The character offset of each word in the input
+    """
+    __slots__ = ("words", "kinds", "offsets")
+
+    def __init__(self):
+        self.words = []
+        self.kinds = []
+        self.offsets = []
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __iter__(self):
+        """Yield (word, kind, offset) for each token"""
+        return zip(self.words, self.kinds, self.offsets)
+
+    def __repr__(self):
+        return f"TokenStream({list(self)})"
+
+
+class Lexer:
+    """A precompiled, single pass lexer for player input
+
+    Words are split on whitespace and the punctuation players use between words (, ! . ?) and each one is tagged as
+    a verb, article, preposition, pronoun, direction or plain word in the same pass.
+
+    Attributes
+    ----------
+    verbs: VerbTrie
+        The parser's verb trie, any word that starts a verb phrase is tagged as a VERB. The trie is consulted live
+        so verbs registered after the lexer was built are picked up
+    word_kinds: dict
+        word >> TokenKinds member for the fixed vocabulary (articles, prepositions, pronouns and directions)
+    """
+    def __init__(self, verbs=None, articles: list = ARTICLES, prepositions: list = PREPOSITIONS):
+        self.verbs = verbs
+        self.word_kinds = {}
+        for direction in Directions.__members__:
+            self.word_kinds[direction.lower()] = TokenKinds.DIRECTION
+        for preposition in prepositions:
+            self.word_kinds[preposition] = TokenKinds.PREPOSITION
+        for article in articles:
+            self.word_kinds[article] = TokenKinds.ARTICLE
+        for pronoun in PRONOUNS:
+            self.word_kinds[pronoun] = TokenKinds.PRONOUN
+
+    def add_preposition(self, word: str):
+        """Treat a word as a preposition from now on, i.e. "about" once a syntax entry introduces it"""
+        self.word_kinds[word] = TokenKinds.PREPOSITION
+
+    def lex(self, user_input: str) -> TokenStream:
+        """Split the input into a TokenStream in a single pass
+
+        Args:
+            user_input (str): The raw player input
+
+        Returns:
+            TokenStream: the lower case words of the input with their kinds and offsets
+        """
+        stream = TokenStream()
+        words, kinds, offsets = stream.words, stream.kinds, stream.offsets
+        word_kinds = self.word_kinds
+        verb_words = self.verbs.root.children if self.verbs is not None else {}
+        for match in WORD_PATTERN.finditer(user_input.lower()):
+            word = match.group()
+            kind = word_kinds.get(word)
+            if kind is None:
+                kind = TokenKinds.VERB if word in verb_words else TokenKinds.WORD
+            words.append(word)
+            kinds.append(kind)
+            offsets.append(match.start())
+        return stream
+
+    def split_commands(self, user_input: str) -> list:
+        """Split chained input into the separate commands it is made of
+
+        Args:
+            user_input (str): The raw player input, i.e. "open drawer, take plugs then go east"
+
+        Returns:
+            list: The commands in the order they were typed, i.e. ["open drawer", "take plugs", "go east"]
+        """
+        commands = (command.strip() for command in COMMAND_SEPARATOR.split(user_input))
+        return [command for command in commands if command]
@@ -9,6 +9,7 @@ from typing import Dict, List, Optional, Any
 from texticular.character import NPC
 from texticular.dialogue.dialogue_graph import DialogueGraph, DialogueNode, DialogueChoice
 from texticular.game_object import GameObject
+from texticular.world import World
 
 
 class NPCManager:
@@ -86,9 +87,10 @@ class NPCManager:
         """Get an NPC by key."""
         return self.npcs.get(npc_key)
     
-    def get_npcs_in_room(self, room_key: str) -> List[NPC]:
-        """Get all NPCs currently in a specific room."""
-        return [npc for npc in self.npcs.values() if npc.location_key == room_key]
+    def get_npcs_in_room(self, room_key: str, world: World = None) -> List[NPC]:
+        """Get all NPCs currently in a specific room of the given world (the active one by default)."""
+        world = World.active if world is None else world
+        return [npc for npc in world.contents_of(room_key) if self.npcs.get(npc.key_value) is npc]
     
     def start_conversation(self, player_id: str, npc_key: str) -> Optional[DialogueGraph]:
         """Start a conversation with an NPC."""
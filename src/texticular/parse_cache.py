@@ -0,0 +1,80 @@
+from collections import OrderedDict
+
+
+class ParseCache:
+    """A bounded least recently used cache of parse results
+
+    Scripted playtests and bots send the same handful of commands over and over ("look", "i", "go east"), so the
+    parser keeps the ParseTree of recent commands and hands back a copy instead of lexing and resolving them again.
+
+    Entries are keyed on the normalized input (lower case, runs of whitespace collapsed) plus the token and
+    version of the scope it was parsed against. The scope's version changes every time it is rebuilt, so a command
+    parsed before the player moved or opened something is never reused afterwards. Changes to the parser's own
+    vocabulary (new verbs, objects spawned or renamed) clear the cache outright.
+
+    Attributes
+    ----------
+    max_size: int
+        The most entries kept before the least recently used one is evicted, 0 disables caching
+    hits: int
+        Lookups answered from the cache
+    misses: int
+        Lookups that had to be parsed
+    evictions: int
+        Entries dropped to stay within max_size
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def make_key(user_input: str, scope=None) -> tuple:
+        """Return the cache key for a command parsed against the given scope (or no scope)"""
+        normalized = " ".join(user_input.lower().split())
+        if scope is None:
+            return normalized, None, None
+        # the scope's token rather than its id(), a new scope can be given the id of one that was garbage collected
+        return normalized, scope.token, scope.version
+
+    def get(self, key: tuple):
+        """Return the cached ParseTree for the key and mark it most recently used, or None on a miss"""
+        parse_tree = self.entries.get(key)
+        if parse_tree is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return parse_tree
+
+    def put(self, key: tuple, parse_tree):
+        """Store a ParseTree, evicting the least recently used entry if the cache is full"""
+        if self.max_size <= 0:
+            return
+        self.entries[key] = parse_tree
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every entry, the counters are kept so they still describe the whole session"""
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        """Return the counters along with the current size and hit rate, for sizing the cache"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
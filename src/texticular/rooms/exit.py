@@ -9,6 +9,8 @@ class RoomExit(GameObject):
     "exits-a-b" and "exits-b-a"
 
     """
+    __slots__ = ("connection", "key_object")
+
     def __init__(self, key_value: str, name: str, descriptions: dict, location_key: str, connection: str,
                  key_object = None, flags=None):
         """The constructor for the Exit Class
@@ -1,6 +1,7 @@
 from texticular.game_object import GameObject
 from texticular.game_enums import Flags, Directions
 from texticular.rooms.exit import RoomExit
+from texticular.items.item_collection import ItemCollection
 
 
 class Room(GameObject):
@@ -17,8 +18,8 @@ class Room(GameObject):
         At the very least should contain  {"Main": "Some Room Description"}
     exits: dict
         dictionary with "Directions" enum as the key and an Exit object as the value
-    items: list
-        A list of interactable items in the  room
+    items: ItemCollection
+        The interactable items in the room, in the order they were put there
     npcs: list
         A list of the npcs that are present in the room
 
@@ -28,11 +29,13 @@ class Room(GameObject):
         The constructor for the Room Class
 
     """
+    __slots__ = ("times_visited", "items", "exits", "npcs")
+
     room_count = 0
 
     def __init__(self, key_value: str, name: str, descriptions: dict, location_key="Map", flags=None):
         self.times_visited = 0
-        self.items = []
+        self.items = ItemCollection(owner=self)
         self.exits = {}
         self.npcs = []
         super().__init__(key_value, name, descriptions, location_key, flags)
@@ -51,22 +54,68 @@ class Room(GameObject):
         exit.location_key = "NOWHERE-LAND"
         self.exits[direction] = None
 
-    def remove_item(self, item:GameObject):
+    def add_item(self, item: GameObject) -> bool:
+        """Put an item in the room, i.e. one the player dropped"""
+        self.items.append(item)
+        item.move(self.key_value)
+        return True
+
+    def add_items(self, items: list) -> list:
+        """Put several items in the room in one go and return them"""
+        for item in items:
+            self.add_item(item)
+        return items
+
+    def remove_item(self, item:GameObject, location_key: str = None):
         """Remove an item from any 'item' collections in the current room or from any containers inside the room
 
+        The item's location says which container (if any) holds it, so only that one is searched. A caller that has
+        already moved the item (i.e. into the inventory) passes the location_key it had before the move.
         """
 
-        containers = [container for container in self.items if Flags.CONTAINERBIT in container.flags]
-        for container in containers:
-            if item in container.items:
-                container.remove_item(item)
-                return True
+        container = self.world.lookup(location_key if location_key is not None else item.location_key)
+        if (container is not None and container is not self and container.location_key == self.key_value and
+                Flags.CONTAINERBIT in container.flags and item in container.items):
+            container.remove_item(item)
+            return True
 
-        if item in self.items:
-            self.items.remove(item)  # pull the item out of the room "items" array
+        if self.items.discard(item):  # pull the item out of the room "items" collection
             item.remove()  # set its location to "nowhereLand"
         return True
 
+    def remove_items(self, items: list, location_keys: set = None):
+        """Remove several items from the room and the containers inside it, only visiting the containers that hold
+        one of them
+
+        A caller that has already moved the items passes the location_keys they had before the move.
+        """
+        if location_keys is None:
+            location_keys = {item.location_key for item in items}
+        for location_key in set(location_keys) - {self.key_value}:
+            container = self.world.lookup(location_key)
+            if (container is not None and container.location_key == self.key_value and
+                    Flags.CONTAINERBIT in container.flags):
+                container.remove_items(items)
+
+        removed = [item for item in items if self.items.discard(item)]
+        for item in removed:
+            item.remove()
+        return True
+
+    def capture_state(self) -> tuple:
+        return super().capture_state() + (tuple(self.items), self.times_visited)
+
+    def restore_state(self, state: tuple):
+        items, self.times_visited = state[5:7]
+        self.items = ItemCollection(items, owner=self)
+        super().restore_state(state)
+
+    def apply_change(self, attribute: str, value, replaced):
+        if attribute == "items":
+            self.items.apply_change(value, replaced, self.world)
+        else:
+            super().apply_change(attribute, value, replaced)
+
     def describe(self) -> list:
         """Return a list containing the desciption of everything relevant in the current room
 
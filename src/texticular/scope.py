@@ -0,0 +1,131 @@
+from itertools import count
+
+from texticular.game_object import GameObject
+from texticular.game_enums import Flags
+from texticular.rooms.room import Room
+
+
+class Scope:
+    """The set of game objects the player can currently refer to
+
+    Scope is everything in the player's room, the contents of any open containers or surfaces in the room
+    (recursively), the player's inventory and anything carried in it, and any NPCs in the room. The parser only
+    resolves nouns against this set, so same-named objects in other rooms don't get in the way and lookups only have
+    to consider what is nearby.
+
+    The set is rebuilt at most once per turn by refresh(), and only after something happened that could change it:
+    an object moving into or out of scope, the player changing rooms, or a container in scope opening or closing.
+
+    Attributes
+    ----------
+    player: Player
+        The character whose surroundings define the scope
+    keys: set
+        The key_values of every object in scope
+    holders: set
+        The key_values of the objects whose contents are in scope (the room, the player and open containers)
+    version: int
+        Incremented every time the scope is rebuilt, so callers can tell when cached lookups are out of date
+    token: int
+        Unique to this scope for the life of the process, unlike id() it is never handed to a later scope, so
+        (token, version) identifies one build of one scope
+    """
+    _tokens = count()
+
+    def __init__(self, player):
+        self.player = player
+        self.token = next(Scope._tokens)
+        self.keys = set()
+        self.holders = set()
+        self.version = 0
+        self.stale = True
+        player.world.subscribe(self.on_registry_event)
+
+    def __contains__(self, key_value) -> bool:
+        return key_value in self.keys
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __iter__(self):
+        return iter(self.keys)
+
+    @staticmethod
+    def exposes_contents(game_object: GameObject) -> bool:
+        """Return True if the things located in the object can be seen and reached from outside of it"""
+        if isinstance(game_object, Room):
+            return True
+        flags = game_object.flags
+        return Flags.SURFACEBIT in flags or (Flags.CONTAINERBIT | Flags.OPENBIT) in flags
+
+    def room_key(self) -> str:
+        """Return the key of the room the player is in"""
+        room = getattr(self.player, "location", None)
+        return room.key_value if room is not None else self.player.location_key
+
+    def item_keys(self) -> set:
+        """Return the keys of the things in scope "all" can refer to: everything but the room, the player and the
+        player's inventory"""
+        inventory = getattr(self.player, "inventory", None)
+        excluded = {self.room_key(), self.player.key_value, inventory.key_value if inventory is not None else None}
+        return self.keys - excluded
+
+    def refresh(self) -> bool:
+        """Rebuild the scope if anything relevant changed since the last time it was built
+
+        Returns
+        -------
+        bool
+            True if the scope was rebuilt
+        """
+        if not self.stale:
+            return False
+
+        world = self.player.world
+        keys = set()
+        holders = set()
+        pending = [world.lookup(self.room_key()), self.player]
+        while pending:
+            game_object = pending.pop()
+            if game_object is None or game_object.key_value in keys or Flags.INVISIBLE in game_object.flags:
+                continue
+            keys.add(game_object.key_value)
+            if game_object is self.player or self.exposes_contents(game_object):
+                holders.add(game_object.key_value)
+                pending.extend(world.contents_of(game_object.key_value))
+
+        self.keys = keys
+        self.holders = holders
+        self.version += 1
+        self.stale = False
+        return True
+
+    def invalidate(self):
+        """Force the scope to be rebuilt on the next refresh"""
+        self.stale = True
+
+    def on_registry_event(self, event: str, game_object: GameObject, detail=None):
+        """Mark the scope stale when a registry event could change what the player can refer to
+
+        Parameters
+        ----------
+        event: str
+            The event published by GameObject, see GameObject.subscribe
+        game_object: GameObject
+            The object the event happened to
+        detail:
+            The previous location_key for "move" events, the flag for "flags" events
+        """
+        if self.stale:
+            return
+        if event == "move":
+            if (game_object is self.player or detail in self.holders or
+                    game_object.location_key in self.holders):
+                self.invalidate()
+        elif event == "flags":
+            if detail in (Flags.OPENBIT, Flags.INVISIBLE, Flags.SURFACEBIT) and (
+                    game_object.key_value in self.keys or game_object.location_key in self.holders):
+                self.invalidate()
+        elif event in ("add", "remove"):
+            if game_object.location_key in self.holders:
+                self.invalidate()
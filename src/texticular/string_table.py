@@ -0,0 +1,74 @@
+"""Interning for the strings in the game's JSON config files"""
+
+import sys
+
+
+class StringTable:
+    """A string interning table: each distinct string loaded through it is stored once
+
+    Loading a config file through a table (game_loader.load_json(path, strings=table)) interns every key and string
+    value in it, including the strings in synonym, adjective and flag lists, so text repeated across items, exits and
+    rooms ("Main", a door described the same from both sides, a generated world's stock descriptions) is held once
+    however many objects refer to it. Only strings are interned, every object still gets its own descriptions dict
+    and lists.
+
+    The table holds on to every string it has seen for as long as it is kept, so it is meant to be dropped once
+    loading is done (load_game_map does this unless it's given a table), or kept by a caller that loads the same
+    content into several worlds and wants them to share it.
+
+    Attributes
+    ----------
+    strings: dict
+        text >> the one copy of it
+    saved_bytes: int
+        The bytes of the duplicate strings dropped in favor of the table's copies so far
+    duplicates: int
+        The number of duplicate strings dropped so far
+
+    Methods
+    ---------
+    intern(text)
+        Return the table's copy of a string
+    intern_record(record)
+        Intern a decoded JSON object, used as json.load's object_hook
+    report()
+        Return how much the table has saved
+    """
+
+    def __init__(self):
+        self.strings = {}
+        self.saved_bytes = 0
+        self.duplicates = 0
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def __repr__(self):
+        return f"StringTable({len(self.strings)} strings, {self.saved_bytes} bytes saved)"
+
+    def intern(self, text: str) -> str:
+        """Return the table's copy of a string, adding it if this is the first time it's been seen"""
+        interned = self.strings.setdefault(text, text)
+        if interned is not text:
+            self.saved_bytes += sys.getsizeof(text)
+            self.duplicates += 1
+        return interned
+
+    def intern_record(self, record: dict) -> dict:
+        """Return a decoded JSON object with its keys, its strings and the strings in its lists interned"""
+        interned = {}
+        for key, value in record.items():
+            if isinstance(value, str):
+                value = self.intern(value)
+            elif isinstance(value, list):
+                value = [self.intern(element) if isinstance(element, str) else element for element in value]
+            interned[self.intern(key)] = value
+        return interned
+
+    def report(self) -> dict:
+        """Return the number of distinct strings and duplicates dropped and the bytes saved"""
+        return {
+            "strings": len(self.strings),
+            "duplicates": self.duplicates,
+            "saved_bytes": self.saved_bytes,
+        }
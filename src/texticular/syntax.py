@@ -0,0 +1,195 @@
+"""ZIL style SYNTAX definitions compiled into a per verb automaton
+
+A syntax entry spells out a sentence shape a verb accepts, the way Infocom's ZIL did:
+
+    "put OBJECT in OBJECT"      = verb_actions.put
+    "ask OBJECT about OBJECT"   = verb_actions.talk
+
+Every verb understands the default shapes the parser has always accepted: the bare verb, VERB OBJECT,
+VERB PREPOSITION OBJECT and VERB OBJECT PREPOSITION OBJECT for any of the parser's prepositions. Syntax entries add
+shapes on top of those (with new prepositions like "about") and bind a handler to them.
+"""
+
+from texticular.vocabulary import split_phrase
+
+OBJECT = "object"
+
+
+class SyntaxState:
+    """A node of a verb's automaton, reached after reading some prefix of a sentence shape
+
+    Attributes
+    ----------
+    edges: dict
+        preposition >> the state after reading it
+    object: SyntaxState
+        the state after reading a noun phrase here, None if no noun phrase can start here
+    terminal: bool
+        True if a sentence can end here
+    handler: callable
+        the action bound to the sentence shape ending here, None to use the verb's own handler
+    """
+    __slots__ = ("edges", "object", "terminal", "handler")
+
+    def __init__(self):
+        self.edges = {}
+        self.object = None
+        self.terminal = False
+        self.handler = None
+
+
+class SyntaxMatch:
+    """The result of running the words after a verb through the verb's automaton
+
+    Attributes
+    ----------
+    objects: list
+        the noun phrases in the order they appeared, the first is the direct object and the second the indirect one
+    prepositions: list
+        the prepositions in the order they appeared
+    handler: callable
+        the handler bound to the matched shape or the verb's own handler, None if neither is known
+    complete: bool
+        False if the input stopped where the shape still expected a noun phrase ("put the key in")
+    """
+    __slots__ = ("objects", "prepositions", "handler", "complete")
+
+    def __init__(self, objects: list, prepositions: list, handler, complete: bool):
+        self.objects = objects
+        self.prepositions = prepositions
+        self.handler = handler
+        self.complete = complete
+
+
+class SyntaxTable:
+    """Every verb's sentence shapes compiled into automata keyed by canonical verb ID
+
+    Matching reads each word after the verb once: a preposition follows an edge, any other word either starts or
+    continues a noun phrase. A known preposition that the shape doesn't allow at that point ends the match, so the
+    cost is linear in the number of words no matter how many shapes a verb has.
+
+    Attributes
+    ----------
+    prepositions: list
+        the prepositions every verb accepts in the default shapes
+    handlers: dict
+        canonical verb ID >> the handler the verb maps to in the controller's command table
+    rules: dict
+        canonical verb ID >> [(shape, handler)], the syntax entries declared for the verb
+    automata: dict
+        canonical verb ID >> start state, verbs without syntax entries share default_automaton
+    """
+
+    def __init__(self, prepositions: list):
+        self.prepositions = prepositions
+        self.handlers = {}
+        self.rules = {}
+        self.automata = {}
+        self.default_automaton = self.compile([])
+
+    def default_shapes(self) -> list:
+        """Return the shapes every verb accepts, as lists of prepositions and OBJECT"""
+        shapes = [[], [OBJECT]]
+        for preposition in self.prepositions:
+            shapes.append([preposition, OBJECT])
+            shapes.append([OBJECT, preposition, OBJECT])
+        return shapes
+
+    def compile(self, rules: list) -> SyntaxState:
+        """Build the automaton for the default shapes plus the given (shape, handler) rules"""
+        start = SyntaxState()
+        for shape, handler in [(shape, None) for shape in self.default_shapes()] + rules:
+            state = start
+            for element in shape:
+                if element == OBJECT:
+                    if state.object is None:
+                        state.object = SyntaxState()
+                    state = state.object
+                else:
+                    state = state.edges.setdefault(element, SyntaxState())
+            state.terminal = True
+            if handler is not None:
+                state.handler = handler
+        return start
+
+    def add(self, verb_id: int, shape: list, handler=None):
+        """Add a sentence shape to a verb and recompile the verb's automaton
+
+        Parameters
+        ----------
+        verb_id: int
+            The canonical verb ID the shape belongs to
+        shape: list
+            The words after the verb: prepositions and OBJECT, i.e. [OBJECT, "in", OBJECT]
+        handler: callable
+            The action to run for sentences of this shape, None for the verb's own handler
+        """
+        if shape.count(OBJECT) > 2:
+            raise ValueError(f"A sentence can have at most a direct and an indirect object: {shape}")
+        self.rules.setdefault(verb_id, []).append((shape, handler))
+        self.automata[verb_id] = self.compile(self.rules[verb_id])
+
+    def match(self, verb_id: int, tokens: list, known_prepositions=()):
+        """Run the words after the verb through the verb's automaton
+
+        Parameters
+        ----------
+        verb_id: int
+            The canonical ID of the verb at the start of the command
+        tokens: list
+            The words after the verb, articles removed
+        known_prepositions: collection
+            Every word the parser treats as a preposition. One of these where the shape doesn't allow it fails the
+            match instead of being read as part of a noun phrase
+
+        Returns
+        -------
+        SyntaxMatch
+            The noun phrases, prepositions and handler of the sentence, or None if no shape of the verb fits
+        """
+        state = self.automata.get(verb_id, self.default_automaton)
+        objects = []
+        prepositions = []
+        phrase = None
+        for token in tokens:
+            following = state.edges.get(token)
+            if following is not None:
+                if phrase is not None:
+                    objects.append(phrase)
+                    phrase = None
+                prepositions.append(token)
+                state = following
+            elif token in known_prepositions:
+                return None
+            elif phrase is not None:
+                phrase.append(token)
+            elif state.object is not None:
+                phrase = [token]
+                state = state.object
+            else:
+                return None
+        if phrase is not None:
+            objects.append(phrase)
+        handler = state.handler if state.terminal and state.handler is not None else self.handlers.get(verb_id)
+        return SyntaxMatch(objects, prepositions, handler, state.terminal)
+
+
+def parse_shape(pattern: str, verbs) -> tuple:
+    """Split a syntax entry like "ask OBJECT about OBJECT" into its verb phrase and shape
+
+    The verb is the longest known verb phrase the entry starts with ("look at OBJECT" is "look" followed by the
+    preposition "at"). When the entry doesn't start with a known verb, everything before the first OBJECT is the verb.
+
+    Returns
+    -------
+    tuple
+        (verb phrase, shape) where shape is a list of prepositions and OBJECT
+    """
+    words = split_phrase(pattern)
+    _, end = verbs.match(words)
+    if end == 0:
+        end = words.index(OBJECT) if OBJECT in words else len(words)
+    if end == 0:
+        raise ValueError(f"Syntax entry '{pattern}' doesn't start with a verb")
+    # split_phrase lower cases the entry, which turns the OBJECT placeholder into the OBJECT constant already
+    return " ".join(words[:end]), list(words[end:])
@@ -0,0 +1,648 @@
+"""Lookup structures the command parser uses to turn player words into game objects"""
+
+import re
+from itertools import count
+
+# a word is anything between whitespace and the punctuation players put between words
+WORD_PATTERN = re.compile(r"[^\s,!\.\?]+")
+
+
+def split_phrase(phrase: str) -> tuple:
+    """Split a synonym or name into the same lower case tokens the parser produces from player input
+
+    Example:
+        >>> split_phrase("Bad Mother Fuckin' Key")
+        ('bad', 'mother', "fuckin'", 'key')
+    """
+    return tuple(WORD_PATTERN.findall(phrase.lower()))
+
+
+def compact_phrase(phrase) -> str:
+    """Squash a phrase into the single word players type when they leave out the spaces ("earplugs")"""
+    tokens = split_phrase(phrase) if isinstance(phrase, str) else phrase
+    return "".join(tokens)
+
+
+def edit_distance(word: str, other: str, limit: int) -> int:
+    """Return the number of single letter insertions, deletions, substitutions or adjacent swaps between two words
+
+    Gives up early and returns limit + 1 once the words are known to be further apart than limit.
+    """
+    if abs(len(word) - len(other)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(other) + 1))
+    for i in range(1, len(word) + 1):
+        current = [i] + [0] * len(other)
+        for j in range(1, len(other) + 1):
+            cost = 0 if word[i - 1] == other[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and word[i - 1] == other[j - 2] and word[i - 2] == other[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class SpellingIndex:
+    """Corrects typos against a vocabulary using a precomputed deletion dictionary (the SymSpell approach)
+
+    Every word is stored under each variant that can be made by deleting up to max_distance of its letters. A typo
+    shares at least one deletion variant with any word it is within max_distance edits of, so a lookup only has to
+    generate the typo's own handful of variants and check the few words filed under them, however big the
+    vocabulary is. Candidates are then confirmed with a real edit distance.
+
+    Short words are left alone (too many near misses between "box", "fox" and "bog") and long words are allowed
+    one more edit than medium ones.
+
+    The deletion dictionary is kept up to date as words are added and removed, so correcting the first typo costs
+    no more than any other. Most variants are produced by a single word, those are filed as the bare word rather
+    than a collection of one.
+
+    Attributes
+    ----------
+    max_distance: int
+        The most edits a correction can be from what was typed
+    min_length: int
+        Words shorter than this are never corrected
+    words: dict
+        word >> reference count
+    deletes: dict
+        deletion variant >> the word that produces it, or an insertion ordered dict of the words if several do
+    """
+
+    def __init__(self, max_distance: int = 2, min_length: int = 4):
+        self.max_distance = max_distance
+        self.min_length = min_length
+        self.words = {}
+        self.deletes = {}
+        # word >> when it was added, the earliest word wins ties
+        self._word_order = {}
+        self._word_counter = count()
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.words
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def allowed_distance(self, word: str) -> int:
+        """Return how many edits a word of this length may be corrected by"""
+        if len(word) < self.min_length:
+            return 0
+        return 1 if len(word) < 8 else self.max_distance
+
+    @staticmethod
+    def deletions(word: str, depth: int) -> set:
+        """Return the word and every variant of it with up to depth letters deleted"""
+        variants = {word}
+        frontier = {word}
+        for _ in range(depth):
+            frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+            variants |= frontier
+        return variants
+
+    def add(self, word: str):
+        """Add a word to the vocabulary, adding the same word again only bumps its reference count"""
+        if word in self.words:
+            self.words[word] += 1
+            return
+        self.words[word] = 1
+        self._word_order[word] = next(self._word_counter)
+        deletes = self.deletes
+        for variant in self.deletions(word, self.allowed_distance(word)):
+            words = deletes.get(variant)
+            if words is None:
+                deletes[variant] = word
+            elif isinstance(words, str):
+                deletes[variant] = {words: None, word: None}
+            else:
+                words[word] = None
+
+    def remove(self, word: str):
+        """Drop one reference to a word, it is forgotten once nothing refers to it"""
+        references = self.words.get(word)
+        if references is None:
+            return
+        if references > 1:
+            self.words[word] = references - 1
+            return
+        del self.words[word]
+        del self._word_order[word]
+        deletes = self.deletes
+        for variant in self.deletions(word, self.allowed_distance(word)):
+            words = deletes.get(variant)
+            if words is None:
+                continue
+            if isinstance(words, str):
+                if words == word:
+                    del deletes[variant]
+                continue
+            words.pop(word, None)
+            if len(words) == 1:
+                deletes[variant] = next(iter(words))
+
+    def correct(self, word: str, limit: int = None):
+        """Return the closest known word to what was typed
+
+        Parameters
+        ----------
+        word: str
+            What was typed
+        limit: int
+            The most edits allowed, by default what allowed_distance gives a word of this length. A part of a longer
+            word is given the whole word's limit
+
+        Returns
+        -------
+        str
+            The word itself if it is known, the nearest word within the allowed distance, or None
+        """
+        if word in self.words:
+            return word
+        if limit is None:
+            limit = self.allowed_distance(word)
+        if not limit:
+            return None
+        best, best_rank = None, (limit + 1, 0)
+        seen = set()
+        for variant in self.deletions(word, limit):
+            words = self.deletes.get(variant, ())
+            for candidate in ((words,) if isinstance(words, str) else words):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                rank = (edit_distance(word, candidate, limit), self._word_order[candidate])
+                if rank < best_rank:
+                    best, best_rank = candidate, rank
+        return best
+
+
+class _TrieNode:
+    __slots__ = ("children", "keys", "adjective")
+
+    def __init__(self):
+        self.children = {}
+        # used as an insertion ordered set so the first object registered under a phrase wins ties
+        self.keys = {}
+        # compact form of the adjective that ends at this node (adjective trie only)
+        self.adjective = None
+
+
+class NounPhraseIndex:
+    """Resolves the noun phrase at the start of the player's input to the game object it names
+
+    A noun phrase is any number of an object's adjectives, in any order and without repeats, followed by one of its
+    synonyms: "yellow crusty ear plugs". The adjectives and synonyms can also be squashed into a single word:
+    "crustyearplugs". Rather than storing every permutation, the index keeps two word level tries, one of synonyms
+    and one of adjectives, plus the set of adjectives each object owns. The adjectives typed by the player are
+    checked against that set when a synonym is found, so memory grows with the number of synonyms and adjectives
+    rather than with their permutations and the lookup only walks as many nodes as there are tokens.
+
+    Attributes
+    ----------
+    nouns: _TrieNode
+        token trie of synonyms, terminal nodes hold the keys of the objects using that synonym
+    adjectives: _TrieNode
+        token trie of adjectives, terminal nodes hold the compact form of the adjective
+    compact_nouns: dict
+        compact synonym ("earplugs") >> insertion ordered keys of the objects using it
+    compact_adjectives: set
+        compact forms of every indexed adjective ("beatup")
+    object_adjectives: dict
+        object key >> frozenset of the compact forms of the object's adjectives
+    spelling: SpellingIndex
+        every synonym and adjective word and the squashed form of multi word ones, for correcting typos when an
+        exact match fails (see correct)
+
+    Methods
+    ---------
+    add(object_key, synonyms, adjectives=None)
+        Index an object's synonyms and adjectives
+    remove(object_key)
+        Forget everything indexed for an object
+    match(tokens, start=0, scope=None)
+        Return the object key and end offset of the longest noun phrase found at tokens[start:]
+    match_all(tokens, start=0, scope=None)
+        Like match, but return every object the phrase could refer to
+    correct(tokens)
+        Return the tokens with misspelled synonyms and adjectives corrected
+    in_registration_order(keys)
+        Sort object keys by when they were added to the index
+    """
+
+    def __init__(self):
+        self.nouns = _TrieNode()
+        self.adjectives = _TrieNode()
+        self.compact_nouns = {}
+        self.compact_adjectives = set()
+        self.object_adjectives = {}
+        self.spelling = SpellingIndex()
+        self._registration_order = {}
+        self._registration_counter = count()
+        # object key >> (synonym trie nodes, compact synonyms, words) so an object can be dropped without a rebuild
+        self._object_entries = {}
+
+    def add(self, object_key: str, synonyms: list, adjectives: list = None):
+        """Index the synonyms and adjectives of an object
+
+        Parameters
+        ----------
+        object_key: str
+            The key_value of the object the phrases refer to
+        synonyms: list
+            The nouns the object answers to ("Ear Plugs", "Plugs")
+        adjectives: list
+            The words that can be put in front of any synonym ("Crusty", "Yellow")
+        """
+        self._registration_order.setdefault(object_key, next(self._registration_counter))
+        noun_nodes, compact_nouns, words = self._object_entries.setdefault(object_key, ([], [], []))
+        owned_adjectives = set()
+        for adjective in adjectives or []:
+            tokens = split_phrase(adjective)
+            if not tokens:
+                continue
+            node = self.adjectives
+            for token in tokens:
+                node = node.children.setdefault(token, _TrieNode())
+                self.spelling.add(token)
+                words.append(token)
+            node.adjective = compact_phrase(tokens)
+            if len(tokens) > 1:
+                # so a misspelled squashed adjective ("beatpu") can be corrected too
+                self.spelling.add(node.adjective)
+                words.append(node.adjective)
+            self.compact_adjectives.add(node.adjective)
+            owned_adjectives.add(node.adjective)
+        self.object_adjectives[object_key] = frozenset(owned_adjectives)
+
+        for synonym in synonyms:
+            tokens = split_phrase(synonym)
+            if not tokens:
+                continue
+            node = self.nouns
+            for token in tokens:
+                node = node.children.setdefault(token, _TrieNode())
+                self.spelling.add(token)
+                words.append(token)
+            node.keys[object_key] = None
+            noun_nodes.append(node)
+            compact = compact_phrase(tokens)
+            if len(tokens) > 1:
+                # so a misspelled squashed synonym ("nighstand") can be corrected too, with adjectives squashed on
+                # the front of it they're peeled off first (see correct)
+                self.spelling.add(compact)
+                words.append(compact)
+            self.compact_nouns.setdefault(compact, {})[object_key] = None
+            compact_nouns.append(compact)
+
+    def remove(self, object_key: str):
+        """Forget every synonym and adjective indexed for an object
+
+        Only the trie nodes the object was added to are touched, so the cost doesn't depend on the size of the index.
+
+        Parameters
+        ----------
+        object_key: str
+            The key_value of the object to drop from the index
+        """
+        noun_nodes, compact_nouns, words = self._object_entries.pop(object_key, ((), (), ()))
+        for word in words:
+            self.spelling.remove(word)
+        for node in noun_nodes:
+            node.keys.pop(object_key, None)
+        for compact in compact_nouns:
+            keys = self.compact_nouns.get(compact)
+            if keys is not None:
+                keys.pop(object_key, None)
+                if not keys:
+                    del self.compact_nouns[compact]
+        self.object_adjectives.pop(object_key, None)
+        self._registration_order.pop(object_key, None)
+
+    def match(self, tokens: list, start: int = 0, scope=None):
+        """Find the longest noun phrase at the beginning of tokens[start:]
+
+        Parameters
+        ----------
+        tokens: list
+            The tokenized player input
+        start: int
+            The offset into tokens where the noun phrase begins
+        scope: Scope
+            Anything supporting `key in scope`. When given, only objects in scope are considered
+
+        Returns
+        -------
+        tuple
+            (object_key, end) where tokens[start:end] is the matched phrase, or (None, start) when nothing matches
+        """
+        best = self._find(tokens, start, scope)
+        return best[0], best[1]
+
+    def match_all(self, tokens: list, start: int = 0, scope=None):
+        """Find the longest noun phrase at the beginning of tokens[start:] and every object it could refer to
+
+        The trie node a phrase ends at already holds every object using that synonym, so a phrase only one object
+        uses is settled without looking any further. Otherwise the objects are narrowed down to the in scope ones
+        that own every adjective typed.
+
+        Parameters
+        ----------
+        tokens: list
+            The tokenized player input
+        start: int
+            The offset into tokens where the noun phrase begins
+        scope: Scope
+            Anything supporting `key in scope`. When given, only objects in scope are considered
+
+        Returns
+        -------
+        tuple
+            (object_keys, end) with the keys in registration order, the first being the one match() returns, or
+            ([], start) when nothing matches
+        """
+        best = self._find(tokens, start, scope)
+        if best[0] is None:
+            return [], start
+        entries = best[2]
+        if len(entries) == 1 and len(entries[0][0]) == 1:
+            return [best[0]], best[1]
+        candidates = {}
+        for keys, adjectives in entries:
+            for object_key in self._keys_with(keys, adjectives, scope):
+                candidates[object_key] = None
+        return self.in_registration_order(candidates), best[1]
+
+    def _find(self, tokens: list, start: int, scope) -> list:
+        """Return [object_key, end, entries] for the longest phrase, entries are the (keys, adjectives) pairs of
+        every reading of the phrase that ends at end"""
+        best = [None, start, []]
+        self._match_nouns(tokens, start, frozenset(), scope, best)
+        self._match_adjectives(tokens, start, frozenset(), scope, best)
+        if start < len(tokens) and best[1] == start:
+            object_key, keys, adjectives = self._match_compact(tokens[start], frozenset(), scope)
+            if object_key is not None:
+                best[0], best[1], best[2] = object_key, start + 1, [(keys, adjectives)]
+        return best
+
+    def correct(self, tokens: list):
+        """Correct misspelled synonym and adjective words, for a second attempt when match finds nothing
+
+        Parameters
+        ----------
+        tokens: list
+            The tokenized noun phrase
+
+        Returns
+        -------
+        list
+            A copy of tokens with each unknown word replaced by the closest synonym or adjective word, or None if no
+            word could be corrected
+        """
+        corrected = list(tokens)
+        changed = False
+        for index, token in enumerate(tokens):
+            if token in self.spelling:
+                continue
+            replacement = self.spelling.correct(token)
+            if replacement is None:
+                replacement = self._correct_squashed(token)
+            if replacement is not None and replacement != token:
+                corrected[index] = replacement
+                changed = True
+        return corrected if changed else None
+
+    def _correct_squashed(self, word: str):
+        """Correct a squashed adjective and synonym word ("crustyearplgus", "nighstand") without indexing every
+        adjective and synonym combination: known adjectives are peeled off the front and the rest is corrected, or
+        if the rest is a known synonym the adjective in front of it is. Either way the word put back together has to
+        be within the edits the whole word is allowed"""
+        limit = self.spelling.allowed_distance(word)
+        if not limit:
+            return None
+        for split in range(1, len(word)):
+            adjective, rest = word[:split], word[split:]
+            if adjective in self.compact_adjectives:
+                noun = self.spelling.correct(rest, limit)
+                if noun not in self.compact_nouns:
+                    noun = self._correct_squashed(rest)
+            elif rest in self.compact_nouns:
+                noun, adjective = rest, self.spelling.correct(adjective, limit)
+                if adjective not in self.compact_adjectives:
+                    continue
+            else:
+                continue
+            if noun is not None and edit_distance(word, adjective + noun, limit) <= limit:
+                return adjective + noun
+        return None
+
+    def in_registration_order(self, keys) -> list:
+        """Sort object keys by when they were added to the index, keys that were never added go last
+
+        Parameters
+        ----------
+        keys: iterable
+            The object keys to sort, i.e. the unordered keys of a Scope
+
+        Returns
+        -------
+        list
+            The keys in the same order match() breaks ties in
+        """
+        unindexed = len(self._registration_order)
+        return sorted(keys, key=lambda object_key: (self._registration_order.get(object_key, unindexed), object_key))
+
+    def _keys_with(self, keys: dict, adjectives: frozenset, scope) -> list:
+        """Return every key of an in scope object that owns all of the given adjectives"""
+        if scope is not None and len(scope) < len(keys):
+            return [object_key for object_key in scope
+                    if object_key in keys and adjectives <= self.object_adjectives[object_key]]
+        return [object_key for object_key in keys
+                if adjectives <= self.object_adjectives[object_key] and (scope is None or object_key in scope)]
+
+    def _first_key_with(self, keys: dict, adjectives: frozenset, scope):
+        """Return the first key (in registration order) of an in scope object that owns all of the given adjectives"""
+        if scope is not None and len(scope) < len(keys):
+            # a handful of nearby objects against a word used all over the world, walk the smaller side
+            candidates = [object_key for object_key in scope
+                          if object_key in keys and adjectives <= self.object_adjectives[object_key]]
+            return min(candidates, key=self._registration_order.__getitem__, default=None)
+        for object_key in keys:
+            if adjectives <= self.object_adjectives[object_key] and (scope is None or object_key in scope):
+                return object_key
+        return None
+
+    def _registered_before(self, object_key: str, other_key: str) -> bool:
+        return other_key is None or self._registration_order[object_key] < self._registration_order[other_key]
+
+    def _match_nouns(self, tokens: list, position: int, adjectives: frozenset, scope, best: list):
+        node = self.nouns
+        for index in range(position, len(tokens)):
+            node = node.children.get(tokens[index])
+            if node is None:
+                return
+            if node.keys and index + 1 >= best[1]:
+                object_key = self._first_key_with(node.keys, adjectives, scope)
+                if object_key is None:
+                    continue
+                if index + 1 > best[1]:
+                    best[0], best[1], best[2] = object_key, index + 1, []
+                elif self._registered_before(object_key, best[0]):
+                    best[0] = object_key
+                best[2].append((node.keys, adjectives))
+
+    def _match_adjectives(self, tokens: list, position: int, adjectives: frozenset, scope, best: list):
+        node = self.adjectives
+        for index in range(position, len(tokens)):
+            node = node.children.get(tokens[index])
+            if node is None:
+                return
+            if node.adjective is not None and node.adjective not in adjectives:
+                typed = adjectives | {node.adjective}
+                self._match_nouns(tokens, index + 1, typed, scope, best)
+                self._match_adjectives(tokens, index + 1, typed, scope, best)
+
+    def _match_compact(self, word: str, adjectives: frozenset, scope):
+        """Peel adjectives off the front of a squashed word ("crustyyellowearplugs") until a synonym is left
+
+        Returns (object_key, keys, adjectives) for the synonym's keys and the adjectives peeled off, or all None
+        """
+        for split in range(1, len(word)):
+            adjective = word[:split]
+            if adjective in self.compact_adjectives and adjective not in adjectives:
+                typed = adjectives | {adjective}
+                rest = word[split:]
+                keys = self.compact_nouns.get(rest)
+                if keys:
+                    object_key = self._first_key_with(keys, typed, scope)
+                    if object_key is not None:
+                        return object_key, keys, typed
+                found = self._match_compact(rest, typed, scope)
+                if found[0] is not None:
+                    return found
+        return None, None, None
+
+
+class _VerbNode:
+    __slots__ = ("children", "verb_id")
+
+    def __init__(self):
+        self.children = {}
+        self.verb_id = None
+
+
+class VerbTrie:
+    """A token level trie of every verb phrase the parser understands, compiled down to integer verb IDs
+
+    Single and multi word verbs ("look", "wipe off", "turn on") share one trie, so the verb at the start of the input
+    is found in a single pass over the tokens. Aliases that do the same thing ("get"/"take", "look"/"examine") share
+    one canonical ID, the ID of whichever phrase was registered first.
+
+    Attributes
+    ----------
+    root: _VerbNode
+        The empty phrase, every verb phrase hangs off of it one token at a time
+    verb_ids: dict
+        verb phrase >> canonical verb ID
+    verb_names: list
+        canonical verb ID >> canonical verb phrase, None for an ID no phrase maps to any more
+    spelling: SpellingIndex
+        the words verb phrases start with, for correcting a misspelled verb
+
+    Methods
+    ---------
+    add(phrase, canonical=None)
+        Add a verb phrase, optionally as an alias of another phrase, and return its verb ID
+    match(tokens, start=0)
+        Return the verb ID and end offset of the longest verb phrase found at tokens[start:]
+    """
+
+    def __init__(self, phrases: list = None):
+        self.root = _VerbNode()
+        self.verb_ids = {}
+        self.verb_names = []
+        self.spelling = SpellingIndex()
+        for phrase in phrases or []:
+            self.add(phrase)
+
+    def __contains__(self, phrase: str) -> bool:
+        return " ".join(split_phrase(phrase)) in self.verb_ids
+
+    def __len__(self) -> int:
+        return len(self.verb_ids)
+
+    def add(self, phrase: str, canonical: str = None) -> int:
+        """Add a verb phrase to the trie
+
+        Parameters
+        ----------
+        phrase: str
+            The verb phrase as typed by the player ("wipe off")
+        canonical: str
+            Another phrase this one is an alias of. It is added first if it isn't known yet. When omitted a phrase that
+            is already known keeps its ID and a new phrase gets a new one
+
+        Returns
+        -------
+        int
+            The canonical verb ID of the phrase
+        """
+        tokens = split_phrase(phrase)
+        if not tokens:
+            raise ValueError(f"Can't add an empty verb phrase: '{phrase}'")
+        phrase = " ".join(tokens)
+
+        if canonical is not None and " ".join(split_phrase(canonical)) != phrase:
+            verb_id = self.add(canonical)
+            previous_id = self.verb_ids.get(phrase)
+            if previous_id is not None and previous_id != verb_id:
+                self._unbind(phrase, previous_id)
+        elif phrase in self.verb_ids:
+            return self.verb_ids[phrase]
+        else:
+            verb_id = len(self.verb_names)
+            self.verb_names.append(phrase)
+
+        if tokens[0] not in self.root.children:
+            self.spelling.add(tokens[0])
+        node = self.root
+        for token in tokens:
+            node = node.children.setdefault(token, _VerbNode())
+        node.verb_id = verb_id
+        self.verb_ids[phrase] = verb_id
+        return verb_id
+
+    def _unbind(self, phrase: str, verb_id: int):
+        """Stop naming a verb ID after a phrase that is being re-bound to another ID, handing the name on to another
+        phrase that still has the ID, if there is one"""
+        del self.verb_ids[phrase]
+        if self.verb_names[verb_id] == phrase:
+            self.verb_names[verb_id] = next(
+                (alias for alias, alias_id in self.verb_ids.items() if alias_id == verb_id), None)
+
+    def match(self, tokens: list, start: int = 0):
+        """Find the longest verb phrase at the beginning of tokens[start:]
+
+        Parameters
+        ----------
+        tokens: list
+            The tokenized player input
+        start: int
+            The offset into tokens where the verb phrase begins
+
+        Returns
+        -------
+        tuple
+            (verb_id, end) where tokens[start:end] is the matched verb phrase, or (None, start) when nothing matches
+        """
+        node = self.root
+        best_id, best_end = None, start
+        for index in range(start, len(tokens)):
+            node = node.children.get(tokens[index])
+            if node is None:
+                break
+            if node.verb_id is not None:
+                best_id, best_end = node.verb_id, index + 1
+        return best_id, best_end
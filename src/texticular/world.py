@@ -0,0 +1,483 @@
+"""The state of one game session, so several games can run side by side in the same process"""
+
+from itertools import count
+import weakref
+from texticular.game_enums import FlagSet
+from texticular.globals import PLAYER_STATE
+
+
+class World:
+    """A game session: the object registry, the ID counter, the rooms and characters and the player's state
+
+    Every GameObject belongs to the world that was active when it was created and registers, publishes events and
+    looks other objects up in that world only. Until another one is activated everything happens in a default world,
+    so single game code and GameObject.objects_by_key work as they always have. A server hosting several sessions or
+    a test that needs a fresh copy of the game creates a World per game and builds it inside `with world:`.
+
+    Attributes
+    ----------
+    active: World
+        A class level reference to the world new objects are created in
+    objects_by_key: dict
+        key_value >> GameObject for every object in the world
+    object_ids: count
+        Hands out the integer IDs of the world's objects
+    listeners: list
+        Weak references to the callables notified of registry events, see subscribe()
+    contents: dict
+        location_key >> {key_value: GameObject} for every registered object at that location, in the order they
+        arrived. Kept up to date whenever an object's location_key changes, so "what's in here" is answered without
+        scanning the world
+    flag_index: dict
+        flag bit >> bytearray bitmap with a bit set for every registered object that has the flag, bit i stands for
+        the object in slotted[i]
+    type_index: dict
+        class >> bytearray bitmap of the registered objects of exactly that class
+    slotted: list
+        bit position >> GameObject in the bitmaps, None for a position freed by an unregistered object
+    slot_of: dict
+        key_value >> bit position of every registered object
+    rooms: dict
+        key_value >> Room, filled in by game_loader.load_game_map
+    characters: dict
+        key_value >> Character, filled in by game_loader.load_game_map
+    globals: WorldGlobals
+        The player's story state (GREAT_DANE_ENCOUNTERED ...), starting out as globals.PLAYER_STATE
+    journal: Journal
+        The journal recording every change made to the world, None unless one was started, see journal.Journal
+    changed: dict
+        key_value >> GameObject for every object whose state changed since the last snapshot or restore
+    head: WorldSnapshot
+        The snapshot taken or restored last, None until the first one is taken
+
+    Methods
+    ---------
+    activate()
+        Make this the world new objects are created in
+    register(game_object)
+        Add an object to the registry
+    unregister(game_object)
+        Take an object out of the registry
+    record(game_object, attribute, old, new)
+        Note a change to an object's state
+    contents_of(location_key)
+        The objects at a location
+    query(flags, not_flags, location, type)
+        The objects with some flags and without others, at a location and/or of a type
+    snapshot()
+        Fork the mutable state of every object, sharing whatever didn't change with the previous snapshot
+    restore(snapshot)
+        Put every object back the way it was when the snapshot was taken
+    subscribe(listener)
+        Start notifying a callable of registry events
+    publish(event, game_object, detail)
+        Pass an event on to every listener
+    """
+
+    active = None
+    # a snapshot whose chain of parents gets this long is flattened into a standalone one, so looking an object's
+    # state up never walks more than this many snapshots
+    SNAPSHOT_CHAIN_LIMIT = 64
+
+    def __init__(self):
+        self.objects_by_key = {}
+        self.object_ids = count(1)
+        self.listeners = []
+        self.contents = {}
+        self.flag_index = {}
+        self.type_index = {}
+        self.slotted = []
+        self.slot_of = {}
+        self._free_slots = []
+        self.rooms = {}
+        self.characters = {}
+        self.globals = WorldGlobals(self, PLAYER_STATE)
+        self.journal = None
+        self.changed = {}
+        self.head = None
+        self._previous = []
+
+    def __repr__(self):
+        return f"World({len(self.objects_by_key)} objects)"
+
+    def __len__(self) -> int:
+        return len(self.objects_by_key)
+
+    def __contains__(self, key_value) -> bool:
+        return key_value in self.objects_by_key
+
+    def __enter__(self):
+        self._previous.append(World.active)
+        self.activate()
+        return self
+
+    def __exit__(self, *exc_info):
+        World.active = self._previous.pop()
+
+    def activate(self):
+        """Make this the world objects are created in from now on, `with world:` does the same for a block"""
+        World.active = self
+
+    def lookup(self, key_value: str):
+        """Return the object with the given key, or None if the world doesn't have one"""
+        return self.objects_by_key.get(key_value)
+
+    def register(self, game_object):
+        """Add an object to the registry and the location index and publish an "add" event
+
+        Called by GameObject.__init__ and by restore() for objects that were unregistered after the snapshot.
+        """
+        self.objects_by_key[game_object.key_value] = game_object
+        self.relocate(game_object, None, game_object.location_key)
+        self._index(game_object)
+        self.record(game_object, "registered", False, True)
+        self.publish("add", game_object)
+
+    def unregister(self, game_object):
+        """Take an object out of the registry and the location index and publish a "remove" event"""
+        if self.objects_by_key.get(game_object.key_value) is game_object:
+            del self.objects_by_key[game_object.key_value]
+            self.relocate(game_object, game_object.location_key, None)
+            self._unindex(game_object)
+            self.record(game_object, "registered", True, False)
+            self.publish("remove", game_object)
+
+    def record(self, game_object, attribute: str, old, new):
+        """Note a change to an object's state so the next snapshot captures it and the journal (if any) records it
+
+        Called by the objects themselves whenever they change, see GameObject.apply_change for the attributes.
+
+        Parameters
+        ----------
+        game_object: GameObject
+            The object that changed
+        attribute: str
+            What changed, i.e. "location_key", "flags" or "money"
+        old:
+            The value before the change
+        new:
+            The value after the change
+        """
+        self.changed[game_object.key_value] = game_object
+        if attribute == "flags":
+            slot = self.slot_of.get(game_object.key_value)
+            if slot is not None and self.slotted[slot] is game_object:
+                changed_bits = old ^ new
+                while changed_bits:
+                    flag_bit = changed_bits & -changed_bits
+                    changed_bits ^= flag_bit
+                    if new & flag_bit:
+                        _set_bit(self.flag_index.setdefault(flag_bit, bytearray()), slot)
+                    else:
+                        _clear_bit(self.flag_index.get(flag_bit), slot)
+        if self.journal is not None:
+            self.journal.record(game_object, attribute, old, new)
+
+    def contents_of(self, location_key: str) -> list:
+        """Return the objects located in the given location, in the order they arrived"""
+        contents = self.contents.get(location_key)
+        return list(contents.values()) if contents else []
+
+    def query(self, flags=None, not_flags=None, location: str = None, type: type = None) -> list:
+        """Return the registered objects matching every condition given, without scanning the world
+
+        The flag and type conditions are answered by intersecting bitmaps, unless a location is given, then the
+        location index narrows the answer down to the objects there first.
+
+        Parameters
+        ----------
+        flags:
+            Flags the objects must all have, a Flags member, a mask (Flags.CONTAINERBIT | Flags.OPENBIT) or a list
+            of members or names
+        not_flags:
+            Flags the objects must have none of, in the same forms
+        location: str
+            The location_key the objects must be at
+        type: type
+            The class the objects must be instances of, subclasses included, or a tuple of classes
+
+        Returns
+        -------
+        list
+            The matching objects, in the order they arrived at the location if one was given, otherwise in the order
+            of their bit positions
+
+        Examples
+        ----------
+        >>> world.query(flags=Flags.CONTAINERBIT | Flags.OPENBIT, location="room201")
+        >>> world.query(flags=[Flags.TAKEBIT], location="nowhereLand")
+        >>> world.query(type=NPC)
+        """
+        mask = FlagSet.mask(flags) if flags is not None else 0
+        excluded_mask = FlagSet.mask(not_flags) if not_flags is not None else 0
+        if location is not None:
+            # the location index already narrowed it down to a handful, check each one's own flags and class
+            contents = self.contents.get(location)
+            if not contents:
+                return []
+            return [game_object for game_object in contents.values()
+                    if game_object.flags.bits & mask == mask and not game_object.flags.bits & excluded_mask and
+                    (type is None or isinstance(game_object, type))]
+
+        bitmaps = []
+        if type is not None:
+            bitmaps.append(_union(bitmap for cls, bitmap in self.type_index.items() if issubclass(cls, type)))
+        while mask:
+            flag_bit = mask & -mask
+            mask ^= flag_bit
+            bitmaps.append(_as_int(self.flag_index.get(flag_bit)))
+        excluded = _union(bitmap for flag_bit, bitmap in self.flag_index.items() if excluded_mask & flag_bit)
+
+        matches = bitmaps[0] if bitmaps else _union(self.type_index.values())
+        for bitmap in bitmaps[1:]:
+            matches &= bitmap
+        matches &= ~excluded
+        # walk the set bits of the answer through its binary digits, least significant first
+        digits = bin(matches)[:1:-1]
+        slotted = self.slotted
+        found = []
+        position = digits.find("1")
+        while position != -1:
+            found.append(slotted[position])
+            position = digits.find("1", position + 1)
+        return found
+
+    def relocate(self, game_object, previous_location_key, location_key):
+        """Move an object between entries of the location index, None for either side adds or drops it
+
+        Called by GameObject when an object is registered, unregistered or its location_key changes.
+        """
+        self.changed[game_object.key_value] = game_object
+        if previous_location_key is not None:
+            # whatever held the object, and whatever holds it now, changed too (i.e. a container's items)
+            holder = self.objects_by_key.get(previous_location_key)
+            if holder is not None:
+                self.changed[previous_location_key] = holder
+            contents = self.contents.get(previous_location_key)
+            if contents is not None and contents.get(game_object.key_value) is game_object:
+                del contents[game_object.key_value]
+                if not contents:
+                    del self.contents[previous_location_key]
+        if location_key is not None:
+            holder = self.objects_by_key.get(location_key)
+            if holder is not None:
+                self.changed[location_key] = holder
+            self.contents.setdefault(location_key, {})[game_object.key_value] = game_object
+
+    def snapshot(self):
+        """Fork the world's mutable state and return it as a WorldSnapshot that restore() can go back to
+
+        Only the objects that changed since the previous snapshot (or restore) have their state captured, everything
+        else is shared with the snapshots before it, so taking one after a turn costs as much as the turn changed
+        rather than as much as the world holds. The first snapshot, and every SNAPSHOT_CHAIN_LIMIT-th after it,
+        captures every object instead.
+
+        Returns
+        -------
+        WorldSnapshot
+            The state of the world right now, it stays valid however the world changes afterwards
+        """
+        parent = self.head
+        if parent is None or parent.depth + 1 >= self.SNAPSHOT_CHAIN_LIMIT:
+            changes = {key: (game_object, game_object.capture_state())
+                       for key, game_object in self.objects_by_key.items()}
+            parent = None
+        else:
+            changes = {}
+            for key, game_object in self.changed.items():
+                registered = self.objects_by_key.get(key) is game_object
+                changes[key] = (game_object, game_object.capture_state() if registered else None)
+        self.head = WorldSnapshot(parent, changes, dict(self.globals))
+        self.changed = {}
+        return self.head
+
+    def restore(self, snapshot):
+        """Put the world back the way it was when the snapshot was taken
+
+        Only the objects that differ between the world and the snapshot are touched: the ones changed since the last
+        snapshot plus the ones the snapshots between the last one and this one captured. Objects created after the
+        snapshot are unregistered and objects unregistered after it are registered again. Listeners get the usual
+        events for every object that moves, is renamed or has its flags changed, so scopes and parsers stay current.
+
+        Parameters
+        ----------
+        snapshot: WorldSnapshot
+            A snapshot taken from this world, restoring the same one several times is fine
+        """
+        # the journal can't undo past a restore, and the restore itself isn't a change to record
+        journal, self.journal = self.journal, None
+        keys = set(self.changed)
+        if self.head is not snapshot:
+            ancestors = set()
+            node = snapshot
+            while node is not None:
+                ancestors.add(id(node))
+                node = node.parent
+            node = self.head
+            while node is not None and id(node) not in ancestors:
+                keys.update(node.changes)
+                node = node.parent
+            common = node
+            node = snapshot
+            while node is not common:
+                keys.update(node.changes)
+                node = node.parent
+
+        restored = []
+        for key in keys:
+            entry = snapshot.entry(key)
+            current = self.objects_by_key.get(key)
+            game_object, state = entry if entry is not None else (None, None)
+            if current is not None and (state is None or current is not game_object):
+                self.unregister(current)
+            if state is not None:
+                if current is not game_object:
+                    self.register(game_object)
+                restored.append((game_object, state))
+        # every object is registered before any of them is restored, so holders can be looked up
+        for game_object, state in restored:
+            game_object.restore_state(state)
+
+        self.globals.clear()
+        self.globals.update(snapshot.globals)
+        self.head = snapshot
+        self.changed = {}
+        self.journal = journal
+        if journal is not None:
+            journal.clear()
+
+    def _index(self, game_object):
+        """Give a newly registered object a bit position and set its bits in the type and flag bitmaps"""
+        slot = self._free_slots.pop() if self._free_slots else len(self.slotted)
+        if slot == len(self.slotted):
+            self.slotted.append(game_object)
+        else:
+            self.slotted[slot] = game_object
+        self.slot_of[game_object.key_value] = slot
+        _set_bit(self.type_index.setdefault(game_object.__class__, bytearray()), slot)
+        flag_bits = game_object.flags.bits
+        while flag_bits:
+            flag_bit = flag_bits & -flag_bits
+            flag_bits ^= flag_bit
+            _set_bit(self.flag_index.setdefault(flag_bit, bytearray()), slot)
+
+    def _unindex(self, game_object):
+        """Clear an unregistered object's bits and free its bit position for the next object"""
+        slot = self.slot_of.pop(game_object.key_value)
+        _clear_bit(self.type_index.get(game_object.__class__), slot)
+        for bitmap in self.flag_index.values():
+            _clear_bit(bitmap, slot)
+        self.slotted[slot] = None
+        self._free_slots.append(slot)
+
+    def subscribe(self, listener):
+        """Notify a callable every time an object is added to, removed from or renamed in the registry
+
+        Bound methods are held weakly so a subscribed parser can still be garbage collected.
+
+        Parameters
+        ----------
+        listener: callable
+            Called as listener(event, game_object, detail) where event is one of
+                "add", "remove", "rename": detail is None
+                "move": detail is the location_key the object moved from
+                "flags": detail is the flag that was added or removed
+        """
+        if hasattr(listener, "__self__"):
+            self.listeners.append(weakref.WeakMethod(listener))
+        else:
+            self.listeners.append(lambda: listener)
+
+    def publish(self, event: str, game_object, detail=None):
+        """Pass a registry event on to every live listener, forgetting the ones that have been garbage collected"""
+        for reference in list(self.listeners):
+            listener = reference()
+            if listener is None:
+                self.listeners.remove(reference)
+            else:
+                listener(event, game_object, detail)
+
+
+def _set_bit(bitmap: bytearray, position: int):
+    byte = position >> 3
+    if byte >= len(bitmap):
+        bitmap.extend(bytes(byte + 1 - len(bitmap)))
+    bitmap[byte] |= 1 << (position & 7)
+
+
+def _clear_bit(bitmap: bytearray, position: int):
+    byte = position >> 3
+    if bitmap is not None and byte < len(bitmap):
+        bitmap[byte] &= ~(1 << (position & 7)) & 0xFF
+
+
+def _as_int(bitmap: bytearray) -> int:
+    """Return a bitmap as an int, bit i of the int is bit i of the bitmap"""
+    return int.from_bytes(bitmap, "little") if bitmap else 0
+
+
+def _union(bitmaps) -> int:
+    union = 0
+    for bitmap in bitmaps:
+        union |= _as_int(bitmap)
+    return union
+
+
+class WorldGlobals(dict):
+    """A world's globals, a dict that records every value written to it in the world's journal"""
+
+    __slots__ = ("world",)
+
+    def __init__(self, world: World, values: dict):
+        super().__init__(values)
+        self.world = world
+
+    def __setitem__(self, name: str, value):
+        if self.world.journal is not None:
+            self.world.journal.record(None, name, self.get(name), value)
+        super().__setitem__(name, value)
+
+
+class WorldSnapshot:
+    """The mutable state of a world's objects at one moment, see World.snapshot
+
+    A snapshot holds the state of the objects that changed since its parent was taken and shares the rest with its
+    parent, so a chain of snapshots (an undo history, a set of save slots, the branches a solver is exploring) costs
+    as much memory as the changes between them. Snapshots are never modified once taken.
+
+    Attributes
+    ----------
+    parent: WorldSnapshot
+        The snapshot this one was taken after, None for one that captured every object
+    changes: dict
+        key_value >> (GameObject, state) for the objects captured by this snapshot, state is the tuple returned by
+        GameObject.capture_state or None if the object wasn't registered
+    globals: dict
+        A copy of the world's globals
+    depth: int
+        The number of parents above this snapshot
+    """
+
+    __slots__ = ("parent", "changes", "globals", "depth")
+
+    def __init__(self, parent, changes: dict, globals: dict):
+        self.parent = parent
+        self.changes = changes
+        self.globals = globals
+        self.depth = parent.depth + 1 if parent is not None else 0
+
+    def __repr__(self):
+        return f"WorldSnapshot({len(self.changes)} changes, depth {self.depth})"
+
+    def entry(self, key_value: str):
+        """Return the (GameObject, state) pair for an object, or None if it didn't exist when the snapshot was taken"""
+        node = self
+        while node is not None:
+            entry = node.changes.get(key_value)
+            if entry is not None:
+                return entry
+            node = node.parent
+        return None
+
+
+World.active = World()
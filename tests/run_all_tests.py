@@ -18,7 +18,13 @@ def run_pytest_tests():
         "tests/test_game_object.py",
         "tests/test_player.py", 
         "tests/test_room.py",
-        "tests/test_story_item.py"
+        "tests/test_story_item.py",
+        "tests/test_command_parser.py",
+        "tests/test_scope.py",
+        "tests/test_game_controller.py",
+        "tests/test_world.py",
+        "tests/test_journal.py",
+        "tests/test_string_table.py"
     ]
     
     try:
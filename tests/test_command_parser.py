@@ -0,0 +1,419 @@
+from texticular.command_parser import Parser
+from texticular.items.story_item import StoryItem
+from texticular.vocabulary import NounPhraseIndex, SpellingIndex, VerbTrie, split_phrase
+from texticular.lexer import Lexer
+from texticular.game_enums import Flags, TokenKinds
+from texticular.game_object import GameObject
+from itertools import count
+import pytest
+
+
+@pytest.fixture(scope="module")
+def parser_objects():
+    stand = StoryItem(
+        key_value="parser-nightStand",
+        name="Stand",
+        descriptions={"Main": "A beat up night stand"},
+        synonyms=["Stand", "Table"],
+        adjectives=["Beat Up", "Night"],
+        location_key="nowhereLand",
+        flags=[Flags.SETPIECEBIT]
+    )
+    plugs = StoryItem(
+        key_value="parser-earPlugs",
+        name="Ear Plugs",
+        descriptions={"Main": "Some well loved yellow ear plugs"},
+        synonyms=["Ear Plugs", "Plugs"],
+        adjectives=["Crusty", "Yellow"],
+        location_key="nowhereLand",
+        flags=[Flags.TAKEBIT]
+    )
+    lamp = StoryItem(
+        key_value="parser-tableLamp",
+        name="Lamp",
+        descriptions={"Main": "A lamp that sits on a table"},
+        synonyms=["Table Lamp", "Lamp"],
+        location_key="nowhereLand",
+        flags=[Flags.TAKEBIT]
+    )
+    return {obj.key_value: obj for obj in [stand, plugs, lamp]}
+
+
+@pytest.fixture(scope="module")
+def parser(parser_objects):
+    return Parser(game_objects=parser_objects)
+
+
+def test_splitPhraseMatchesTokenizer(parser):
+    assert split_phrase("Bad Mother Fuckin' Key") == tuple(parser.tokenize("Bad Mother Fuckin' Key").tokens)
+
+
+def test_nounIndexPrefersLongestMatch():
+    index = NounPhraseIndex()
+    index.add("stand", ["Table"])
+    index.add("lamp", ["Table Lamp"])
+    assert index.match(["table", "lamp", "please"]) == ("lamp", 2)
+    assert index.match(["table", "please"]) == ("stand", 1)
+    assert index.match(["chair"]) == (None, 0)
+
+
+def test_nounIndexFirstObjectWinsTies():
+    index = NounPhraseIndex()
+    index.add("brass-key", ["Key"], ["Brass"])
+    index.add("master-key", ["Key"], ["Master"])
+    assert index.match(["key"]) == ("brass-key", 1)
+    assert index.match(["master", "key"]) == ("master-key", 2)
+
+
+def test_canResolveAdjectivesInAnyOrder(parser):
+    assert parser.parse_input("take the yellow crusty ear plugs").direct_object_key == "parser-earPlugs"
+    assert parser.parse_input("take crustyearplugs").direct_object_key == "parser-earPlugs"
+
+
+def test_canResolveDirectAndIndirectObjects(parser):
+    parse_tree = parser.parse_input("put the plugs on the beat up night stand")
+    assert parse_tree.input_parsed
+    assert parse_tree.direct_object_key == "parser-earPlugs"
+    assert parse_tree.indirect_object_key == "parser-nightStand"
+
+
+def test_longestNounPhraseWins(parser):
+    assert parser.parse_input("take table lamp").direct_object_key == "parser-tableLamp"
+    assert parser.parse_input("look at table").direct_object_key == "parser-nightStand"
+
+
+def test_unknownNounIsNotParsed(parser):
+    parse_tree = parser.parse_input("take the thingamajig")
+    assert not parse_tree.input_parsed
+    assert parse_tree.response == "I don't see a thingamajig here!"
+
+
+def test_canUseMoreThanThreeAdjectives():
+    index = NounPhraseIndex()
+    index.add("marble", ["Marble"], ["Tiny", "Shiny", "Blue", "Glass"])
+    assert index.match(["glass", "tiny", "blue", "shiny", "marble"]) == ("marble", 5)
+    assert index.match(["glassshinymarble"]) == ("marble", 1)
+
+
+def test_adjectivesMustBelongToTheObject():
+    index = NounPhraseIndex()
+    index.add("lemon", ["Lemon"], ["Sour", "Yellow"])
+    index.add("lime", ["Lime", "Lemon"], ["Sour", "Green"])
+    assert index.match(["sour", "lemon"]) == ("lemon", 2)
+    assert index.match(["green", "lemon"]) == ("lime", 2)
+    assert index.match(["yellow", "yellow", "lemon"]) == (None, 0)
+    assert index.match(["lemonlemon"]) == (None, 0)
+
+
+def test_registryParserSeesObjectsSpawnedLater():
+    parser = Parser(game_objects=GameObject.objects_by_key)
+    assert parser.parse_input("take the glittering doubloon").direct_object_key is None
+
+    doubloon = StoryItem(
+        key_value="parser-doubloon",
+        name="Doubloon",
+        descriptions={"Main": "A pirate's gold coin"},
+        synonyms=["Doubloon"],
+        adjectives=["Glittering"],
+        location_key="nowhereLand",
+        flags=[Flags.TAKEBIT]
+    )
+    assert parser.parse_input("take the glittering doubloon").direct_object_key == "parser-doubloon"
+
+    doubloon.rename(synonyms=["Coin"], adjectives=["Gold"])
+    assert parser.parse_input("take the glittering doubloon").direct_object_key is None
+    assert parser.parse_input("take the gold coin").direct_object_key == "parser-doubloon"
+
+    doubloon.unregister()
+    assert GameObject.lookup_by_key("parser-doubloon") is None
+    assert parser.parse_input("take the gold coin").direct_object_key is None
+
+
+def test_parserBuiltFromPlainDictDoesNotSubscribe(parser):
+    assert all(reference() != parser.on_registry_event for reference in GameObject.registry_listeners)
+
+
+def test_verbTriePrefersLongestVerbPhrase():
+    verbs = VerbTrie(["wipe", "wipe off", "get", "get up"])
+    assert verbs.match(["wipe", "off", "prints"]) == (verbs.verb_ids["wipe off"], 2)
+    assert verbs.match(["wipe", "prints"]) == (verbs.verb_ids["wipe"], 1)
+    assert verbs.match(["dance"]) == (None, 0)
+
+
+def test_verbTrieRebindingAPhraseForgetsItsOldName():
+    verbs = VerbTrie(["take", "grab"])
+    take_id = verbs.add("take")
+    verbs.add("grab", canonical="take")
+    assert verbs.verb_ids["grab"] == take_id
+    assert verbs.verb_names == ["take", None]
+
+    verbs.add("steal", canonical="take")
+    verbs.add("take", canonical="get")
+    assert verbs.verb_ids["take"] == verbs.verb_ids["get"] != take_id
+    # "take" no longer names its old ID, an alias still bound to it does
+    assert verbs.verb_names[take_id] == "grab"
+    assert verbs.match(["take"]) == (verbs.verb_ids["get"], 1)
+
+
+def test_registeredCommandAliasesShareVerbId(parser_objects):
+    def take(controller):
+        return True
+
+    def clean(controller):
+        return True
+
+    parser = Parser(game_objects=parser_objects)
+    parser.register_commands({"take": take, "get": take, "grab": take, "scrub down": clean})
+    grab = parser.parse_input("grab the plugs")
+    take = parser.parse_input("take the plugs")
+    assert grab.input_parsed and grab.action == "grab"
+    assert grab.verb_id == take.verb_id
+    assert parser.parse_input("scrub down the stand").action == "scrub down"
+
+
+def test_objectCommandTablesAreVerbs():
+    class Radio(StoryItem):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.commands = {"tune in": self.tune_in}
+
+        def tune_in(self):
+            return "Smooth jazz."
+
+    radio = Radio(key_value="parser-radio", name="Radio", descriptions={"Main": "A radio"},
+                  synonyms=["Radio"], location_key="nowhereLand")
+    parser = Parser(game_objects={radio.key_value: radio})
+    parse_tree = parser.parse_input("tune in the radio")
+    assert parse_tree.action == "tune in"
+    assert parse_tree.direct_object_key == "parser-radio"
+
+
+def test_lexerClassifiesWordsInOnePass():
+    stream = Lexer(VerbTrie(["put", "look"])).lex("Put the key, in a box!")
+    assert stream.words == ["put", "the", "key", "in", "a", "box"]
+    assert stream.kinds == [TokenKinds.VERB, TokenKinds.ARTICLE, TokenKinds.WORD,
+                            TokenKinds.PREPOSITION, TokenKinds.ARTICLE, TokenKinds.WORD]
+    assert stream.offsets == [0, 4, 8, 13, 16, 18]
+    assert Lexer().lex("go north").kinds == [TokenKinds.WORD, TokenKinds.DIRECTION]
+
+
+def test_parseTreeKeepsTokenStream(parser):
+    parse_tree = parser.parse_input("take the plugs")
+    assert parse_tree.tokens is parse_tree.token_stream.words
+    assert parse_tree.token_stream.kinds[0] is TokenKinds.VERB
+
+
+def test_parseCacheReturnsCopiesOfRepeatedCommands(parser_objects):
+    parser = Parser(game_objects=parser_objects)
+    first = parser.parse_input("take the plugs")
+    repeat = parser.parse_input("  TAKE the   plugs")
+    assert parser.cache.hits == 1 and parser.cache.misses == 1
+    assert repeat is not first
+    assert repeat.direct_object_key == first.direct_object_key == "parser-earPlugs"
+    assert repeat.unparsed_input == "  TAKE the   plugs"
+    assert repeat.response == "Command: <  TAKE the   plugs> parsed."
+
+
+def test_parseCacheEvictsLeastRecentlyUsed(parser_objects):
+    parser = Parser(game_objects=parser_objects, cache_size=2)
+    parser.parse_input("take plugs")
+    parser.parse_input("take lamp")
+    parser.parse_input("take plugs")
+    parser.parse_input("take stand")
+    assert parser.cache.evictions == 1
+    parser.parse_input("take plugs")
+    parser.parse_input("take lamp")
+    assert parser.cache.stats()["hits"] == 2
+    assert parser.cache.stats()["misses"] == 4
+
+
+def test_parseCacheClearedWhenVocabularyChanges(parser_objects):
+    parser = Parser(game_objects=parser_objects)
+    assert not parser.parse_input("polish the lamp").input_parsed
+    parser.register_commands({"polish": lambda controller: True})
+    assert parser.parse_input("polish the lamp").input_parsed
+
+
+def build_worker_parser():
+    # a worker process builds these fresh, the test process reuses the ones an earlier test registered
+    objects = {}
+    for key_value, name, adjectives in [("parser-workerLamp", "Lamp", []), ("parser-workerBrassKey", "Key", ["Brass"]),
+                                        ("parser-workerIronKey", "Key", ["Iron"])]:
+        objects[key_value] = GameObject.lookup_by_key(key_value) or StoryItem(
+            key_value=key_value, name=name, descriptions={"Main": f"A {name.lower()}"}, synonyms=[name],
+            adjectives=adjectives, location_key="nowhereLand")
+    return Parser(game_objects=objects)
+
+
+def test_parseManyDedupesInOrder(parser_objects):
+    parser = Parser(game_objects=parser_objects)
+    commands = ["take plugs", "look", "Take  Plugs", "dance"]
+    parsed = []
+    parse_uncached = parser.parse_uncached
+    parser.parse_uncached = lambda user_input, scope=None: parsed.append(user_input) or parse_uncached(user_input)
+    results = parser.parse_many(iter(commands))
+    assert not isinstance(results, list)
+    assert [tree.unparsed_input for tree in results] == commands
+    assert parsed == ["take plugs", "look", "dance"]
+
+
+def test_parseManyCanUseProcessPool():
+    commands = ["take lamp", "look", "take lamp", "eat lamp"] * 3
+    parser = build_worker_parser()
+    expected = [(tree.action, tree.direct_object_key) for tree in parser.parse_many(commands)]
+    results = parser.parse_many(commands, processes=2, parser_factory=build_worker_parser, chunk_size=3)
+    assert [(tree.action, tree.direct_object_key) for tree in results] == expected
+    with pytest.raises(ValueError):
+        list(parser.parse_many(commands, processes=2))
+
+
+def test_parseManyGivesTheSameResultsInProcessAndPooled():
+    commands = ["take lamp", "drop it", "take key", "brass", "examine it", "take lamp"]
+    parser = build_worker_parser()
+    parser.parse_input("take lamp")
+    remembered = parser.last_object_key, list(parser.last_object_keys), parser.pending
+
+    def outcome(trees):
+        return [(tree.action, tree.direct_object_key, tree.input_parsed, tree.response) for tree in trees]
+
+    in_process = outcome(parser.parse_many(commands))
+    pooled = outcome(parser.parse_many(commands, processes=2, parser_factory=build_worker_parser, chunk_size=2))
+    assert in_process == pooled
+    # pronouns in a replayed log don't reach back to the live parser's last command
+    assert in_process[1][2] is False
+    assert (parser.last_object_key, parser.last_object_keys, parser.pending) == remembered
+
+
+def test_spellingIndexCorrectsWithinEditDistance():
+    spelling = SpellingIndex()
+    for word in ["examine", "nightstand", "plugs", "box"]:
+        spelling.add(word)
+    assert spelling.correct("exmaine") == "examine"
+    assert spelling.correct("nighstand") == "nightstand"
+    assert spelling.correct("nihgtstnd") == "nightstand"
+    assert spelling.correct("plgus") == "plugs"
+    assert spelling.correct("bxo") is None
+    assert spelling.correct("zebra") is None
+    spelling.remove("plugs")
+    assert spelling.correct("plgus") is None
+
+
+def test_misspelledSquashedNounsAreCorrected(parser_objects):
+    parser = Parser(game_objects=parser_objects, cache_size=0)
+    # adjective and synonym combinations aren't indexed, the adjectives are peeled off a squashed word instead
+    assert "crustyearplugs" not in parser.noun_index.spelling
+    parse_tree = parser.parse_input("examine nighstand")
+    assert parse_tree.direct_object_key == "parser-nightStand"
+    assert parse_tree.corrections == [("nighstand", "nightstand")]
+    assert parser.parse_input("examine beatupnighstand").direct_object_key == "parser-nightStand"
+    assert parser.parse_input("take crustyearplgus").direct_object_key == "parser-earPlugs"
+    assert parser.parse_input("take bxo").direct_object_key is None
+
+    parser.noun_index.remove("parser-nightStand")
+    assert parser.parse_input("examine nighstand").direct_object_key is None
+    assert "nightstand" not in parser.noun_index.spelling
+
+
+def test_parserCorrectsTyposOnlyWhenExactMatchFails(parser):
+    parse_tree = parser.parse_input("exmaine the yelow plgus")
+    assert parse_tree.action == "examine"
+    assert parse_tree.direct_object_key == "parser-earPlugs"
+    assert parse_tree.corrections == [("exmaine", "examine"), ("yelow", "yellow"), ("plgus", "plugs")]
+    assert parser.parse_input("take lamp").corrections == []
+
+
+def test_splitCommandsOnPunctuationAndThen(parser):
+    assert parser.split_commands("open drawer, take plugs then go east") == ["open drawer", "take plugs", "go east"]
+    assert parser.split_commands("take key; and then go north.") == ["take key", "go north"]
+    assert parser.split_commands("look") == ["look"]
+
+
+def test_itAndThemReferToLastObjects(parser_objects):
+    parser = Parser(game_objects=parser_objects)
+    assert not parser.parse_input("take it").input_parsed
+    parser.parse_input("take the plugs")
+    parse_tree = parser.parse_input("put it on the stand")
+    assert parse_tree.direct_object_key == "parser-earPlugs"
+    assert parse_tree.indirect_object_key == "parser-nightStand"
+    assert parser.parse_input("look at them").direct_object_key == "parser-earPlugs"
+    assert len(parser.cache) == 1
+
+
+def test_syntaxEntriesAddShapesAndResolveHandlers(parser_objects):
+    def talk(controller):
+        return True
+
+    def put(controller):
+        return True
+
+    parser = Parser(game_objects=parser_objects)
+    parser.register_commands({"put": put})
+    parser.register_syntax({"ask OBJECT about OBJECT": talk})
+    parse_tree = parser.parse_input("ask the stand about the plugs")
+    assert parse_tree.action == "ask" and parse_tree.handler is talk
+    assert parse_tree.preposition == "about"
+    assert parse_tree.direct_object_key == "parser-nightStand"
+    assert parse_tree.indirect_object_key == "parser-earPlugs"
+
+    parse_tree = parser.parse_input("put the plugs on the stand")
+    assert parse_tree.handler is put and parse_tree.preposition == "on"
+    assert parser.parse_input("put the plugs about the stand").response == \
+        "I only understood you as far as wanting to put."
+    assert parser.parse_input("put the plugs in the lamp on the stand").response == \
+        "I'm not smart enough to understand more than one preposition per command."
+
+    # a sentence that stops where its shape still expects a noun phrase isn't a parse
+    parse_tree = parser.parse_input("put the plugs in")
+    assert not parse_tree.input_parsed and parse_tree.response == "Put it in what?"
+    assert parser.parse_input("ask the stand about").response == "Ask it about what?"
+
+
+class FixedScope(set):
+    version = 0
+    _tokens = count()
+
+    def __init__(self, keys=()):
+        super().__init__(keys)
+        self.token = next(FixedScope._tokens)
+
+
+def test_nounIndexMatchAllReturnsEveryCandidate():
+    index = NounPhraseIndex()
+    index.add("brass-key", ["Key"], ["Brass"])
+    index.add("master-key", ["Key"], ["Master"])
+    index.add("lamp", ["Lamp"])
+    assert index.match_all(["key"]) == (["brass-key", "master-key"], 1)
+    assert index.match_all(["key"], scope={"master-key"}) == (["master-key"], 1)
+    assert index.match_all(["master", "key"]) == (["master-key"], 2)
+    assert index.match_all(["lamp"]) == (["lamp"], 1)
+    assert index.match_all(["chair"]) == ([], 0)
+
+
+def test_ambiguousNounAsksWhichOneAndAnswerCompletesCommand(parser_objects):
+    brass = StoryItem(key_value="parser-brassKey", name="Key", descriptions={"Main": "A brass key"},
+                      synonyms=["Key"], adjectives=["Brass"], location_key="nowhereLand")
+    master = StoryItem(key_value="parser-masterKey", name="Key", descriptions={"Main": "A master key"},
+                       synonyms=["Key"], adjectives=["Master"], location_key="nowhereLand")
+    try:
+        parser = Parser(game_objects=dict(parser_objects, **{"parser-brassKey": brass, "parser-masterKey": master}))
+        scope = FixedScope(["parser-brassKey", "parser-masterKey", "parser-nightStand"])
+
+        parse_tree = parser.parse_input("put the key on the stand", scope)
+        assert not parse_tree.input_parsed
+        assert parse_tree.response == "Which do you mean, the brass key or the master key?"
+        assert parser.parse_input("the master one", scope) is parse_tree
+        assert parse_tree.input_parsed
+        assert parse_tree.direct_object_key == "parser-masterKey"
+        assert parse_tree.indirect_object_key == "parser-nightStand"
+        assert parser.pending is None
+
+        assert parser.parse_input("take the brass key", scope).direct_object_key == "parser-brassKey"
+        assert parser.parse_input("take key", FixedScope(["parser-masterKey"])).input_parsed
+
+        # anything that isn't an answer is parsed as a new command
+        parser.parse_input("take key", scope)
+        assert parser.parse_input("look at the stand", scope).direct_object_key == "parser-nightStand"
+        assert parser.pending is None
+    finally:
+        GameObject.unregister(brass)
+        GameObject.unregister(master)
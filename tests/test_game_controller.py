@@ -0,0 +1,155 @@
+from texticular.game_controller import Controller
+from texticular.character import Player
+from texticular.rooms.room import Room
+from texticular.items.story_item import StoryItem, Container, Inventory
+from texticular.game_enums import Flags
+from texticular.game_object import GameObject
+import pytest
+
+
+@pytest.fixture
+def controller(tmp_path, monkeypatch):
+    # the gameplay logger writes to ./gameplay_logs
+    monkeypatch.chdir(tmp_path)
+    room = Room("chain-room", "Chain Room", {"Main": "A room for chaining commands."}, "chain-room")
+    bag = Inventory(key_value="chain-bag", name="Bag", descriptions={"Main": "A bag."}, synonyms=["Bag"],
+                    location_key="chain-player")
+    player = Player("chain-player", "Tester", {"Main": "You."}, inventory=bag, location_key="chain-room")
+    player.location = room
+    drawer = Container(key_value="chain-drawer", name="Drawer", descriptions={"Main": "A drawer."},
+                       synonyms=["Drawer"], location_key="chain-room")
+    plugs = StoryItem(key_value="chain-plugs", name="Plugs", descriptions={"Main": "Some ear plugs."},
+                      synonyms=["Plugs"], location_key="chain-drawer", flags=[Flags.TAKEBIT])
+    drawer.add_item(plugs)
+    note = StoryItem(key_value="chain-note", name="Note", descriptions={"Main": "A sticky note."},
+                     synonyms=["Note"], location_key="chain-room", flags=[Flags.TAKEBIT])
+    coin = StoryItem(key_value="chain-coin", name="Coin", descriptions={"Main": "A wooden nickel."},
+                     synonyms=["Coin"], location_key="chain-room", flags=[Flags.TAKEBIT])
+    room.items.extend([drawer, note, coin])
+    controller = Controller({"chain-room": room}, player)
+    controller.response = []
+    yield controller
+    for game_object in [room, bag, player, drawer, plugs, note, coin]:
+        game_object.unregister()
+
+
+def logged_commands(controller):
+    return [event["data"]["input"] for event in controller.logger.session_data["events"]
+            if event["event_type"] == "command"]
+
+
+def test_chainedCommandsRunInOneUpdate(controller):
+    controller.user_input = "open drawer, examine plugs then look"
+    assert controller.update()
+    assert controller.turn_count == 3
+    # the drawer was opened before "examine plugs" was parsed, so the plugs were in scope
+    assert "Some ear plugs." in controller.response
+    assert logged_commands(controller)[-3:] == ["open drawer", "examine plugs", "look"]
+
+
+def test_chainStopsAtFirstFailedCommand(controller):
+    controller.user_input = "open drawer then dance. look"
+    controller.update()
+    assert controller.turn_count == 1
+    assert controller.response[-1] == 'Command: "dance" does not start with a known verb.'
+    assert logged_commands(controller)[-2:] == ["open drawer", "dance"]
+    assert not controller.command_queue
+
+
+def test_takeAllAndDropAllExceptAreOneTurn(controller):
+    controller.user_input = "take all"
+    controller.update()
+    inventory = controller.player.inventory
+    assert controller.turn_count == 1
+    assert "Taken: Note, Coin." in controller.response
+    assert [item.name for item in inventory.items] == ["Note", "Coin"]
+
+    controller.response = []
+    controller.user_input = "drop all except the note"
+    controller.update()
+    assert controller.response == ["Dropped: Coin."]
+    assert [item.name for item in inventory.items] == ["Note"]
+    assert GameObject.lookup_by_key("chain-coin").location_key == "chain-room"
+    coin = GameObject.lookup_by_key("chain-coin")
+    assert coin in controller.player.location.items and coin in controller.world.contents_of("chain-room")
+    assert inventory.slots_occupied == GameObject.lookup_by_key("chain-note").size
+
+
+def test_objectByObjectCommandRestoresTokensWhenAHandlerRaises(controller, monkeypatch):
+    controller.parse("examine all")
+    tokens = controller.tokens
+    tokens.direct_objects = [controller.get_game_object(key) for key in tokens.direct_object_keys]
+    direct_objects, direct_object_key = list(tokens.direct_objects), tokens.direct_object_key
+    assert len(direct_objects) > 1
+
+    def explode():
+        if tokens.direct_object is direct_objects[1]:
+            raise RuntimeError("boom")
+        return True
+
+    monkeypatch.setattr(controller, "handle_input", explode)
+    with pytest.raises(RuntimeError):
+        controller.handle_multiple_objects()
+    assert tokens.direct_objects == direct_objects and tokens.direct_object_key == direct_object_key
+
+
+def test_pronounsReferToPreviousObjects(controller):
+    controller.user_input = "take the note then drop it"
+    controller.update()
+    assert controller.response == ["Taken.", "Dropped it like it's hot."]
+
+    controller.response = []
+    controller.user_input = "take all, drop them"
+    controller.update()
+    assert controller.response[-1] == "Dropped: Note, Coin."
+
+
+def test_lookInFallsBackToLook(controller):
+    drawer = GameObject.lookup_by_key("chain-drawer")
+    controller.user_input = "look in drawer"
+    controller.update()
+    assert controller.response == [drawer.describe()]
+
+
+def test_takingFromAnOpenContainerEmptiesIt(controller):
+    drawer = GameObject.lookup_by_key("chain-drawer")
+    assert drawer.slots_occupied == 1
+    controller.user_input = "open drawer, take plugs"
+    controller.update()
+    assert not drawer.items and drawer.slots_occupied == 0
+    assert GameObject.lookup_by_key("chain-plugs") in controller.player.inventory.items
+
+
+def test_takeAllFromAnOpenContainerEmptiesIt(controller):
+    drawer = GameObject.lookup_by_key("chain-drawer")
+    controller.user_input = "open drawer, take all"
+    controller.update()
+    assert [item.name for item in controller.player.inventory.items] == ["Plugs", "Note", "Coin"]
+    assert not drawer.items and drawer.slots_occupied == 0
+
+
+def test_undoTakesBackTheWholeTurn(controller):
+    room = controller.player.location
+    inventory = controller.player.inventory
+    drawer = GameObject.lookup_by_key("chain-drawer")
+    controller.user_input = "open drawer, take plugs, take note"
+    controller.update()
+    assert [item.name for item in inventory.items] == ["Plugs", "Note"]
+    assert not drawer.items and drawer.slots_occupied == 0
+
+    controller.user_input = "undo"
+    controller.update()
+    assert controller.response[0] == "Previous turn undone."
+    assert not inventory.items and inventory.slots_occupied == 0
+    assert [item.name for item in room.items] == ["Drawer", "Note", "Coin"]
+    assert Flags.OPENBIT not in GameObject.lookup_by_key("chain-drawer").flags
+    assert GameObject.lookup_by_key("chain-plugs").location_key == "chain-drawer"
+    assert [item.name for item in drawer.items] == ["Plugs"] and drawer.slots_occupied == 1
+
+    controller.user_input = "redo"
+    controller.update()
+    assert [item.name for item in inventory.items] == ["Plugs", "Note"]
+    assert not drawer.items and drawer.slots_occupied == 0
+    controller.user_input = "redo"
+    controller.update()
+    assert controller.response == ["There's nothing to redo."]
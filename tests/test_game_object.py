@@ -1,4 +1,5 @@
 from texticular.game_object import GameObject
+from texticular.game_enums import Flags
 import pytest
 from pytest import raises
 from itertools import count
@@ -159,3 +160,21 @@ def test_canCallCusomActionMethod(game_object):
 
 
 
+
+def test_flagsAreStoredAsOneBitmask(game_object):
+    game_object.flags = ["CONTAINERBIT", Flags.OPENBIT]
+    assert game_object.flags.bits == Flags.CONTAINERBIT | Flags.OPENBIT
+    assert game_object.has_flag(Flags.CONTAINERBIT | Flags.OPENBIT)
+    assert not game_object.has_flag(Flags.CONTAINERBIT | Flags.LOCKEDBIT)
+    assert game_object.flags.any(Flags.CONTAINERBIT | Flags.LOCKEDBIT)
+    assert "OPENBIT" in game_object.flags
+    assert [flag.name for flag in game_object.flags] == ["CONTAINERBIT", "OPENBIT"]
+    assert game_object.encode_tojson(game_object)["flags"] == ["CONTAINERBIT", "OPENBIT"]
+    game_object.remove_flag(Flags.OPENBIT)
+    assert game_object.flags == {Flags.CONTAINERBIT}
+
+def test_gameObjectsAreSlotted(game_object):
+    assert not hasattr(game_object, "__dict__")
+    with raises(AttributeError):
+        game_object.misspelled_attribute = True
+    assert "'key_value'" in str(game_object)
@@ -0,0 +1,85 @@
+from texticular.world import World
+from texticular.journal import Journal
+from texticular.character import Player
+from texticular.rooms.room import Room
+from texticular.items.story_item import StoryItem, Inventory
+from texticular.game_enums import Flags
+
+
+def build_world():
+    world = World()
+    with world:
+        room = Room("journal-room", "Room", {"Main": "An empty room."})
+        bag = Inventory(key_value="journal-bag", name="Bag", descriptions={"Main": "A bag."}, synonyms=["Bag"],
+                        location_key="journal-player")
+        Player("journal-player", "Tester", {"Main": "You."}, inventory=bag, location_key="journal-room")
+        for name in ["Note", "Pen", "Cup"]:
+            item = StoryItem(key_value=f"journal-{name.lower()}", name=name,
+                             descriptions={"Main": f"A {name.lower()}.", "Dropped": f"A dropped {name.lower()}."},
+                             synonyms=[name], location_key="journal-room", flags=[Flags.TAKEBIT])
+            room.items.append(item)
+    return world
+
+
+def play_turn(world):
+    player, bag, room = world.lookup("journal-player"), world.lookup("journal-bag"), world.lookup("journal-room")
+    pen = world.lookup("journal-pen")
+    room.remove_item(pen)
+    bag.add_item(pen)
+    pen.current_description = "Dropped"
+    pen.add_flag(Flags.INVISIBLE)
+    player.add_money(1.50)
+    world.globals["HAS_POOPED"] = True
+    world.journal.commit()
+
+
+def test_undoAppliesTheInverseOfTheTurn():
+    world = build_world()
+    journal = Journal(world)
+    room, bag, pen = world.lookup("journal-room"), world.lookup("journal-bag"), world.lookup("journal-pen")
+    play_turn(world)
+    assert len(journal.undo_turns) == 1 and not journal.pending
+
+    assert journal.undo()
+    assert [item.name for item in room.items] == ["Note", "Pen", "Cup"] and not bag.items
+    assert pen.location_key == "journal-room" and pen.current_description == "Main"
+    assert Flags.INVISIBLE not in pen.flags
+    assert world.lookup("journal-player").money == 0.00 and not world.globals["HAS_POOPED"]
+    assert not journal.pending and not journal.undo()
+
+    assert journal.redo()
+    assert list(bag.items) == [pen] and Flags.INVISIBLE in pen.flags and world.globals["HAS_POOPED"]
+    assert world.lookup("journal-player").money == 1.50
+
+
+def test_journalFileReplaysIntoAFreshWorld(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    world = build_world()
+    Journal(world, str(path))
+    play_turn(world)
+    world.lookup("journal-note").rename("Letter", synonyms=["Letter"])
+    world.journal.undo()
+
+    recovered = build_world()
+    journal = Journal(recovered, str(path))
+    assert journal.replay() == 3
+    assert [item.name for item in recovered.lookup("journal-bag").items] == ["Pen"]
+    assert recovered.lookup("journal-note").name == "Note" and recovered.globals["HAS_POOPED"]
+    assert journal.redo()
+    assert recovered.lookup("journal-note").synonyms == ["Letter"]
+
+
+def test_undoPutsItemsBackInOrderAfterLaterAdditions():
+    world = build_world()
+    journal = Journal(world)
+    room, note, cup = world.lookup("journal-room"), world.lookup("journal-note"), world.lookup("journal-cup")
+    room.remove_item(note)
+    room.remove_item(cup)
+    room.items.append(note)
+    journal.commit()
+    assert [item.name for item in room.items] == ["Pen", "Note"]
+
+    assert journal.undo()
+    assert [item.name for item in room.items] == ["Note", "Pen", "Cup"]
+    assert journal.redo()
+    assert [item.name for item in room.items] == ["Pen", "Note"]
@@ -0,0 +1,116 @@
+from texticular.scope import Scope
+from texticular.command_parser import Parser
+from texticular.parse_cache import ParseCache
+from texticular.character import Player
+from texticular.rooms.room import Room
+from texticular.items.story_item import StoryItem, Container, Inventory
+from texticular.game_object import GameObject
+from texticular.game_enums import Flags
+import pytest
+
+
+@pytest.fixture(scope="module")
+def world():
+    kitchen = Room(key_value="scope-kitchen", name="Kitchen", descriptions={"Main": "A greasy kitchen."})
+    cellar = Room(key_value="scope-cellar", name="Cellar", descriptions={"Main": "A damp cellar."})
+    backpack = Inventory(key_value="scope-backpack", name="Backpack", descriptions={"Main": "A backpack."},
+                         synonyms=["Backpack"], location_key="scope-player")
+    player = Player(key_value="scope-player", name="Tester", descriptions={"Main": "You."},
+                    inventory=backpack, location_key="scope-kitchen")
+    cupboard = Container(key_value="scope-cupboard", name="Cupboard", descriptions={"Main": "A cupboard."},
+                         synonyms=["Cupboard"], location_key="scope-kitchen")
+    jar = Container(key_value="scope-jar", name="Jar", descriptions={"Main": "A jar."}, synonyms=["Jar"],
+                    location_key="scope-cupboard", flags=[Flags.CONTAINERBIT, Flags.OPENBIT, Flags.TAKEBIT])
+    kitchen_key = StoryItem(key_value="scope-kitchenKey", name="Key", descriptions={"Main": "A greasy key."},
+                            synonyms=["Key"], adjectives=["Greasy"], location_key="scope-jar",
+                            flags=[Flags.TAKEBIT])
+    cellar_key = StoryItem(key_value="scope-cellarKey", name="Key", descriptions={"Main": "A damp key."},
+                           synonyms=["Key"], adjectives=["Damp"], location_key="scope-cellar",
+                           flags=[Flags.TAKEBIT])
+    scope = Scope(player)
+    parser = Parser(game_objects=GameObject.objects_by_key)
+    return {"scope": scope, "parser": parser, "player": player, "cupboard": cupboard, "jar": jar,
+            "kitchen": kitchen, "cellar": cellar}
+
+
+def test_scopeIncludesRoomInventoryAndPlayer(world):
+    scope = world["scope"]
+    scope.refresh()
+    assert {"scope-kitchen", "scope-player", "scope-backpack", "scope-cupboard"} <= scope.keys
+    assert "scope-cellarKey" not in scope
+
+
+def test_closedContainerHidesItsContents(world):
+    scope = world["scope"]
+    scope.refresh()
+    assert "scope-jar" not in scope
+    assert world["parser"].parse_input("take key", scope).direct_object_key is None
+
+
+def test_openingContainerExposesNestedContents(world):
+    scope = world["scope"]
+    scope.refresh()
+    version = scope.version
+    world["cupboard"].open()
+    assert scope.refresh()
+    assert scope.version == version + 1
+    assert {"scope-jar", "scope-kitchenKey"} <= scope.keys
+    assert world["parser"].parse_input("take key", scope).direct_object_key == "scope-kitchenKey"
+
+
+def test_scopeOnlyRebuiltAfterRelevantEvents(world):
+    scope = world["scope"]
+    scope.refresh()
+    world["cellar"].add_flag(Flags.ONBIT)
+    GameObject.lookup_by_key("scope-cellarKey").add_flag(Flags.OPENBIT)
+    assert not scope.refresh()
+
+
+class FlagEvents(list):
+    def on_registry_event(self, event, game_object, detail=None):
+        if event == "flags":
+            self.append(detail)
+
+
+def test_flagsAssignedOrAddedAsAMaskRebuildScope(world):
+    scope = world["scope"]
+    cupboard = world["cupboard"]
+    # held weakly by the registry, so it stops listening once the test is over
+    events = FlagEvents()
+    GameObject.subscribe(events.on_registry_event)
+
+    scope.refresh()
+    cupboard.flags = cupboard.flags.bits ^ Flags.OPENBIT
+    assert scope.refresh()
+    assert events == [Flags.OPENBIT]
+
+    cupboard.remove_flag(Flags.OPENBIT)
+    cupboard.remove_flag(Flags.ONBIT)
+    del events[:]
+    cupboard.add_flag(Flags.OPENBIT | Flags.ONBIT)
+    # one event per flag, Scope compares the detail against Flags.OPENBIT
+    assert events == [Flags.OPENBIT, Flags.ONBIT]
+    assert scope.refresh() and Flags.OPENBIT in cupboard.flags
+
+
+def test_movingPlayerChangesWhichKeyResolves(world):
+    scope = world["scope"]
+    player = world["player"]
+    player.location_key = "scope-cellar"
+    player.location = world["cellar"]
+    scope.refresh()
+    assert world["parser"].parse_input("take key", scope).direct_object_key == "scope-cellarKey"
+    assert "scope-backpack" in scope
+    player.location_key = "scope-kitchen"
+    player.location = world["kitchen"]
+
+
+def test_cacheKeysOfANewScopeNeverMatchAnOldOne(world):
+    player = world["player"]
+    keys = set()
+    for _ in range(20):
+        # each scope is dropped before the next is made, so id() would hand the same address out again
+        scope = Scope(player)
+        keys.add(ParseCache.make_key("take key", scope))
+        del scope
+    assert len(keys) == 20
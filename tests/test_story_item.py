@@ -1,6 +1,12 @@
-from texticular.items.story_item import StoryItem
+import json
+
+import pytest
+
+from texticular.items.story_item import StoryItem, Container, ItemPrototype, StackableItem
+from texticular.world import World
 from texticular.game_enums import Flags
 from texticular.game_object import GameObject
+from texticular.game_loader import load_items
 
 
 def test_story_item():
@@ -12,3 +18,75 @@ def test_story_item():
         synonyms=["Bad Mother Fuckin' TwinKey"],
         flags=[Flags.KLUDGEBIT]
     )
+
+
+def test_containerItemsKeepOrderAndRemoveByLookup():
+    box = Container(key_value="story-box", name="Box", descriptions={"Main": "A box."}, synonyms=["Box"],
+                    location_key="nowhereLand")
+    things = [StoryItem(key_value=f"story-thing{i}", name=f"Thing {i}", descriptions={"Main": "A thing."},
+                        synonyms=["Thing"], location_key="nowhereLand") for i in range(3)]
+    try:
+        for thing in things:
+            box.add_item(thing)
+        assert box.items == things
+        assert box.remove_item(things[1])
+        assert not box.remove_item(things[1])
+        assert things[1] not in box.items and box.slots_occupied == 2
+        box.add_item(things[1])
+        assert [thing.name for thing in box.items] == ["Thing 0", "Thing 2", "Thing 1"]
+        assert box.remove_items([things[0], things[2]]) == [things[0], things[2]]
+        assert box.items == [things[1]]
+    finally:
+        for game_object in [box] + things:
+            game_object.unregister()
+
+
+def test_prototypeInstancesStackInContainers():
+    coin = ItemPrototype(key_value="story-coin", name="Coin", descriptions={"Main": "A wooden nickel."},
+                         synonyms=["Coin", "Nickel"], adjectives=["Wooden"], flags=[Flags.TAKEBIT])
+    with World() as world:
+        pocket = Container(key_value="story-pocket", name="Pocket", descriptions={"Main": "A pocket."},
+                           synonyms=["Pocket"], location_key="nowhereLand")
+        first, second = coin.instantiate("nowhereLand"), coin.instantiate("nowhereLand", quantity=2)
+        assert (first.key_value, second.key_value) == ("story-coin-1", "story-coin-2")
+        assert first.descriptions is coin.descriptions and second.synonyms is coin.synonyms
+
+        pocket.add_item(first)
+        pocket.add_item(second)
+        assert pocket.items == [first] and first.quantity == 3 and pocket.slots_occupied == 1
+        assert "story-coin-2" not in world
+        assert pocket.look_inside()[1] == "    Coin (x3): A wooden nickel."
+
+        spent = first.split()
+        assert spent.quantity == 1 and first.quantity == 2 and isinstance(spent, StackableItem)
+        spent.add_flag(Flags.INVISIBLE)
+        pocket.add_item(spent)
+        assert pocket.items == [first, spent]
+
+
+def test_itemConfigIsDecodedInOnePassByType(tmp_path):
+    def record(key_value, item_type, item_keys=()):
+        return {"type": item_type, "keyValue": key_value, "name": key_value, "locationKey": "nowhereLand",
+                "descriptions": {"Main": "Loaded."}, "synonyms": [key_value], "adjectives": [], "flags": [],
+                "size": 1, "slots": 5, "keyObject": None, "currentDescription": "Main",
+                "examineDescription": "Main", "actionMethod": None, "itemKeyValues": list(item_keys)}
+
+    # the container comes before the item it holds
+    path = tmp_path / "items.json"
+    path.write_text(json.dumps({"items": [record("loader-box", "Container", ["loader-sock"]),
+                                          record("loader-sock", "StoryItem"),
+                                          record("loader-vendor", "VendingMachine")]}))
+    with World():
+        loaded = load_items(path)
+        assert list(loaded["items"]) == ["loader-sock", "loader-vendor"]
+        assert list(loaded["containers"]) == ["loader-box"]
+        box, sock = loaded["containers"]["loader-box"], loaded["items"]["loader-sock"]
+        assert box.items == [sock] and sock.location_key == "loader-box"
+
+
+def test_unknownItemTypeIsRejected(tmp_path):
+    path = tmp_path / "items.json"
+    path.write_text(json.dumps({"items": [{"type": "Apparition", "keyValue": "loader-ghost"}]}))
+    with World() as world, pytest.raises(ValueError, match="'Apparition' \\(loader-ghost\\)"):
+        load_items(path)
+    assert "loader-ghost" not in world
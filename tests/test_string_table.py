@@ -0,0 +1,32 @@
+import json
+
+from texticular.game_loader import load_json
+from texticular.string_table import StringTable
+
+
+def test_duplicateStringsAreSharedAcrossLoads(tmp_path):
+    door = {"Main": "A heavy oak door.", "Examine": "Someone carved their initials in it."}
+    config = {"exits": [
+        {"keyValue": "table-door-east", "descriptions": door, "flags": ["DOORBIT"], "itemKeyValues": []},
+        {"keyValue": "table-door-west", "descriptions": dict(door), "flags": ["DOORBIT"], "itemKeyValues": []},
+    ]}
+    path = tmp_path / "exits.json"
+    path.write_text(json.dumps(config))
+
+    strings = StringTable()
+    east, west = load_json(path, strings)["exits"]
+    assert east["descriptions"] == door and east["keyValue"] == "table-door-east"
+    assert east["descriptions"]["Main"] is west["descriptions"]["Main"] and east["flags"][0] is west["flags"][0]
+    first_report = strings.report()
+    assert first_report["duplicates"] > 0 and first_report["saved_bytes"] > 0
+
+    # only the strings are shared, every object can still change its own dicts and lists
+    assert east["descriptions"] is not west["descriptions"]
+    assert east["flags"] is not west["flags"] and east["itemKeyValues"] is not west["itemKeyValues"]
+    east["itemKeyValues"].append("table-key")
+    assert west["itemKeyValues"] == []
+
+    # loading the same content again, i.e. into a second world, adds nothing to the table
+    again, _ = load_json(path, strings)["exits"]
+    assert again["descriptions"]["Examine"] is east["descriptions"]["Examine"]
+    assert strings.report()["strings"] == first_report["strings"]
@@ -0,0 +1,136 @@
+from texticular.world import World
+from texticular.game_object import GameObject
+from texticular.command_parser import Parser
+from texticular.character import Player
+from texticular.rooms.room import Room
+from texticular.items.story_item import StoryItem, Inventory
+from texticular.game_enums import Flags
+from texticular.scope import Scope
+
+
+def build_world():
+    world = World()
+    with world:
+        room = Room("world-room", "Room", {"Main": "An empty room."})
+        bag = Inventory(key_value="world-bag", name="Bag", descriptions={"Main": "A bag."}, synonyms=["Bag"],
+                        location_key="world-player")
+        player = Player("world-player", "Tester", {"Main": "You."}, inventory=bag, location_key="world-room")
+        StoryItem(key_value="world-note", name="Note", descriptions={"Main": "A note."}, synonyms=["Note"],
+                  location_key="world-room", flags=[Flags.TAKEBIT])
+    return world, player
+
+
+def test_worldsHaveTheirOwnRegistries():
+    first, first_player = build_world()
+    second, second_player = build_world()
+    assert World.active is not first and World.active is not second
+    assert "world-note" not in GameObject.objects_by_key
+    assert first.lookup("world-note") is not second.lookup("world-note")
+    assert first_player.location is first.lookup("world-room")
+    assert first.lookup("world-note").id == second.lookup("world-note").id
+
+    with first:
+        assert GameObject.objects_by_key is first.objects_by_key
+    assert GameObject.objects_by_key is not first.objects_by_key
+
+
+def test_worldEventsOnlyReachTheirOwnListeners():
+    first, first_player = build_world()
+    second, _ = build_world()
+    parser = Parser(game_objects=first)
+    scope = Scope(first_player)
+    scope.refresh()
+    second.lookup("world-note").move("world-bag")
+    assert not scope.stale
+    second.lookup("world-note").rename("Letter", synonyms=["Letter"])
+    assert parser.parse_input("take note", scope).direct_object_key == "world-note"
+
+    first.lookup("world-note").move("world-bag")
+    assert scope.stale
+    first.lookup("world-note").rename("Letter", synonyms=["Letter"])
+    assert parser.parse_input("take letter", scope).direct_object_key == "world-note"
+    assert first.globals is not second.globals
+
+
+def test_locationIndexFollowsMovesAndRemovals():
+    world, player = build_world()
+    with world:
+        note = world.lookup("world-note")
+        bag = world.lookup("world-bag")
+        assert world.contents_of("world-room") == [player, note]
+
+        bag.add_item(note)
+        assert world.contents_of("world-room") == [player]
+        assert world.contents_of("world-bag") == [note]
+
+        bag.remove_item(note)
+        assert world.contents_of("world-bag") == []
+        assert world.contents_of("nowhereLand") == [note]
+
+        note.unregister()
+        assert world.contents_of("nowhereLand") == []
+
+
+def test_snapshotsRestoreOnlyWhatChanged():
+    world, player = build_world()
+    note = world.lookup("world-note")
+    bag = world.lookup("world-bag")
+    room = world.lookup("world-room")
+    room.items.append(note)
+    start = world.snapshot()
+    assert start.parent is None and len(start.changes) == len(world)
+
+    with world:
+        bag.add_item(note)
+        room.items.remove(note)
+        note.add_flag(Flags.OPENBIT)
+        note.rename("Letter", synonyms=["Letter"])
+        player.add_money(2.50)
+        world.globals["HAS_POOPED"] = True
+        coin = StoryItem(key_value="world-coin", name="Coin", descriptions={"Main": "A coin."}, synonyms=["Coin"],
+                         location_key="world-room")
+    after_turn = world.snapshot()
+    assert after_turn.parent is start
+    assert set(after_turn.changes) == {"world-note", "world-bag", "world-room", "world-player", "world-coin"}
+
+    parser = Parser(game_objects=world)
+    scope = Scope(player)
+    scope.refresh()
+    world.restore(start)
+    assert note.location_key == "world-room" and list(room.items) == [note] and not bag.items
+    assert Flags.OPENBIT not in note.flags and note.name == "Note" and note.synonyms == ["Note"]
+    assert player.money == 0.00 and not world.globals["HAS_POOPED"]
+    assert "world-coin" not in world and world.contents_of("world-room") == [player, note]
+    assert scope.stale
+    assert parser.parse_input("take note", scope).direct_object_key == "world-note"
+
+    world.restore(after_turn)
+    assert list(bag.items) == [note] and note.name == "Letter" and player.money == 2.50
+    assert world.lookup("world-coin") is coin and coin in world.contents_of("world-room")
+
+
+def test_queryIntersectsFlagAndTypeIndexes():
+    world, player = build_world()
+    note = world.lookup("world-note")
+    bag = world.lookup("world-bag")
+    with world:
+        box = StoryItem(key_value="world-box", name="Box", descriptions={"Main": "A box."}, synonyms=["Box"],
+                        location_key="world-room", flags=[Flags.CONTAINERBIT, Flags.TAKEBIT])
+    assert world.query(flags=Flags.TAKEBIT) == [note, box]
+    assert world.query(flags=Flags.CONTAINERBIT | Flags.OPENBIT) == [bag]
+    assert world.query(type=Player) == [player]
+    assert world.query(type=StoryItem, not_flags=[Flags.CONTAINERBIT]) == [note]
+
+    box.add_flag(Flags.OPENBIT)
+    note.remove_flag(Flags.TAKEBIT)
+    assert world.query(flags=["CONTAINERBIT", "OPENBIT"], location="world-room") == [box]
+    assert world.query(flags=Flags.TAKEBIT) == [box]
+
+    box.unregister()
+    assert world.query(flags=Flags.CONTAINERBIT) == [bag]
+    with world:
+        letter = StoryItem(key_value="world-letter", name="Letter", descriptions={"Main": "A letter."},
+                           synonyms=["Letter"], location_key="world-bag")
+    # the box's bit position is reused without it turning up again
+    assert world.query(type=StoryItem) == [bag, note, letter]
+    assert world.query(location="world-bag", type=StoryItem) == [letter]